@@ -1,26 +1,28 @@
-import base64
-import requests
-import io
-from PIL import Image
-from dotenv import load_dotenv
+"""
+Command-line access to the Groq vision models.
+
+Usage:
+    python Main.py photo.jpg --query "Describe this image"
+    python Main.py photos/ more.jpg --query "What skin condition is this?" --output results.jsonl
+
+A single image prints both models' answers. Directories and multiple images are analyzed as a
+batch through the same bounded, rate-limited worker pool as the /batch endpoint, with one JSON
+line per image appended to the output file as it finishes.
+"""
+
 import os
+import sys
+import asyncio
+import argparse
 import logging
+from functools import partial
 
-# Load environment variables from .env file
-load_dotenv()
+from app import (BATCH_CONCURRENCY, BATCH_REQUESTS_PER_SECOND, create_http_client, default_batch_output,
+                 list_images, process_batch_image, read_file, run_batch)
+from result_cache import ResultCache
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Constants
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-# Check that the API key is defined
-if not GROQ_API_KEY:
-    raise ValueError("API Key is not defined. Please set GROQ_API_KEY in your environment variables.")
-
 def process_image(img_path, query):
     """
     Processes an image and sends it to the Groq vision models for analysis.
@@ -32,82 +34,66 @@ def process_image(img_path, query):
     Returns:
     - A dictionary with results from different Groq vision models.
     """
+    async def analyze():
+        async with create_http_client() as client:
+            return await process_batch_image(img_path, partial(read_file, img_path), query, client, ResultCache())
+
+    result = asyncio.run(analyze())
+    if "error" in result:
+        return {"error": result["error"]}
+    return {**result["responses"], **result["errors"]}
+
+def process_batch(paths, query, output_path, concurrency=BATCH_CONCURRENCY,
+                  requests_per_second=BATCH_REQUESTS_PER_SECOND):
+    """
+    Analyzes every image in ``paths`` (directories are expanded to the images inside them).
+
+    Parameters:
+    - paths: Image files and directories.
+    - query: A textual prompt sent with every image.
+    - output_path: JSONL file that one result per image is appended to.
+    - concurrency: Number of images processed at once.
+    - requests_per_second: Limit on model requests per second across both models.
+
+    Returns:
+    - Counts of images by status, plus the total.
+    """
+    images = []
+    for path in paths:
+        files = list_images(path) if os.path.isdir(path) else [path]
+        images += [(file, partial(read_file, file)) for file in files]
+
+    async def analyze():
+        async with create_http_client() as client:
+            return await run_batch(images, query, output_path, client, ResultCache(),
+                                   concurrency=concurrency, requests_per_second=requests_per_second)
+
+    return asyncio.run(analyze())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze images with the Groq vision models")
+    parser.add_argument("paths", nargs="+", help="Image files and/or directories of images")
+    parser.add_argument("--query", default="Describe this image", help="Question asked about every image")
+    parser.add_argument("--output", help="JSONL file for batch results (default: a new file in BATCH_OUTPUT_DIR)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Images processed at once")
+    parser.add_argument("--requests-per-second", type=float, default=BATCH_REQUESTS_PER_SECOND,
+                        help="Model requests per second across both models")
+    args = parser.parse_args(argv)
+
+    # A single image keeps the original behaviour of printing the answers
+    if len(args.paths) == 1 and not os.path.isdir(args.paths[0]) and not args.output:
+        print(process_image(args.paths[0], args.query))
+        return
+
+    output_path = args.output or default_batch_output()
     try:
-        # Read and base64-encode the image
-        with open(img_path, 'rb') as img_file:
-            img_content = img_file.read()
-            encoded_image = base64.b64encode(img_content).decode("utf-8")
-
-        # Validate image using PIL
-        try:
-            img = Image.open(io.BytesIO(img_content))
-            img.verify()  # Will raise if image is corrupted
-        except Exception as e:
-            logger.error(f"Invalid image format: {str(e)}")
-            return {"error": f"Invalid image format: {str(e)}"}
-
-        # Create the message payload
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": query},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}}
-                ]
-            }
-        ]
-
-        def make_api_request(model):
-            """
-            Makes a POST request to the Groq API with a given model.
-
-            Parameters:
-            - model: The model ID string.
-
-            Returns:
-            - Response object from the API.
-            """
-            response = requests.post(
-                GROQ_API_URL,
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "max_tokens": 1000
-                },
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                timeout=30
-            )
-            return response
-
-        # Make API requests to both models
-        llama_response = make_api_request("meta-llama/llama-4-scout-17b-16e-instruct")
-        llava_response = make_api_request("meta-llama/llama-4-maverick-17b-128e-instruct")
-
-        responses = {}
-
-        # Handle both responses
-        for model, response in [("llama11b", llama_11b_response), ("llama90b", llama_90b_response)]:
-            if response.status_code == 200:
-                result = response.json()
-                answer = result["choices"][0]["message"]["content"]
-                logger.info(f"Processed response from {model}: {answer}")
-                responses[model] = answer
-            else:
-                logger.error(f"Error from {model} API: {response.status_code} - {response.text}")
-                responses[model] = f"Error: {response.status_code}"
-
-        return responses
-
-    except Exception as e:
-        logger.error(f"An unexpected error occurred: {str(e)}")
-        return {"error": f"An unexpected error occurred: {str(e)}"}
+        summary = process_batch(args.paths, args.query, output_path, args.concurrency, args.requests_per_second)
+    except KeyboardInterrupt:
+        print(f"\nStopped. Results so far are in {output_path}")
+        sys.exit(130)
+    print(f"{summary['total']} images: {summary['ok']} ok, {summary['partial']} partial, "
+          f"{summary['error']} failed. Results: {output_path}")
 
 # Ensure this block only runs when the script is executed directly
 if __name__ == "__main__":
-    img_path = "abc.jpg"  # Replace with your actual image path
-    query = "Describe this image"
-    result = process_image(img_path, query)
-    print(result)
+    main()
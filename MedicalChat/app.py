@@ -1,16 +1,28 @@
 from fastapi import FastAPI, File, UploadFile, Form, Request, HTTPException
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from collections import Counter
+from functools import partial
+from typing import Dict, List, Optional
 
+import asyncio
 import base64
-import requests
+import httpx
 import io
-from PIL import Image
+import json
+import shutil
+import tempfile
+import time
+import uuid
+from PIL import Image, ImageOps
 from dotenv import load_dotenv
 import os
 import logging
 
+from result_cache import ResultCache, ImageKey, dhash, image_digest
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,106 +30,384 @@ logger = logging.getLogger(__name__)
 # Load environment variables from a .env file
 load_dotenv()
 
-# Initialize FastAPI application
-app = FastAPI()
-
-# Set up Jinja2 templates directory for HTML rendering
-templates = Jinja2Templates(directory="templates")
-
 # Load GROQ API key and endpoint from environment variables
-GROQ_API_URL = os.getenv("GROQ_API_URL")  # FIX: was hardcoded inside `os.getenv()`
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")  # FIX: was hardcoded inside `os.getenv()`
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 # Validate that the API key is set
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY is not set in the .env file")
 
+# Vision models queried for every upload, keyed by the name used in the response
+VISION_MODELS = {
+    "llama": "meta-llama/llama-4-scout-17b-16e-instruct",
+    "llava": "meta-llama/llama-4-maverick-17b-128e-instruct",
+}
+
+# Total seconds to wait for each model; a model that runs over is reported as timed out
+# while the other model's answer is still returned
+MODEL_TIMEOUTS = {
+    "llama": float(os.getenv("LLAMA_TIMEOUT", "30")),
+    "llava": float(os.getenv("LLAVA_TIMEOUT", "30")),
+}
+
+# Connection pool shared by all requests, so uploads reuse open connections to the API
+MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+
+# Uploads are downscaled so their longest side is at most this many pixels, stripped of EXIF
+# and re-encoded, so a 12 MB phone photo is sent as a few hundred KB
+MAX_IMAGE_SIDE = int(os.getenv("MAX_IMAGE_SIDE", "1536"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG").upper()  # JPEG or WEBP
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+IMAGE_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+if IMAGE_FORMAT not in IMAGE_MIME_TYPES:
+    raise ValueError(f"IMAGE_FORMAT must be one of {', '.join(IMAGE_MIME_TYPES)}")
+
+# Batches process this many images at once (each queries both models), and send at most this many
+# model requests per second in total; cached answers do not count against the rate
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_REQUESTS_PER_SECOND = float(os.getenv("BATCH_REQUESTS_PER_SECOND", "1"))
+BATCH_OUTPUT_DIR = os.getenv("BATCH_OUTPUT_DIR", "batch_results")
+# The /batch endpoint only reads server directories inside this one; unset, only uploads are accepted
+BATCH_INPUT_ROOT = os.getenv("BATCH_INPUT_ROOT")
+# Finished /batch jobs are forgotten this many seconds after they end (their JSONL files are kept)
+BATCH_JOB_TTL_SECONDS = int(os.getenv("BATCH_JOB_TTL_SECONDS", "3600"))
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """HTTP client with a connection pool for the Groq API."""
+    return httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        timeout=httpx.Timeout(max(MODEL_TIMEOUTS.values()), connect=10.0),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One HTTP client for the lifetime of the server
+    app.state.http_client = create_http_client()
+    # Answers to repeated image and question pairs, shared by every request
+    app.state.result_cache = ResultCache()
+    # Batch jobs started through /batch, keyed by job id
+    app.state.batch_jobs = {}
+    yield
+    # Running batches are stopped, and allowed to clean up their uploads, before the client closes
+    tasks = [job["task"] for job in app.state.batch_jobs.values()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await app.state.http_client.aclose()
+
+
+# Initialize FastAPI application
+app = FastAPI(lifespan=lifespan)
+
+# Set up Jinja2 templates directory for HTML rendering
+templates = Jinja2Templates(directory="templates")
+
+
+class ModelError(Exception):
+    """A vision model returned no usable answer; the message is shown in place of the answer."""
+
+
+def request_body(model_name: str, messages_json: str, stream: bool = False) -> bytes:
+    """Chat completion request for one model, reusing the already serialized messages."""
+    # The messages (and the image inside them) are serialized once and spliced into every model's request
+    options = json.dumps({"model": VISION_MODELS[model_name], "max_tokens": 1000, "stream": stream})
+    return (options[:-1] + ', "messages": ' + messages_json + "}").encode("utf-8")
+
+async def query_model(client: httpx.AsyncClient, model_name: str, messages_json: str) -> str:
+    """
+    Ask one vision model about the image and return its answer.
+
+    Parameters:
+    - client: Shared HTTP client.
+    - model_name: Key into VISION_MODELS.
+    - messages_json: Serialized chat messages holding the query and the image.
+
+    Returns:
+    - The model's answer text.
+
+    Raises:
+    - ModelError describing why the answer is missing.
+    """
+    timeout = MODEL_TIMEOUTS[model_name]
+    try:
+        response = await asyncio.wait_for(
+            client.post(GROQ_API_URL, content=request_body(model_name, messages_json)),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"{model_name} API timed out after {timeout:g}s")
+        raise ModelError(f"{model_name} API timed out after {timeout:g}s")
+    except httpx.HTTPError as e:
+        logger.error(f"Request to {model_name} API failed: {str(e)}")
+        raise ModelError(f"Request to {model_name} API failed")
+
+    if response.status_code != 200:
+        logger.error(f"Error from {model_name} API: {response.status_code} - {response.text}")
+        raise ModelError(f"Error from {model_name} API: {response.status_code}")
+
+    # A body that is not JSON, or JSON of the wrong shape, fails only this model's answer
+    try:
+        answer = response.json()["choices"][0]["message"]["content"]
+        logger.info(f"{model_name} response: {answer[:100]}...")
+        return answer
+    except (ValueError, TypeError, KeyError, IndexError):
+        logger.error(f"Malformed response from {model_name}: {response.text[:1000]}")
+        raise ModelError("Malformed response received")
+
+class RateLimiter:
+    """Spaces out requests so that at most ``requests_per_second`` start per second, across every caller."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for the next free request slot."""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+async def cached_answer(cache: ResultCache, client: httpx.AsyncClient, model_name: str,
+                        messages_json: str, api_query: str, image_key: ImageKey,
+                        limiter: Optional[RateLimiter] = None):
+    """
+    Answer from the result cache when this model has seen the question about the same (or a near-identical)
+    image; otherwise query the model and store a successful, non-empty answer.
+
+    Parameters:
+    - limiter: Optional rate limiter that model requests (but not cache hits) wait for.
+
+    Returns:
+    - A tuple of the model's answer text and whether it came from the cache.
+
+    Raises:
+    - ModelError describing why the answer is missing.
+    """
+    model_id = VISION_MODELS[model_name]
+    answer = await run_in_threadpool(cache.get, model_id, api_query, image_key)
+    if answer is not None:
+        logger.info(f"{model_name} response served from cache")
+        return answer, True
+
+    if limiter is not None:
+        await limiter.acquire()
+    answer = await query_model(client, model_name, messages_json)
+    if answer:
+        await run_in_threadpool(cache.set, model_id, api_query, image_key, answer)
+    return answer, False
+
+async def ask_all_models(cache: ResultCache, client: httpx.AsyncClient, messages_json: str, api_query: str,
+                         image_key: ImageKey, limiter: Optional[RateLimiter] = None):
+    """
+    Query every vision model concurrently.
+
+    Returns:
+    - A tuple of answers and of error messages, each keyed by model name (every model appears in exactly one),
+      and the names of the models whose answer came from the result cache.
+    """
+    results = await asyncio.gather(
+        *(cached_answer(cache, client, model_name, messages_json, api_query, image_key, limiter)
+          for model_name in VISION_MODELS),
+        return_exceptions=True
+    )
+    answers, errors, cached = {}, {}, []
+    for model_name, result in zip(VISION_MODELS, results):
+        if isinstance(result, ModelError):
+            errors[model_name] = str(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            answers[model_name], from_cache = result
+            if from_cache:
+                cached.append(model_name)
+    return answers, errors, cached
+
+async def stream_model(client: httpx.AsyncClient, model_name: str, messages_json: str, events: asyncio.Queue):
+    """
+    Stream one vision model's answer into a queue shared with the other models.
+
+    Puts {"model", "delta"} events as tokens arrive, then one {"model", "done": true, "cached": false} event once the
+    model sends [DONE], or a {"model", "error"} event if the model fails, stops early or runs past its timeout.
+
+    Parameters:
+    - client: Shared HTTP client.
+    - model_name: Key into VISION_MODELS.
+    - messages_json: Serialized chat messages holding the query and the image.
+    - events: Queue the events are put on.
+    """
+    async def forward_tokens():
+        async with client.stream("POST", GROQ_API_URL, content=request_body(model_name, messages_json, stream=True)) as response:
+            if response.status_code != 200:
+                await response.aread()
+                logger.error(f"Error from {model_name} API: {response.status_code} - {response.text}")
+                return f"Error from {model_name} API: {response.status_code}"
+
+            # Server-sent events: one 'data: {chunk}' line per token group, then 'data: [DONE]'
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return None
+                # Chunks of the wrong shape (e.g. a null delta or a non-object payload) are skipped
+                try:
+                    delta = json.loads(data)["choices"][0]["delta"].get("content")
+                except (ValueError, TypeError, KeyError, IndexError, AttributeError):
+                    logger.error(f"Malformed stream chunk from {model_name}: {data}")
+                    continue
+                if delta and isinstance(delta, str):
+                    await events.put({"model": model_name, "delta": delta})
+        logger.error(f"{model_name} API stream ended before [DONE]")
+        return f"{model_name} API stream ended before the answer was complete"
+
+    timeout = MODEL_TIMEOUTS[model_name]
+    # The stream waits for one final event per model, so it is put however this task ends
+    error = f"{model_name} API request was interrupted"
+    try:
+        error = await asyncio.wait_for(forward_tokens(), timeout=timeout)
+    except asyncio.TimeoutError:
+        error = f"{model_name} API timed out after {timeout:g}s"
+        logger.error(error)
+    except httpx.HTTPError as e:
+        logger.error(f"Request to {model_name} API failed: {str(e)}")
+        error = f"Request to {model_name} API failed"
+    except Exception as e:
+        # e.g. httpx.StreamError, which is not an HTTPError
+        logger.error(f"Unexpected error streaming from {model_name} API: {str(e)}")
+        error = f"Request to {model_name} API failed"
+    finally:
+        events.put_nowait({"model": model_name, "error": error} if error
+                          else {"model": model_name, "done": True, "cached": False})
+
 # Route to render the index page
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+def preprocess_image(image_content: bytes):
+    """
+    Shrink an uploaded image for the vision models.
+
+    Applies the EXIF orientation, downscales to MAX_IMAGE_SIDE, drops all metadata and
+    re-encodes as IMAGE_FORMAT at IMAGE_QUALITY.
+
+    Parameters:
+    - image_content: Raw bytes of a verified image.
+
+    Returns:
+    - A tuple of the encoded image bytes, their MIME type and the image's cache key (SHA-256 digest and perceptual hash).
+    """
+    img = Image.open(io.BytesIO(image_content))
+    # Lets the JPEG decoder skip detail that the downscale would throw away anyway
+    img.draft("RGB", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.Resampling.LANCZOS)
+    # Hashed after orientation and downscaling, so rotated-by-EXIF, resized and re-compressed copies hash alike
+    perceptual_hash = dhash(img)
+
+    # JPEG has no alpha channel, so transparent areas are flattened onto white
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        if IMAGE_FORMAT == "JPEG":
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # Saving without exif= leaves out EXIF (GPS position, device details) and other metadata
+    output = io.BytesIO()
+    img.save(output, format=IMAGE_FORMAT, quality=IMAGE_QUALITY, optimize=IMAGE_FORMAT == "JPEG")
+    encoded = output.getvalue()
+    logger.info(f"Preprocessed image: {len(image_content)} -> {len(encoded)} bytes, {img.size[0]}x{img.size[1]} {IMAGE_FORMAT}")
+    return encoded, IMAGE_MIME_TYPES[IMAGE_FORMAT], ImageKey(image_digest(encoded), perceptual_hash)
+
+async def build_messages(image: UploadFile, query: str):
+    """
+    Read the uploaded image and build the chat messages sent to every model (see prepare_query).
+    """
+    # Read image content from the uploaded file
+    return await prepare_query(await image.read(), query)
+
+async def prepare_query(image_content: bytes, query: str):
+    """
+    Validate and preprocess an image, then build the chat messages sent to every model.
+
+    Parameters:
+    - image_content: Raw bytes of the image.
+    - query: The user's question about the image.
+
+    Returns:
+    - A tuple of the chat messages serialized as JSON, the tailored query and the preprocessed image's cache key.
+    """
+    if not image_content:
+        raise HTTPException(status_code=400, detail="Empty file uploaded")
+
+    # Try to verify that it's a valid image using PIL
+    try:
+        img = Image.open(io.BytesIO(image_content))
+        img.verify()
+    except Exception as e:
+        logger.error(f"Invalid image format: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid image format: {str(e)}")
+
+    # Downscale and re-encode off the event loop, then convert to base64 once for both models
+    try:
+        processed_image, mime_type, image_key = await run_in_threadpool(preprocess_image, image_content)
+    except Exception as e:
+        logger.error(f"Could not preprocess image: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid image format: {str(e)}")
+    encoded_image = base64.b64encode(processed_image).decode("utf-8")
+
+    # Analyze the user's query to tailor the API prompt
+    api_query = query
+    lower_query = query.lower()
+
+    if "alternate diagnoses" in lower_query or "other possibilities" in lower_query or "what else could it be" in lower_query:
+        api_query = query + " Please also provide a list of plausible alternate diagnoses and their characteristics."
+    elif "treatment" in lower_query or "how to treat" in lower_query or "what to do" in lower_query:
+         api_query = query + " Please provide information on potential treatment options."
+    elif "prevention" in lower_query or "how to prevent" in lower_query or "avoid" in lower_query:
+         api_query = query + " Please provide tips on how to prevent this condition."
+    else:
+         # Default instruction for general queries
+         api_query = query + " Please provide a detailed analysis of the image."
+
+    # Prepare the message payload for the chat API with image and query
+    messages = [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": api_query},
+                {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{encoded_image}"}}
+            ]
+        }
+    ]
+    return json.dumps(messages), api_query, image_key
+
 # Endpoint to accept image uploads and text queries
 @app.post("/upload_and_query")
-async def upload_and_query(image: UploadFile = File(...), query: str = Form(...)):
+async def upload_and_query(request: Request, image: UploadFile = File(...), query: str = Form(...)):
     try:
-        # Read image content from the uploaded file
-        image_content = await image.read()
-        if not image_content:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
+        messages_json, api_query, image_key = await build_messages(image, query)
 
-        # Try to verify that it's a valid image using PIL
-        try:
-            img = Image.open(io.BytesIO(image_content))
-            img.verify()
-        except Exception as e:
-            logger.error(f"Invalid image format: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid image format: {str(e)}")
-
-        # Convert the image to base64 encoding for API usage
-        encoded_image = base64.b64encode(image_content).decode("utf-8")
-
-        # Analyze the user's query to tailor the API prompt
-        api_query = query
-        lower_query = query.lower()
-
-        if "alternate diagnoses" in lower_query or "other possibilities" in lower_query or "what else could it be" in lower_query:
-            api_query = query + " Please also provide a list of plausible alternate diagnoses and their characteristics."
-        elif "treatment" in lower_query or "how to treat" in lower_query or "what to do" in lower_query:
-             api_query = query + " Please provide information on potential treatment options."
-        elif "prevention" in lower_query or "how to prevent" in lower_query or "avoid" in lower_query:
-             api_query = query + " Please provide tips on how to prevent this condition."
-        else:
-             # Default instruction for general queries
-             api_query = query + " Please provide a detailed analysis of the image."
-
-        # Prepare the message payload for the chat API with image and query
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": api_query},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded_image}"}}
-                ]
-            }
-        ]
-
-        # Helper function to call the GROQ API with a specified model
-        def make_api_request(model: str):
-            response = requests.post(
-                GROQ_API_URL,
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "max_tokens": 1000
-                },
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                timeout=30
-            )
-            return response
-
-        # Call both vision models
-        llama_response = make_api_request("meta-llama/llama-4-scout-17b-16e-instruct")
-        llava_response = make_api_request("meta-llama/llama-4-maverick-17b-128e-instruct")
-
-        # Parse and collect responses
-        responses = {}
-        for model_name, response in [("llama", llama_response), ("llava", llava_response)]:
-            if response.status_code == 200:
-                result = response.json()
-                try:
-                    answer = result["choices"][0]["message"]["content"]
-                    logger.info(f"{model_name} response: {answer[:100]}...")
-                    responses[model_name] = answer
-                except (KeyError, IndexError) as e:
-                    logger.error(f"Malformed response from {model_name}: {result}")
-                    responses[model_name] = "Malformed response received"
-            else:
-                logger.error(f"Error from {model_name} API: {response.status_code} - {response.text}")
-                responses[model_name] = f"Error from {model_name} API: {response.status_code}"
+        # Query both vision models concurrently; each answer (or its error) is returned on its own
+        client = request.app.state.http_client
+        cache = request.app.state.result_cache
+        answers, errors, cached = await ask_all_models(cache, client, messages_json, api_query, image_key)
+        responses = {model_name: answers.get(model_name, errors.get(model_name)) for model_name in VISION_MODELS}
+        # Tells the client which answers were reused from an earlier identical request
+        responses["cached"] = {model_name: model_name in cached for model_name in VISION_MODELS}
 
         return JSONResponse(status_code=200, content=responses)
 
@@ -128,6 +418,266 @@ async def upload_and_query(image: UploadFile = File(...), query: str = Form(...)
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+# Streaming variant: answers arrive token by token as newline-delimited JSON events
+@app.post("/upload_and_query/stream")
+async def upload_and_query_stream(request: Request, image: UploadFile = File(...), query: str = Form(...)):
+    # Invalid uploads are rejected before the stream starts, so they still get a 400
+    messages_json, api_query, image_key = await build_messages(image, query)
+    client = request.app.state.http_client
+    cache = request.app.state.result_cache
+
+    async def event_stream():
+        events = asyncio.Queue()
+        tasks = []
+        for model_name in VISION_MODELS:
+            # Cached answers are sent whole; only the other models are streamed
+            answer = await run_in_threadpool(cache.get, VISION_MODELS[model_name], api_query, image_key)
+            if answer is not None:
+                logger.info(f"{model_name} response served from cache")
+                events.put_nowait({"model": model_name, "delta": answer})
+                events.put_nowait({"model": model_name, "done": True, "cached": True})
+            else:
+                tasks.append(asyncio.create_task(stream_model(client, model_name, messages_json, events)))
+        try:
+            # Every model ends with exactly one 'done' or 'error' event
+            answers = {model_name: "" for model_name in VISION_MODELS}
+            remaining = len(VISION_MODELS)
+            while remaining:
+                event = await events.get()
+                if "delta" in event:
+                    answers[event["model"]] += event["delta"]
+                else:
+                    remaining -= 1
+                    # Only complete answers are cached: the model sent [DONE] and some text
+                    if event.get("done") and not event.get("cached") and answers[event["model"]]:
+                        await run_in_threadpool(cache.set, VISION_MODELS[event["model"]], api_query, image_key,
+                                                answers[event["model"]])
+                yield json.dumps(event) + "\n"
+        finally:
+            # Stop generating if the browser goes away mid-stream
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+def list_images(directory: str) -> List[str]:
+    """Paths of the image files directly inside ``directory``, sorted by name."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(directory, name))
+    )
+
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def default_batch_output() -> str:
+    """A new JSONL file in BATCH_OUTPUT_DIR for one batch's results."""
+    os.makedirs(BATCH_OUTPUT_DIR, exist_ok=True)
+    return os.path.join(BATCH_OUTPUT_DIR, f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl")
+
+async def process_batch_image(name: str, load, query: str, client: httpx.AsyncClient, cache: ResultCache,
+                              limiter: Optional[RateLimiter] = None) -> Dict:
+    """
+    Analyze one image of a batch with every model.
+
+    Parameters:
+    - name: File name or path reported with the result.
+    - load: Callable returning the image bytes; it runs in a worker thread.
+    - query: The user's question about the image.
+    - client: Shared HTTP client.
+    - cache: Result cache shared with the interactive endpoints.
+    - limiter: Optional rate limiter shared by the whole batch.
+
+    Returns:
+    - A result record: status is 'ok' when every model answered, 'partial' when some did, otherwise 'error'.
+    """
+    try:
+        image_content = await run_in_threadpool(load)
+        messages_json, api_query, image_key = await prepare_query(image_content, query)
+    except HTTPException as e:
+        return {"image": name, "status": "error", "error": e.detail}
+    except OSError as e:
+        logger.error(f"Could not read {name}: {str(e)}")
+        return {"image": name, "status": "error", "error": f"Could not read image: {str(e)}"}
+
+    answers, errors, cached = await ask_all_models(cache, client, messages_json, api_query, image_key, limiter)
+    status = "ok" if not errors else "partial" if answers else "error"
+    return {"image": name, "status": status, "responses": answers, "errors": errors, "cached": cached}
+
+async def run_batch(images: List, query: str, output_path: str, client: httpx.AsyncClient, cache: ResultCache,
+                    concurrency: int = BATCH_CONCURRENCY,
+                    requests_per_second: float = BATCH_REQUESTS_PER_SECOND,
+                    counts: Optional[Counter] = None) -> Dict[str, int]:
+    """
+    Analyze many images with a bounded pool of workers, appending one JSON line per image as it finishes.
+
+    Parameters:
+    - images: (name, load) pairs, where load is a callable returning the image bytes.
+    - query: The question asked about every image.
+    - output_path: JSONL file the results are appended to.
+    - client: Shared HTTP client.
+    - cache: Result cache; images already answered are not sent again.
+    - concurrency: Number of images processed at once.
+    - requests_per_second: Limit on model requests per second across both models.
+    - counts: Optional Counter of images by status, updated as each image finishes (e.g. to report progress).
+
+    Returns:
+    - Counts of images by status, plus the total.
+    """
+    pending = asyncio.Queue()
+    for item in images:
+        pending.put_nowait(item)
+    total = pending.qsize()
+    limiter = RateLimiter(requests_per_second)
+    counts = counts if counts is not None else Counter()
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        async def worker():
+            while not pending.empty():
+                name, load = pending.get_nowait()
+                try:
+                    result = await process_batch_image(name, load, query, client, cache, limiter)
+                except Exception as e:
+                    # One bad image must not stop the other workers or lose the results written so far
+                    logger.error(f"Batch: unexpected error on {name}: {str(e)}")
+                    result = {"image": name, "status": "error", "error": f"Internal error: {str(e)}"}
+                # Results are written by the event loop thread only, so lines never interleave
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                counts[result["status"]] += 1
+                logger.info(f"Batch: {sum(counts.values())}/{total} images done ({name}: {result['status']})")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+
+    return {"total": total, "ok": counts["ok"], "partial": counts["partial"], "error": counts["error"]}
+
+def resolve_batch_directory(directory: str) -> str:
+    """
+    Resolve a directory requested through /batch, allowing only BATCH_INPUT_ROOT and its subdirectories.
+
+    Parameters:
+    - directory: Path relative to BATCH_INPUT_ROOT (absolute paths must still lie inside it).
+
+    Returns:
+    - The directory's real path.
+
+    Raises:
+    - HTTPException if server directories are disabled or the path is outside the root or not a directory.
+    """
+    if not BATCH_INPUT_ROOT:
+        raise HTTPException(status_code=400, detail="Server directories are disabled; upload the images instead")
+    root = os.path.realpath(BATCH_INPUT_ROOT)
+    # realpath resolves '..' and symlinks, so neither can lead outside the root
+    path = os.path.realpath(os.path.join(root, directory))
+    if os.path.commonpath([root, path]) != root:
+        raise HTTPException(status_code=400, detail="Directory is outside the batch input root")
+    if not os.path.isdir(path):
+        raise HTTPException(status_code=400, detail=f"Not a directory: {directory}")
+    return path
+
+def batch_job_status(job: Dict) -> Dict:
+    """Public view of a batch job: its id, state and counts of images by status."""
+    counts = job["counts"]
+    status = {"job_id": job["id"], "status": job["status"], "total": job["total"],
+              "done": sum(counts.values()), "ok": counts["ok"], "partial": counts["partial"],
+              "error": counts["error"]}
+    if job.get("error"):
+        status["detail"] = job["error"]
+    return status
+
+async def run_batch_job(job: Dict, images: List, query: str, client: httpx.AsyncClient, cache: ResultCache,
+                        upload_dir: Optional[str] = None):
+    """
+    Run a batch started through /batch in the background, recording whether it finished or failed.
+
+    Parameters:
+    - upload_dir: Directory holding the job's spooled uploads; it is removed when the job ends.
+    """
+    try:
+        await run_batch(images, query, job["output"], client, cache, counts=job["counts"])
+        job["status"] = "done"
+    except Exception as e:
+        logger.error(f"Batch job {job['id']} failed: {str(e)}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = time.time()
+        if upload_dir:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+def prune_batch_jobs(jobs: Dict[str, Dict]):
+    """Forget jobs that finished more than BATCH_JOB_TTL_SECONDS ago."""
+    cutoff = time.time() - BATCH_JOB_TTL_SECONDS
+    for job_id in [job_id for job_id, job in jobs.items() if "finished_at" in job and job["finished_at"] < cutoff]:
+        del jobs[job_id]
+
+def spool_upload(image: UploadFile, path: str):
+    """Copy an upload to disk, so a batch reads each image only when it gets to it."""
+    image.file.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(image.file, f)
+
+# Endpoint to analyze many images: uploaded files and/or the images in a directory under BATCH_INPUT_ROOT.
+# The batch runs in the background; poll /batch/{job_id} for progress and fetch /batch/{job_id}/results.
+@app.post("/batch")
+async def batch(request: Request, query: str = Form(...), images: Optional[List[UploadFile]] = File(None),
+                directory: Optional[str] = Form(None)):
+    prune_batch_jobs(request.app.state.batch_jobs)
+    batch_images = []
+    if directory:
+        images_dir = resolve_batch_directory(directory)
+        root = os.path.realpath(BATCH_INPUT_ROOT)
+        # Symlinked files pointing outside the root are skipped as well
+        batch_images += [(os.path.relpath(path, root), partial(read_file, path))
+                         for path in list_images(images_dir)
+                         if os.path.commonpath([root, os.path.realpath(path)]) == root]
+    if not images and not batch_images:
+        raise HTTPException(status_code=400, detail="No images to analyze")
+
+    # Uploads are closed once this request returns, so they are copied to disk rather than held in memory
+    upload_dir = None
+    if images:
+        os.makedirs(BATCH_OUTPUT_DIR, exist_ok=True)
+        upload_dir = tempfile.mkdtemp(prefix="uploads-", dir=BATCH_OUTPUT_DIR)
+        try:
+            for n, image in enumerate(images):
+                path = os.path.join(upload_dir, f"{n:06d}")
+                await run_in_threadpool(spool_upload, image, path)
+                batch_images.append((image.filename, partial(read_file, path)))
+        except OSError as e:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            logger.error(f"Could not store uploaded images: {str(e)}")
+            raise HTTPException(status_code=500, detail="Could not store uploaded images")
+
+    job_id = uuid.uuid4().hex
+    job = {"id": job_id, "status": "running", "total": len(batch_images), "counts": Counter(),
+           "output": default_batch_output()}
+    job["task"] = asyncio.create_task(run_batch_job(job, batch_images, query, request.app.state.http_client,
+                                                    request.app.state.result_cache, upload_dir))
+    request.app.state.batch_jobs[job_id] = job
+    return JSONResponse(status_code=202, content=batch_job_status(job))
+
+def get_batch_job(request: Request, job_id: str) -> Dict:
+    prune_batch_jobs(request.app.state.batch_jobs)
+    job = request.app.state.batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    return job
+
+# Progress of a batch job
+@app.get("/batch/{job_id}")
+async def batch_status(request: Request, job_id: str):
+    return JSONResponse(status_code=200, content=batch_job_status(get_batch_job(request, job_id)))
+
+# One JSON line per finished image; complete once the job's status is 'done'
+@app.get("/batch/{job_id}/results")
+async def batch_results(request: Request, job_id: str):
+    job = get_batch_job(request, job_id)
+    if not os.path.exists(job["output"]):
+        return StreamingResponse(iter(()), media_type="application/x-ndjson")
+    return FileResponse(job["output"], media_type="application/x-ndjson")
+
 # Run the app with uvicorn if executed directly
 if __name__ == "__main__":
     import uvicorn
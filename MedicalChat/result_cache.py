@@ -0,0 +1,204 @@
+"""
+On-disk cache of vision-model answers keyed by the image and the question.
+Re-submitting the same photo with the same question returns the stored answer instead of calling
+the model again. Byte-identical images are matched by a SHA-256 digest; re-compressed or resized
+copies are matched by a 256-bit perceptual hash that may differ in only a few bits.
+Backed by SQLite with TTL expiry and LRU eviction.
+"""
+
+import os
+import re
+import hashlib
+import time
+import sqlite3
+import threading
+import logging
+from typing import Dict, NamedTuple, Optional
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", ".medicalchat_cache.sqlite")
+DEFAULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "5000"))
+
+# Rows (and bits per row) of the perceptual hash: 16 gives 256 bits, enough to tell apart
+# photos of similar-looking lesions that an 8x8 hash lumps together
+PERCEPTUAL_HASH_SIZE = 16
+
+# Images whose perceptual hashes differ in at most this many of the 256 bits count as the same image.
+# Re-compression and resizing flip 0-4 bits; a different photo, or the same lesion shifted in frame,
+# flips 30 or more. Set to 0 to only reuse answers for images whose pixels hash identically, or
+# to -1 to disable near-duplicate matching and reuse answers only for byte-identical images.
+DEFAULT_MAX_HASH_DISTANCE = int(os.getenv("RESULT_CACHE_MAX_HASH_DISTANCE", "6"))
+
+
+class ImageKey(NamedTuple):
+    """Cache key of a preprocessed image."""
+    digest: str  # SHA-256 of the encoded bytes sent to the models
+    perceptual: int  # dhash of the orientation-corrected, downscaled image
+
+
+def image_digest(image_content: bytes) -> str:
+    """SHA-256 of an image's bytes, as hex."""
+    return hashlib.sha256(image_content).hexdigest()
+
+
+def dhash(img: Image.Image, hash_size: int = PERCEPTUAL_HASH_SIZE) -> int:
+    """
+    Difference hash of an image: one bit per horizontally adjacent pixel pair of a tiny grayscale copy.
+
+    Parameters:
+    - img: The image to hash.
+    - hash_size: Rows (and bits per row) of the hash.
+
+    Returns:
+    - A hash_size * hash_size bit integer that changes little under resizing and re-compression.
+    """
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cased query with punctuation and repeated whitespace removed."""
+    return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+
+class ResultCache:
+    """Thread-safe on-disk cache of model answers keyed by model, normalized query and image."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 ttl_seconds: int = DEFAULT_CACHE_TTL_SECONDS,
+                 max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+                 max_distance: int = DEFAULT_MAX_HASH_DISTANCE):
+        """
+        Parameters:
+        - path: SQLite database file (use ":memory:" for a process-local cache).
+        - ttl_seconds: Entries older than this are treated as misses and removed.
+        - max_entries: Least recently used entries beyond this many are evicted.
+        - max_distance: Largest Hamming distance between perceptual hashes that still counts as a hit
+          (negative to match byte-identical images only).
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                model TEXT NOT NULL,
+                query TEXT NOT NULL,
+                image_hash TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                perceptual_hash TEXT,
+                PRIMARY KEY (model, query, image_hash)
+            )
+        """)
+        # Caches written before near-duplicate matching have no perceptual hashes; their entries match exactly only
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(results)")]
+        if "perceptual_hash" not in columns:
+            self._conn.execute("ALTER TABLE results ADD COLUMN perceptual_hash TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_accessed ON results (last_accessed)")
+        self._conn.commit()
+
+    def get(self, model: str, query: str, image_key: ImageKey) -> Optional[str]:
+        """
+        Return the stored answer for this model and query about the same image, or None on a miss.
+
+        The exact digest is looked up first; otherwise the closest stored image within max_distance is used.
+
+        Parameters:
+        - model: Model id the answer came from.
+        - query: The query sent to the model; it is normalized before matching.
+        - image_key: Digest and perceptual hash of the preprocessed image.
+        """
+        now = time.time()
+        normalized = normalize_query(query)
+        oldest = now - self.ttl_seconds if self.ttl_seconds else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT image_hash, response FROM results "
+                "WHERE model = ? AND query = ? AND image_hash = ? AND created_at >= ?",
+                (model, normalized, image_key.digest, oldest)
+            ).fetchone()
+
+            if row is None and self.max_distance >= 0:
+                # Answers to the same question are few, so near-duplicate images are found by scanning them
+                best = None
+                for stored_digest, stored_hash, response in self._conn.execute(
+                    "SELECT image_hash, perceptual_hash, response FROM results "
+                    "WHERE model = ? AND query = ? AND created_at >= ? AND perceptual_hash IS NOT NULL",
+                    (model, normalized, oldest)
+                ):
+                    distance = bin(int(stored_hash, 16) ^ image_key.perceptual).count("1")
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, stored_digest, response)
+                if best is not None:
+                    logger.info(f"Near-duplicate image matched at Hamming distance {best[0]}")
+                    row = best[1:]
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE results SET last_accessed = ? WHERE model = ? AND query = ? AND image_hash = ?",
+                (now, model, normalized, row[0])
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[1]
+
+    def set(self, model: str, query: str, image_key: ImageKey, response: str):
+        """Store an answer and evict expired and least recently used entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(model, query, image_hash, perceptual_hash, response, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (model, normalize_query(query), image_key.digest, f"{image_key.perceptual:064x}",
+                 response, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones beyond max_entries."""
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+        cursor = self._conn.execute(
+            "DELETE FROM results WHERE rowid IN "
+            "(SELECT rowid FROM results ORDER BY last_accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        if cursor.rowcount:
+            logger.info(f"Evicted {cursor.rowcount} cached results to stay within {self.max_entries} entries")
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and the number of stored answers."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
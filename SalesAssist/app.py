@@ -8,19 +8,53 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import time
+import os
+import sys
+import subprocess
 from typing import List, Dict
 import io
 import logging
 import traceback
 
 from sample_data import SAMPLE_STARTUPS, get_sample_data, get_startup_by_name, get_top_claude_fits
-from claude_analyzer import ClaudeAnalyzer
+from claude_analyzer import ClaudeAnalyzer, RETRIEVAL_THRESHOLD
+from data_parsing import DEFAULT_CHUNK_SIZE, read_columns, resolve_column_mapping, iter_standardized_chunks
+from summary import StartupSummary
+from retrieval import StartupIndex
+from dedup import NameIndex
+from lead_store import LeadStore
+from job_queue import JobQueue
+from metrics import ClaudeMetrics, LATENCY_WINDOW
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Table columns: display name -> field in the startup data
+DETAILED_TABLE_COLUMNS = {
+    "Company": "company",
+    "Description": "solution",
+    "Industry": "industry",
+    "Pain Point Addressed": "pain_point",
+    "Claude Fit Score": "claude_fit_score",
+    "Claude Fit Justification": "claude_fit_justification",
+    "Target Audience": "target_audience",
+    "Business Model": "business_model",
+}
+OVERVIEW_TABLE_COLUMNS = {
+    "Company": "company",
+    "Description": "solution",
+    "Industry": "industry",
+    "Pain Point Addressed": "pain_point",
+    "Target Audience": "target_audience",
+    "Business Model": "business_model",
+    "Challenges": "challenges",
+    "Claude Integration Description": "claude_integration_description"
+}
+# Low-cardinality table columns stored as categoricals (smaller, and cheap to filter on)
+CATEGORICAL_TABLE_COLUMNS = ("Industry", "Business Model")
+TABLE_PAGE_SIZES = [25, 50, 100, 250]
+
 # Page configuration
 st.set_page_config(
     page_title="Claude Startup Insights Bot",
@@ -88,19 +122,16 @@ def load_data():
     # By returning the raw list, we avoid the ValueError and subsequent data format issues.
     return SAMPLE_STARTUPS
 
+@st.cache_resource
+def _shared_analyzer():
+    """One ClaudeAnalyzer (client, response cache, scheduler) per process, shared by all sessions."""
+    logger.info("Creating shared ClaudeAnalyzer instance")
+    return ClaudeAnalyzer()
+
 def get_analyzer():
-    """Get or create the Claude analyzer instance."""
+    """Get the process-wide Claude analyzer instance."""
     try:
-        # Check if analyzer already exists in session state
-        if 'analyzer' not in st.session_state:
-            logger.info("Creating new ClaudeAnalyzer instance")
-            analyzer = ClaudeAnalyzer()
-            st.session_state.analyzer = analyzer
-        else:
-            logger.info("Using existing ClaudeAnalyzer instance")
-            analyzer = st.session_state.analyzer
-        
-        return analyzer
+        return _shared_analyzer()
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         st.error(f"Configuration Error: {e}")
@@ -127,98 +158,71 @@ def validate_api_configuration():
         if api_key == "your_anthropic_api_key_here" or api_key.strip() == "":
             return False, "ANTHROPIC_API_KEY is not properly set"
         
-        # Test the API key by creating a minimal client
+        # The live check runs once per process (and again only if the key changes)
         try:
-            from anthropic import Anthropic
-            client = Anthropic(api_key=api_key)
-            # Try a simple test call
-            response = client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=10,
-                messages=[{"role": "user", "content": "Hello"}]
-            )
-            return True, "API key is valid and working"
+            return True, _check_api_key(api_key)
         except Exception as api_error:
             return False, f"API key validation failed: {str(api_error)}"
             
     except Exception as e:
         return False, f"Configuration validation error: {str(e)}"
 
-def parse_uploaded_file(uploaded_file):
-    """Parse uploaded Excel or CSV file."""
+@st.cache_resource(show_spinner="Checking Claude API access...")
+def _check_api_key(api_key):
+    """
+    Make one live test call with the shared client.
+    
+    Failures raise instead of returning, so they are not cached and the next run checks again.
+    """
+    success, message = _shared_analyzer().test_api_connection()
+    if not success:
+        raise RuntimeError(message)
+    logger.info("API connection test successful")
+    return message
+
+def parse_uploaded_file(uploaded_file, chunk_size=DEFAULT_CHUNK_SIZE, max_discarded_preview=1000):
+    """
+    Parse uploaded Excel or CSV file.
+    
+    The file is read in chunks of ``chunk_size`` rows and only standardized records are kept,
+    so large exports never sit in memory as a full DataFrame.
+    """
     try:
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(uploaded_file)
-        else:
-            st.error("Please upload a CSV or Excel file.")
+        try:
+            original_columns = read_columns(uploaded_file, uploaded_file.name)
+        except ValueError as e:
+            st.error(str(e))
             return None
         
         # Show the actual columns for debugging
-        st.info(f"📊 Found columns: {list(df.columns)}")
-        st.info(f"📊 Total rows: {len(df)}")
-        
-        # Convert DataFrame to list of dictionaries
-        data = df.to_dict('records')
+        st.info(f"📊 Found columns: {original_columns}")
         
-        # Map common column variations to standard names
-        column_mapping = {
-            'company': ['company', 'Company', 'COMPANY', 'name', 'Name', 'NAME', 'startup', 'Startup', 'STARTUP', 'Startup Name', 'startup_name'],
-            'industry': ['industry', 'Industry', 'INDUSTRY', 'sector', 'Sector', 'SECTOR', 'category', 'Category', 'CATEGORY', 'Industry Vertical'],
-            'business_model': ['business_model', 'Business Model', 'BUSINESS_MODEL', 'model', 'Model', 'MODEL', 'business type', 'Business Type', 'Business Type'],
-            'target_audience': ['target_audience', 'Target Audience', 'TARGET_AUDIENCE', 'audience', 'Audience', 'AUDIENCE', 'customer', 'Customer', 'CUSTOMER', 'Target Market'],
-            'pain_point': ['pain_point', 'Pain Point', 'PAIN_POINT', 'problem', 'Problem', 'PROBLEM', 'challenge', 'Challenge', 'CHALLENGE', 'Problem Statement', 'Pain', 'pain', 'The Problem', 'Painpoint', 'Customer Pain'],
-            'solution': ['solution', 'Solution', 'SOLUTION', 'product', 'Product', 'PRODUCT', 'offering', 'Offering', 'OFFERING', 'Product Description', 'desc', 'description', 'Description', 'Company Description', 'company_description'],
-        }
-        
-        # Standardize column names
         standardized_data = []
-        discarded_rows = []
-        for index, item in enumerate(data):
-            standardized_item = {}
-            
-            # Map each field
-            for standard_name, possible_names in column_mapping.items():
-                value = None
-                for possible_name in possible_names:
-                    if possible_name in item:
-                        value = item[possible_name]
-                        break
-                
-                if value is not None:
-                    # Clean the value
-                    if isinstance(value, str):
-                        value = value.strip()
-                        if value == '' or value.lower() in ['nan', 'none', 'null']:
-                            value = None
-                    
-                    standardized_item[standard_name] = value
-                else:
-                    # Set a default for any mapped column that isn't found
-                    standardized_item[standard_name] = 'N/A'
-            
-            # Ensure a default fit score exists before AI analysis
-            if 'claude_fit_score' not in standardized_item:
-                standardized_item['claude_fit_score'] = 5
-            
-            # Only add if we have at least a company name
-            if standardized_item.get('company') and standardized_item['company'] != 'N/A':
-                standardized_data.append(standardized_item)
-            else:
-                # Keep track of the original row data for debugging
-                discarded_rows.append(item)
+        discarded_preview = []
+        total_rows = discarded_count = 0
+        progress = st.progress(0.0, text="📥 Reading file...")
+        file_size = getattr(uploaded_file, 'size', 0)
+        for rows_read, records, discarded_rows in iter_standardized_chunks(uploaded_file, uploaded_file.name, chunk_size):
+            total_rows += rows_read
+            standardized_data.extend(records)
+            discarded_count += len(discarded_rows)
+            discarded_preview.extend(discarded_rows[:max_discarded_preview - len(discarded_preview)])
+            fraction = min(1.0, uploaded_file.tell() / file_size) if file_size else 0.0
+            progress.progress(fraction, text=f"📥 Read {total_rows:,} rows...")
+        progress.empty()
         
-        st.success(f"✅ Successfully parsed {len(standardized_data)} startups from {len(data)} rows")
-        if discarded_rows:
-            st.warning(f"⚠️ Discarded {len(discarded_rows)} rows. This is usually because they were empty or did not have a company name.")
+        st.info(f"📊 Total rows: {total_rows}")
+        st.success(f"✅ Successfully parsed {len(standardized_data)} startups from {total_rows} rows")
+        if discarded_count:
+            st.warning(f"⚠️ Discarded {discarded_count} rows. This is usually because they were empty or did not have a company name.")
             with st.expander("🔍 View Discarded Rows"):
-                st.dataframe(pd.DataFrame(discarded_rows))
+                if discarded_count > len(discarded_preview):
+                    st.caption(f"Showing the first {len(discarded_preview)} discarded rows (recognised columns only).")
+                st.dataframe(pd.DataFrame(discarded_preview))
         
         # --- New: Add a check for mapping failures to guide the user ---
         if standardized_data:
-            df_check = pd.DataFrame(standardized_data)
-            original_columns = list(df.columns)
+            column_mapping = resolve_column_mapping(original_columns)
             
             # Check for columns that are critical for the app's value
             essential_columns = {
@@ -227,7 +231,7 @@ def parse_uploaded_file(uploaded_file):
             }
             
             for standard_name, display_name in essential_columns.items():
-                if (df_check[standard_name] == 'N/A').all():
+                if standard_name not in column_mapping:
                     st.warning(f"""
                     **Having trouble finding the '{display_name}' column.**
 
@@ -250,111 +254,6 @@ def parse_uploaded_file(uploaded_file):
         st.error(f"File type: {uploaded_file.name}")
         return None
 
-def process_data_with_claude(analyzer, data):
-    """
-    Process the parsed data to add Claude-generated fit scores.
-    This is a separate function to allow for a progress bar.
-    """
-    if not analyzer:
-        logger.error("Analyzer is None, cannot process data")
-        st.error("AI analyzer not available. Please check your API configuration.")
-        return data
-    
-    if not data:
-        logger.warning("No data provided to process")
-        return []
-    
-    processed_data = []
-    progress_bar = st.progress(0, text="Analyzing startups with Claude...")
-    total_items = len(data)
-
-    # --- New: Add a live log to see the data as it's processed ---
-    log_expander = st.expander("🔬 Live Analysis Log", expanded=False)
-    
-    for i, item in enumerate(data):
-        company_name = item.get('company', f'Startup {i+1}')
-        
-        with log_expander:
-            st.write(f"**Analyzing {i+1}/{total_items}:** `{company_name}`")
-        
-        try:
-            # Input validation
-            if not isinstance(item, dict):
-                logger.error(f"Item {i+1} is not a dict: {type(item)}")
-                with log_expander:
-                    st.error(f"Invalid data format for item {i+1}")
-                continue
-            
-            # Check for required fields
-            if not item.get('company'):
-                logger.warning(f"Item {i+1} missing company name")
-                item['company'] = f'Unknown Company {i+1}'
-            
-            logger.info(f"Processing startup {i+1}/{total_items}: {company_name}")
-            
-            # Call the analyzer with error handling
-            fit_score_data = analyzer.get_claude_fit_score(item)
-            
-            if not fit_score_data:
-                logger.error(f"No fit score data returned for {company_name}")
-                fit_score_data = {
-                    "claude_fit_score": 5,
-                    "claude_fit_justification": "Analysis failed - no data returned"
-                }
-            
-            # Validate the returned data
-            if not isinstance(fit_score_data, dict):
-                logger.error(f"Invalid fit score data type for {company_name}: {type(fit_score_data)}")
-                fit_score_data = {
-                    "claude_fit_score": 5,
-                    "claude_fit_justification": "Analysis failed - invalid data format"
-                }
-            
-            # Ensure required fields exist
-            if 'claude_fit_score' not in fit_score_data:
-                logger.warning(f"Missing claude_fit_score for {company_name}")
-                fit_score_data['claude_fit_score'] = 5
-            
-            if 'claude_fit_justification' not in fit_score_data:
-                logger.warning(f"Missing claude_fit_justification for {company_name}")
-                fit_score_data['claude_fit_justification'] = "Justification not provided"
-            
-            with log_expander:
-                st.json(fit_score_data) # Display the raw JSON response from the analyzer
-
-            # Update the item with the analysis results
-            item.update(fit_score_data)
-            processed_data.append(item)
-            
-            logger.info(f"Successfully processed {company_name}: score={fit_score_data.get('claude_fit_score', 'N/A')}")
-            
-        except Exception as e:
-            logger.error(f"Error processing startup {i+1}/{total_items} ({company_name}): {e}")
-            logger.error(f"Full traceback: {traceback.format_exc()}")
-            
-            with log_expander:
-                st.error(f"❌ Failed to analyze {company_name}: {str(e)}")
-            
-            # Add error data to the item
-            error_data = {
-                "claude_fit_score": 5,
-                "claude_fit_justification": f"Analysis failed: {str(e)}"
-            }
-            item.update(error_data)
-            processed_data.append(item)
-        
-        # Update progress bar
-        progress_text = f"Analyzing startup {i+1}/{total_items}: {company_name}"
-        progress_bar.progress((i + 1) / total_items, text=progress_text)
-        
-        # Add a small delay to avoid overwhelming the API and hitting rate limits
-        time.sleep(0.5)
-
-    progress_bar.empty()
-    
-    logger.info(f"Completed processing {len(processed_data)} startups")
-    return processed_data
-
 def display_startup_overview(df):
     """Display overview metrics and charts."""
     col1, col2, col3, col4 = st.columns(4)
@@ -433,31 +332,10 @@ def display_startup_overview(df):
 def display_startup_table(df):
     """Display the startup data in the requested format."""
     st.subheader("📊 Startup Data Overview")
-    
-    # Define the desired columns and their corresponding names in the DataFrame
-    column_config = {
-        "Company": "company",
-        "Description": "solution",
-        "Industry": "industry",
-        "Pain Point Addressed": "pain_point",
-        "Target Audience": "target_audience",
-        "Business Model": "business_model",
-        "Challenges": "challenges",
-        "Claude Integration Description": "claude_integration_description"
-    }
-    
-    # Create a new DataFrame with only the desired columns, if they exist
-    display_df = pd.DataFrame()
-    for display_name, internal_name in column_config.items():
-        if internal_name in df.columns:
-            display_df[display_name] = df[internal_name]
-        else:
-            # Add an empty column if the data doesn't exist, so the table structure is consistent
-            display_df[display_name] = "N/A"
-
-    st.dataframe(display_df, use_container_width=True)
+    display_df = get_display_df('overview', OVERVIEW_TABLE_COLUMNS, lambda internal_name: "N/A")
+    paginated_table(display_df, key='overview_table', filter_column="Industry")
 
-def chat_interface(analyzer, startups_data):
+def chat_interface(analyzer, startups_data, summary=None):
     """Main chat interface for asking questions about the data."""
     st.subheader("💬 Ask Claude About Your Startup Data")
 
@@ -485,11 +363,9 @@ def chat_interface(analyzer, startups_data):
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Get Claude's response
+        # Stream Claude's response so the first tokens render immediately
         with st.chat_message("assistant"):
-            with st.spinner("Claude is analyzing..."):
-                response = analyzer.analyze_startup_data(startups_data, prompt)
-                st.markdown(response)
+            response = st.write_stream(analyzer.stream_startup_data_analysis(startups_data, prompt, summary, get_retrieval_index()))
         
         # Add assistant response to chat history
         st.session_state.messages.append({"role": "assistant", "content": response})
@@ -510,14 +386,14 @@ def claude_fit_analyzer(analyzer, startups_data):
     
     with col1:
         selected_startup = st.selectbox("Select a startup to analyze:", startup_names)
-        
-        if st.button("Analyze Claude Fit", type="primary"):
-            with st.spinner("Analyzing Claude fit..."):
-                analysis = analyzer.get_claude_fit_analysis(selected_startup, startups_data)
-                st.session_state.claude_fit_analysis = analysis
+        run_analysis = st.button("Analyze Claude Fit", type="primary")
     
     with col2:
-        if 'claude_fit_analysis' in st.session_state:
+        if run_analysis:
+            st.markdown("### Claude Fit Analysis")
+            stream = analyzer.stream_claude_fit_analysis(selected_startup, startups_data, get_name_index())
+            st.session_state.claude_fit_analysis = st.write_stream(stream)
+        elif 'claude_fit_analysis' in st.session_state:
             st.markdown("### Claude Fit Analysis")
             st.markdown(st.session_state.claude_fit_analysis)
 
@@ -531,15 +407,15 @@ def sales_brief_generator(analyzer, startups_data):
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        selected_startup = st.selectbox("Select a startup for sales brief:", startup_names, key="sales_brief")
-        
-        if st.button("Generate Sales Brief", type="primary"):
-            with st.spinner("Generating sales brief..."):
-                brief = analyzer.generate_sales_brief(selected_startup, startups_data)
-                st.session_state.sales_brief = brief
+        selected_startup = st.selectbox("Select a startup for sales brief:", startup_names, key="sales_brief_startup")
+        run_brief = st.button("Generate Sales Brief", type="primary")
     
     with col2:
-        if 'sales_brief' in st.session_state:
+        if run_brief:
+            st.markdown("### Sales Brief")
+            stream = analyzer.stream_sales_brief(selected_startup, startups_data, get_name_index())
+            st.session_state.sales_brief = st.write_stream(stream)
+        elif 'sales_brief' in st.session_state:
             st.markdown("### Sales Brief")
             st.markdown(st.session_state.sales_brief)
 
@@ -554,34 +430,33 @@ def prompt_generator(analyzer, startups_data):
     
     with col1:
         selected_startup = st.selectbox("Select a startup for prompt ideas:", startup_names, key="prompt_gen")
-        
-        if st.button("Generate Prompt Ideas", type="primary"):
-            with st.spinner("Generating prompt ideas..."):
-                prompts = analyzer.generate_prompt_ideas(selected_startup, startups_data)
-                st.session_state.prompt_ideas = prompts
+        run_prompts = st.button("Generate Prompt Ideas", type="primary")
     
     with col2:
-        if 'prompt_ideas' in st.session_state:
+        if run_prompts:
+            st.markdown("### Claude Prompt Ideas")
+            stream = analyzer.stream_prompt_ideas(selected_startup, startups_data, get_name_index())
+            st.session_state.prompt_ideas = st.write_stream(stream)
+        elif 'prompt_ideas' in st.session_state:
             st.markdown("### Claude Prompt Ideas")
             st.markdown(st.session_state.prompt_ideas)
 
-def quick_insights(df):
-    """Display quick insights and top performers."""
+def quick_insights(summary):
+    """Display quick insights and top performers from the precomputed summary."""
     st.subheader("🚀 Quick Insights")
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### Top Claude Fit Startups")
-        if 'claude_fit_score' in df.columns:
-            # Sort by Claude fit score
-            sorted_df = df.sort_values('claude_fit_score', ascending=False).head(5)
-            for i, (_, row) in enumerate(sorted_df.iterrows(), 1):
-                company = row.get('company', 'Unknown')
-                score = row.get('claude_fit_score', 'N/A')
-                industry = row.get('industry', 'N/A')
-                pain_point = row.get('pain_point', 'N/A')
-                features = row.get('claude_features', ['General AI'])
+        top_startups = summary.top_startups(5)
+        if top_startups:
+            for i, startup in enumerate(top_startups, 1):
+                company = startup.get('company', 'Unknown')
+                score = startup.get('claude_fit_score', 'N/A')
+                industry = startup.get('industry', 'N/A')
+                pain_point = startup.get('pain_point', 'N/A')
+                features = startup.get('claude_features', ['General AI'])
                 
                 if isinstance(features, str):
                     features = [features]
@@ -597,122 +472,377 @@ def quick_insights(df):
     
     with col2:
         st.markdown("### Industry Breakdown")
-        if 'industry' in df.columns and 'claude_fit_score' in df.columns:
-            industry_stats = df.groupby('industry').agg({
-                'claude_fit_score': ['mean', 'count']
-            }).round(1)
-            industry_stats.columns = ['Avg Fit Score', 'Count']
-            industry_stats = industry_stats.sort_values('Avg Fit Score', ascending=False)
-            st.dataframe(industry_stats, use_container_width=True)
-        elif 'industry' in df.columns:
+        industry_breakdown = summary.industry_breakdown()
+        if industry_breakdown:
+            industry_stats = pd.DataFrame(industry_breakdown, columns=['industry', 'Avg Fit Score', 'Count']).set_index('industry')
+            st.dataframe(industry_stats.round(1), use_container_width=True)
+        elif summary.industry_counts:
             # Just show industry counts
-            industry_counts = df['industry'].value_counts()
+            industry_counts = pd.Series(dict(summary.industry_counts.most_common()), name='count')
             st.dataframe(industry_counts, use_container_width=True)
         else:
             st.info("Industry data not available for breakdown")
 
-def data_upload_section():
-    """Section for uploading custom startup data."""
-    st.subheader("📁 Upload Your Own Startup Data")
-    
-    uploaded_file = st.file_uploader(
-        "Choose a CSV or Excel file with startup data",
-        type=['csv', 'xlsx', 'xls'],
-        help="Upload a spreadsheet with columns: company, industry, business_model, target_audience, pain_point, solution, stage, team_size, tech_stack, use_case"
-    )
-    
-    if uploaded_file is not None:
-        # Check if this file has been processed already
-        if st.session_state.get('last_uploaded_file') != uploaded_file.name:
-            data = parse_uploaded_file(uploaded_file)
-            if data:
-                st.info(f"File '{uploaded_file.name}' loaded. Now analyzing with Claude...")
-                processed_data = process_data_with_claude(get_analyzer(), data)
-                st.session_state.startups_data = processed_data
-                st.session_state.last_uploaded_file = uploaded_file.name
-                st.success("✅ Claude analysis complete!")
-                st.rerun()
-    
-    return None
-
-def display_visual_dashboard(df):
-    """Display the visual dashboard with metrics and charts."""
+def display_visual_dashboard(summary):
+    """Display the visual dashboard with metrics and charts from the precomputed summary."""
     st.subheader("📊 Visual Dashboard")
     
     # --- Metrics Row ---
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Startups", len(df))
+        st.metric("Total Startups", summary.total)
     with col2:
-        if 'claude_fit_score' in df.columns:
-            st.metric("Avg. Claude Fit", f"{df['claude_fit_score'].mean():.1f}/10")
+        if summary.average_score is not None:
+            st.metric("Avg. Claude Fit", f"{summary.average_score:.1f}/10")
         else:
             st.metric("Avg. Claude Fit", "N/A")
     with col3:
-        if 'business_model' in df.columns:
-            b2b_count = df['business_model'].str.contains('B2B', case=False, na=False).sum()
-            st.metric("B2B Companies", b2b_count)
+        if summary.business_model_counts:
+            st.metric("B2B Companies", summary.b2b_count)
         else:
             st.metric("B2B Companies", "N/A")
     with col4:
-        if 'industry' in df.columns and not df['industry'].dropna().empty:
-            st.metric("Top Industry", df['industry'].mode()[0])
+        if summary.top_industry is not None:
+            st.metric("Top Industry", summary.top_industry)
         else:
             st.metric("Top Industry", "N/A")
 
     # --- Charts Row ---
     col1, col2 = st.columns(2)
     with col1:
-        if 'industry' in df.columns and not df['industry'].dropna().empty:
+        if summary.industry_counts:
             st.markdown("##### Startups by Industry")
-            industry_counts = df['industry'].value_counts()
+            industry_counts = pd.Series(dict(summary.industry_counts.most_common()))
             fig = px.bar(industry_counts, x=industry_counts.values, y=industry_counts.index, orientation='h', labels={'x':'Count', 'y':''})
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No industry data to display.")
             
     with col2:
-        if 'claude_fit_score' in df.columns:
+        if summary.score_histogram:
             st.markdown("##### Claude Fit Score Distribution")
-            fig = px.histogram(df, x='claude_fit_score', nbins=10, labels={'claude_fit_score':'Claude Fit Score'})
+            scores = sorted(summary.score_histogram)
+            fig = px.bar(x=scores, y=[summary.score_histogram[score] for score in scores], labels={'x':'Claude Fit Score', 'y':'count'})
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No Claude Fit Score data to display.")
 
-def display_detailed_table(df):
-    """Display a detailed table with custom columns, ensuring all columns exist."""
-    st.subheader("📑 Detailed Startup Data")
+def _missing_detail_value(internal_name):
+    if 'justification' in internal_name or 'score' in internal_name:
+        # The column is missing entirely, which means a step failed.
+        return "AI analysis did not run or failed."
+    return "Column not found in source file."
 
-    # Define the full set of columns we expect to see in the final table.
-    all_columns = {
-        "Company": "company",
-        "Description": "solution",
-        "Industry": "industry",
-        "Pain Point Addressed": "pain_point",
-        "Claude Fit Score": "claude_fit_score",
-        "Claude Fit Justification": "claude_fit_justification",
-        "Target Audience": "target_audience",
-        "Business Model": "business_model",
-    }
+def _project_display_df(df, columns, missing_value):
+    """Select and rename ``columns`` in display order, filling any missing column with ``missing_value(field)``."""
+    projected = {}
+    for display_name, internal_name in columns.items():
+        if internal_name in df.columns:
+            projected[display_name] = df[internal_name]
+        else:
+            projected[display_name] = missing_value(internal_name)
+    display_df = pd.DataFrame(projected, index=pd.RangeIndex(len(df)))
+    for column in CATEGORICAL_TABLE_COLUMNS:
+        if column in display_df.columns:
+            display_df[column] = display_df[column].astype('category')
+    return display_df
+
+def get_display_df(name, columns, missing_value):
+    """Return the projected frame for a table, built once per dataset and reused across reruns."""
+    display_dfs = st.session_state.setdefault('display_dfs', {})
+    if name not in display_dfs:
+        display_dfs[name] = _project_display_df(get_startups_df(), columns, missing_value)
+    return display_dfs[name]
+
+def _table_view(display_df, key, search, selected, sort_by, descending):
+    """
+    Row positions matching the table's filters, in display order.
+    
+    The last view of each table is kept in session state, so changing pages does not
+    filter or sort again.
+    """
+    views = st.session_state.setdefault('table_views', {})
+    params = (search, selected, sort_by, descending)
+    cached = views.get(key)
+    if cached is not None and cached[0] == params:
+        return cached[1]
+    
+    mask = pd.Series(True, index=display_df.index)
+    if search:
+        if f"{key}_text" not in views:
+            # Lower-cased text of every row, built on the first search
+            row_text = display_df.iloc[:, 0].astype(str)
+            for column in display_df.columns[1:]:
+                row_text = row_text + " " + display_df[column].astype(str)
+            views[f"{key}_text"] = row_text.str.lower()
+        mask &= views[f"{key}_text"].str.contains(search.lower(), regex=False)
+    if selected:
+        mask &= display_df[selected[0]].isin(selected[1])
+    filtered = display_df[mask]
+    
+    if sort_by in filtered.columns:
+        column = filtered[sort_by]
+        if pd.api.types.is_numeric_dtype(column):
+            sort_key = pd.to_numeric(column, errors='coerce')
+        else:
+            sort_key = column.astype(str).str.lower()
+        filtered = filtered.iloc[sort_key.reset_index(drop=True).sort_values(
+            ascending=not descending, kind='stable', na_position='last').index]
     
-    display_df = df.copy()
+    positions = filtered.index.to_numpy()
+    views[key] = (params, positions)
+    return positions
 
-    # Ensure all expected columns exist, filling with descriptive errors if they don't.
-    for display_name, internal_name in all_columns.items():
-        if internal_name not in display_df.columns:
-            # The column is missing entirely, which means a step failed.
-            # Provide a helpful default message.
-            if 'justification' in internal_name or 'score' in internal_name:
-                display_df[internal_name] = "AI analysis did not run or failed."
-            else:
-                display_df[internal_name] = "Column not found in source file."
+def paginated_table(display_df, key, filter_column=None):
+    """
+    Show a searchable, filterable, sortable table one page at a time.
+    
+    Only the rows on the current page are sent to the browser.
+    """
+    col_search, col_filter, col_sort, col_order = st.columns([3, 3, 2, 1])
+    search = col_search.text_input("🔍 Search", key=f"{key}_search", placeholder="Any text in the table")
+    selected = None
+    if filter_column in display_df.columns:
+        column = display_df[filter_column]
+        options = list(column.cat.categories) if isinstance(column.dtype, pd.CategoricalDtype) else sorted(column.dropna().unique())
+        chosen = col_filter.multiselect(filter_column, options, key=f"{key}_filter")
+        selected = (filter_column, tuple(chosen)) if chosen else None
+    sort_by = col_sort.selectbox("Sort by", ["Original order"] + list(display_df.columns), key=f"{key}_sort")
+    descending = col_order.toggle("Desc", key=f"{key}_desc")
+    
+    positions = _table_view(display_df, key, search.strip(), selected, sort_by, descending)
+    
+    col_size, col_page, col_info = st.columns([1, 1, 4])
+    page_size = col_size.selectbox("Rows per page", TABLE_PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, -(-len(positions) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col_page.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(positions))
+    filtered_note = f" (filtered from {len(display_df):,})" if len(positions) != len(display_df) else ""
+    col_info.caption(f"Showing {start + 1 if end else 0:,}–{end:,} of {len(positions):,} startups{filtered_note}")
+    
+    st.dataframe(display_df.iloc[positions[start:end]], hide_index=True, use_container_width=True)
+
+@st.fragment
+def display_detailed_table():
+    """
+    Display the detailed startup table.
+    
+    Runs as a fragment: searching, sorting and paging rerun only the table.
+    """
+    st.subheader("📑 Detailed Startup Data")
+    display_df = get_display_df('detailed', DETAILED_TABLE_COLUMNS, _missing_detail_value)
+    paginated_table(display_df, key='detailed_table', filter_column="Industry")
+
+def combined_metrics(analyzer):
+    """
+    Merge this app's Claude metrics with those reported by the scoring workers.
 
-    # Select and rename columns for the final display order.
-    final_display_df = pd.DataFrame()
-    for display_name, internal_name in all_columns.items():
-        final_display_df[display_name] = display_df[internal_name]
+    Args:
+        analyzer: The app's ClaudeAnalyzer
 
-    st.dataframe(final_display_df, use_container_width=True)
+    Returns:
+        Tuple of (ClaudeMetrics, scheduler stats) covering the app and every worker
+    """
+    metrics = ClaudeMetrics()
+    metrics.merge_state(analyzer.metrics.to_state(max_latencies=LATENCY_WINDOW))
+    scheduler_stats = dict(analyzer.scheduler.stats())
+    for report in get_job_queue().worker_metrics():
+        metrics.merge_state(report['metrics'])
+        scheduler_stats['retries'] += report['scheduler'].get('retries', 0)
+        scheduler_stats['throttled'] += report['scheduler'].get('throttled', 0)
+    return metrics, scheduler_stats
+
+def display_diagnostics_panel(analyzer):
+    """Sidebar panel with per-method, per-model latency, token usage, errors and estimated cost of Claude calls."""
+    with st.sidebar.expander("🩺 Diagnostics", expanded=False):
+        if not analyzer:
+            st.info("Analyzer not available.")
+            return
+        
+        # Background scoring runs in a worker process, so its requests are merged in from the job queue
+        metrics, scheduler_stats = combined_metrics(analyzer)
+        rows = metrics.snapshot()
+        cache_stats = analyzer.cache.stats()
+        
+        col1, col2 = st.columns(2)
+        col1.metric("Est. Cost", f"${metrics.total_cost():.4f}")
+        col2.metric("Cache Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        col1.metric("Concurrency", f"{scheduler_stats['window']:.1f}")
+        col2.metric("Retries", scheduler_stats['retries'])
+        col1.metric("Prompt Cache Reads", f"{metrics.prompt_cache_read_ratio():.0%}",
+                    help="Share of prompt tokens served from Claude's prompt cache")
+        col2.metric("Throttled", scheduler_stats['throttled'])
+        
+        if rows:
+            metrics_df = pd.DataFrame(rows).drop(columns=['errors_by_type'])
+            st.dataframe(metrics_df, hide_index=True, use_container_width=True)
+            errors = {f"{row['method']} ({row['model']}) / {error_type}": count
+                      for row in rows for error_type, count in row['errors_by_type'].items()}
+            if errors:
+                st.caption("Errors by type")
+                st.json(errors)
+        else:
+            st.caption("No Claude requests yet.")
+        
+        st.download_button(
+            "⬇️ Prometheus metrics",
+            data=analyzer.prometheus_metrics(metrics, scheduler_stats),
+            file_name="claude_metrics.prom",
+            mime="text/plain"
+        )
+
+def set_startups_data(startups_data, summary=None):
+    """Store analyzed startups with their summary, invalidating the cached DataFrames."""
+    st.session_state.startups_data = startups_data
+    st.session_state.startup_summary = summary if summary is not None else StartupSummary.from_startups(startups_data)
+    st.session_state.pop('startups_df', None)
+    st.session_state.pop('display_dfs', None)
+    st.session_state.pop('table_views', None)
+    st.session_state.pop('name_index', None)
+    st.session_state.pop('retrieval_index', None)
+
+@st.cache_resource
+def get_lead_store():
+    """Return the persistent store of scored leads, shared by all sessions."""
+    return LeadStore()
+
+@st.cache_resource
+def get_job_queue():
+    """Return the SQLite-backed scoring job queue shared with the worker process."""
+    return JobQueue()
+
+@st.cache_resource
+def _start_scoring_worker():
+    """Start one scoring worker process for this server, unless workers are run separately."""
+    if os.getenv('CLAUDE_SPAWN_WORKER', '1') == '0':
+        return None
+    worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_worker.py')
+    logger.info("Starting scoring worker process")
+    return subprocess.Popen([sys.executable, worker_script, '--parent-pid', str(os.getpid())])
+
+def ensure_scoring_worker():
+    """Make sure a worker is running, restarting it if it exited."""
+    worker = _start_scoring_worker()
+    if worker is not None and worker.poll() is not None:
+        logger.warning(f"Scoring worker exited with code {worker.returncode}, restarting")
+        _start_scoring_worker.clear()
+        _start_scoring_worker()
+
+def start_background_scoring(analyzer, startups, enrich=False, name=None):
+    """
+    Show ``startups`` immediately and queue any rows missing from the lead store for the worker.
+    
+    Rows still being scored keep their current (default) score until the job finishes.
+    """
+    startups = [item for item in startups if isinstance(item, dict)]
+    pending = get_lead_store().load_scored(startups, analyzer.scoring_model(enrich), enriched=enrich)
+    set_startups_data(startups)
+    if not pending:
+        return
+    if len(pending) < len(startups):
+        st.toast(f"♻️ Loaded {len(startups) - len(pending)} unchanged startups from previous analyses")
+    
+    ensure_scoring_worker()
+    job_id = get_job_queue().submit(startups, enrich=enrich, name=name)
+    st.session_state.setdefault('scoring_jobs', []).append(job_id)
+    st.session_state.active_job = job_id
+
+def update_job_summary(queue, job_id):
+    """
+    Add rows the worker scored since the last poll to the job's running summary.
+    
+    Args:
+        queue: Job queue the job belongs to
+        job_id: Scoring job to follow
+    
+    Returns:
+        StartupSummary of every row of the job scored so far
+    """
+    summaries = st.session_state.setdefault('job_summaries', {})
+    summary, position = summaries.get(job_id, (StartupSummary(), 0))
+    rows, position = queue.scored_since(job_id, position)
+    summary.update(rows)
+    summaries[job_id] = (summary, position)
+    return summary
+
+@st.fragment(run_every=2)
+def background_scoring_status(max_jobs=5):
+    """
+    Poll this session's scoring jobs.
+    
+    The most recently submitted job replaces the displayed data when it completes; earlier
+    jobs can be loaded with a button once they are done.
+    """
+    queue = get_job_queue()
+    active_job = st.session_state.get('active_job')
+    for job_id in reversed(st.session_state.scoring_jobs[-max_jobs:]):
+        job = queue.get(job_id)
+        if job is None:
+            continue
+        label = job['name'] or f"Job {job_id}"
+        
+        if job['status'] in ('queued', 'running'):
+            state = "Queued" if job['status'] == 'queued' else "Scoring"
+            st.progress(job['completed'] / max(1, job['total']),
+                        text=f"⏳ {state} {label}: {job['completed']}/{job['total']} startups analyzed. Scores shown are provisional.")
+            if job_id == active_job and job['completed']:
+                summary = update_job_summary(queue, job_id)
+                with st.expander("👀 Partial results"):
+                    if summary.score_count:
+                        st.caption(f"Average fit score so far: {summary.average_score:.1f}/10 · "
+                                   f"Top industry: {summary.top_industry or 'N/A'}")
+                    partial = queue.results(job_id, scored_only=True, limit=200)
+                    st.dataframe(pd.DataFrame(partial), use_container_width=True)
+        elif job_id == active_job:
+            st.session_state.active_job = None
+            if job['status'] == 'done':
+                # The running summary already covers every scored row, so it is reused rather than rebuilt
+                summary = update_job_summary(queue, job_id)
+                set_startups_data(queue.results(job_id), summary=summary)
+                st.session_state.scoring_message = ("success", f"✅ Claude analysis of {label} complete!")
+                logger.info(f"Scoring job {job_id} completed")
+            else:
+                st.session_state.scoring_message = ("error", f"❌ Claude analysis of {label} failed: {job['error']}")
+                logger.error(f"Scoring job {job_id} failed: {job['error']}")
+            st.session_state.get('job_summaries', {}).pop(job_id, None)
+            st.rerun()
+        elif job['status'] == 'done':
+            if st.button(f"📂 Load results of {label}", key=f"load_job_{job_id}"):
+                set_startups_data(queue.results(job_id))
+                st.rerun()
+        else:
+            st.caption(f"❌ {label} failed: {job['error']}")
+
+def get_startup_summary():
+    """Return the cached summary of the current startups, building it if needed."""
+    if 'startup_summary' not in st.session_state:
+        st.session_state.startup_summary = StartupSummary.from_startups(st.session_state.startups_data)
+    return st.session_state.startup_summary
+
+def get_startups_df():
+    """Return the current startups as a DataFrame, cached across reruns."""
+    if 'startups_df' not in st.session_state:
+        st.session_state.startups_df = pd.DataFrame(st.session_state.startups_data)
+    return st.session_state.startups_df
+
+# Per-dataset indexes live in the session, never in the analyzer, which every session shares
+def get_name_index():
+    """Return this session's company-name index over the current startups, building it if needed."""
+    if 'name_index' not in st.session_state:
+        st.session_state.name_index = NameIndex(st.session_state.startups_data)
+    return st.session_state.name_index
+
+def get_retrieval_index():
+    """Return this session's chat retrieval index, or None when the data is small enough to send in full."""
+    if len(st.session_state.startups_data) <= RETRIEVAL_THRESHOLD:
+        return None
+    if 'retrieval_index' not in st.session_state:
+        st.session_state.retrieval_index = StartupIndex(st.session_state.startups_data)
+    return st.session_state.retrieval_index
 
 def main():
     """Main application function."""
@@ -736,39 +866,13 @@ def main():
         st.error("❌ Failed to initialize AI analyzer. Please check your configuration and try again.")
         st.stop()
 
-    # Perform a one-time API connection test per session.
-    if 'api_connection_tested' not in st.session_state:
-        logger.info("Testing API connection")
-        success, message = analyzer.test_api_connection()
-        if success:
-            st.toast(f"✅ {message}", icon="✅")
-            st.session_state.api_connection_tested = True
-            logger.info("API connection test successful")
-        else:
-            st.error(f"❌ API Connection Failed: {message}")
-            logger.error(f"API connection test failed: {message}")
-            st.stop()
-
     # --- Data Loading and Processing ---
-    # This block runs only once when the app starts or when the session is new.
+    # This block runs only once when the session is new. The sample data is shown right away
+    # (with any scores from the lead store) while the remaining rows are scored in the background.
     if 'startups_data' not in st.session_state:
-        logger.info("Loading and processing initial sample data.")
-        info_message = st.info("Analyzing sample startup data with Claude... this may take a moment.")
-        
-        initial_data_list = load_data()  # Returns a list of dicts
-        
-        if initial_data_list: # Check if the list is not empty
-            processed_data = process_data_with_claude(analyzer, initial_data_list)
-            st.session_state.startups_data = processed_data
-            logger.info("Initial data processing complete.")
-            
-            # Clear the info message and rerun to refresh the page
-            info_message.empty()
-            st.rerun()
-        else:
-            st.session_state.startups_data = []
-            logger.warning("Initial data loading returned no data.")
-            info_message.empty()
+        logger.info("Loading initial sample data.")
+        initial_data_list = [dict(startup) for startup in load_data()]  # Copies, so the sample is never mutated
+        start_background_scoring(analyzer, initial_data_list, name="sample data")
 
     # --- File Uploader ---
     uploaded_file = st.file_uploader(
@@ -776,6 +880,10 @@ def main():
         type=['csv', 'xlsx', 'xls'],
         help="Upload a spreadsheet with columns like: company, industry, pain_point, solution, etc."
     )
+    enrich = st.checkbox(
+        "Also infer challenges and Claude integration ideas",
+        help="Adds a likely challenge and a concrete Claude integration to each uploaded startup, generated in the same request as its fit score (one request per startup instead of batching)."
+    )
 
     if uploaded_file is not None:
         # Check if this file has been processed already to avoid reprocessing on every interaction
@@ -783,13 +891,9 @@ def main():
             logger.info(f"Processing uploaded file: {uploaded_file.name}")
             data = parse_uploaded_file(uploaded_file)
             if data:
-                st.info(f"📁 File '{uploaded_file.name}' loaded. Now analyzing with Claude...")
                 logger.info(f"Starting Claude analysis for {len(data)} startups")
-                processed_data = process_data_with_claude(analyzer, data)
-                st.session_state.startups_data = processed_data
+                start_background_scoring(analyzer, data, enrich=enrich, name=uploaded_file.name)
                 st.session_state.last_uploaded_file = uploaded_file.name
-                st.success("✅ Claude analysis complete!")
-                logger.info("Claude analysis completed successfully")
                 st.rerun()
             else:
                 st.error("❌ Failed to parse uploaded file. Please check the file format.")
@@ -801,17 +905,34 @@ def main():
         st.warning("No startup data to display. Please upload a file or check your sample data.")
         st.stop()
         
-    df = pd.DataFrame(st.session_state.startups_data)
+    summary = get_startup_summary()
+    df = get_startups_df()
     logger.info(f"Displaying data for {len(df)} startups")
 
     # --- Main Layout ---
-    display_visual_dashboard(df)
+    if 'scoring_message' in st.session_state:
+        level, message = st.session_state.pop('scoring_message')
+        getattr(st, level)(message)
+    if st.session_state.get('scoring_jobs'):
+        background_scoring_status()
+    display_diagnostics_panel(analyzer)
+    display_visual_dashboard(summary)
+    st.markdown("---")
+    display_detailed_table()
+
+    # --- Per-Startup Tools ---
     st.markdown("---")
-    display_detailed_table(df)
+    fit_tab, brief_tab, prompt_tab = st.tabs(["🎯 Claude Fit", "📝 Sales Brief", "🤖 Prompt Ideas"])
+    with fit_tab:
+        claude_fit_analyzer(analyzer, st.session_state.startups_data)
+    with brief_tab:
+        sales_brief_generator(analyzer, st.session_state.startups_data)
+    with prompt_tab:
+        prompt_generator(analyzer, st.session_state.startups_data)
 
     # --- Chat Section ---
     st.markdown("---")
-    chat_interface(analyzer, st.session_state.startups_data)
+    chat_interface(analyzer, st.session_state.startups_data, summary)
 
 if __name__ == "__main__":
     main() 
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the parsing, ingestion, scoring, enrichment and chat paths.
+
+Usage:
+    python benchmark.py --sizes 10 1000 50000
+
+Every run talks to fake_client.FakeAnthropic instead of the API, so it costs nothing and
+can be repeated to catch performance regressions. Reports throughput, request tail latency,
+the share of prompt tokens read from the prompt cache and peak Python memory per suite and dataset size.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import logging
+import tempfile
+import tracemalloc
+from typing import List, Dict
+
+import pandas as pd
+
+from claude_analyzer import ClaudeAnalyzer
+from fake_client import FakeAnthropic, INJECTABLE_ERRORS
+from metrics import ClaudeMetrics
+from request_scheduler import RequestScheduler
+from response_cache import ResponseCache
+from scoring_engine import score_startups
+from retrieval import StartupIndex
+from summary import StartupSummary
+from data_parsing import DEFAULT_CHUNK_SIZE, standardize_records, iter_standardized_chunks
+
+SUITES = ('parse', 'ingest', 'score', 'enrich', 'chat')
+CHAT_QUESTIONS = [
+    "Which healthcare startups are the best fit for Claude?",
+    "Summarize the top 5 most promising startups and why they are a good fit for Claude.",
+    "What are the common pain points of fintech companies?",
+]
+
+INDUSTRIES = ['SaaS', 'FinTech', 'HealthTech', 'EdTech', 'LegalTech', 'E-commerce', 'Logistics', 'Cybersecurity']
+BUSINESS_MODELS = ['B2B SaaS', 'B2C Subscription', 'Marketplace', 'B2B2C', 'Usage-based API']
+
+
+def make_dataset(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic upload with the column names a real spreadsheet would use."""
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        'Company': [f"Startup {i:06d}" for i in range(rows)],
+        'Industry': [rng.choice(INDUSTRIES) for _ in range(rows)],
+        'Business Model': [rng.choice(BUSINESS_MODELS) for _ in range(rows)],
+        'Target Audience': [rng.choice(['SMBs', 'Enterprises', 'Consumers', 'Developers']) for _ in range(rows)],
+        'Pain Point': [f"Manual {rng.choice(['reporting', 'onboarding', 'support', 'compliance'])} workflows" for _ in range(rows)],
+        'Product Description': [f"An AI platform that automates {rng.choice(['documents', 'tickets', 'claims', 'contracts'])}" for _ in range(rows)],
+    })
+
+
+def _make_analyzer(args) -> ClaudeAnalyzer:
+    client = FakeAnthropic(
+        latency_median=args.latency_ms / 1000,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_types=args.error_types,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    scheduler = RequestScheduler(max_concurrency=args.max_in_flight)
+    return ClaudeAnalyzer(cache=ResponseCache(':memory:'), scheduler=scheduler,
+                          metrics=ClaudeMetrics(), client=client)
+
+
+def run_suite(suite: str, rows: int, args) -> Dict:
+    """Run one suite at one dataset size and return its measurements."""
+    raw = make_dataset(rows, seed=args.seed)
+    offline = suite in ('parse', 'ingest')
+    startups = None if offline else standardize_records(raw)[0]
+    analyzer = None if offline else _make_analyzer(args)
+    if suite == 'ingest':
+        # Chunked ingestion reads from disk, so the CSV is written before measuring
+        csv_file = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        csv_file.close()
+        raw.to_csv(csv_file.name, index=False)
+        del raw
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    if suite == 'parse':
+        standardize_records(raw)
+        items = rows
+    elif suite == 'ingest':
+        # Records are consumed and dropped chunk by chunk, as a downstream writer would
+        for _ in iter_standardized_chunks(csv_file.name, csv_file.name, args.chunk_size):
+            pass
+        items = rows
+    elif suite in ('score', 'enrich'):
+        score_startups(analyzer, startups, max_in_flight=args.max_in_flight,
+                       requests_per_second=args.requests_per_second,
+                       batch_mode=suite == 'score', enrich=suite == 'enrich')
+        items = len(startups)
+    else:
+        # Built once per dataset, as the app does per session
+        index = StartupIndex(startups)
+        summary = StartupSummary.from_startups(startups)
+        for question in CHAT_QUESTIONS:
+            analyzer.analyze_startup_data(startups, question, summary, index)
+        items = len(CHAT_QUESTIONS)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if suite == 'ingest':
+        os.remove(csv_file.name)
+
+    result = {
+        'suite': suite,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'throughput': round(items / elapsed, 1) if elapsed else None,
+        'unit': 'queries/s' if suite == 'chat' else 'rows/s',
+        'requests': 0,
+        'errors': 0,
+        'prompt_cache_read': None,
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'peak_mb': round(peak / 1024 / 1024, 1),
+    }
+    if analyzer is not None:
+        method_rows = analyzer.metrics.snapshot()
+        result['requests'] = sum(row['requests'] for row in method_rows)
+        result['errors'] = sum(row['errors'] for row in method_rows)
+        result['prompt_cache_read'] = round(analyzer.metrics.prompt_cache_read_ratio(), 3)
+        # Tail latency of the method that dominates the suite
+        busiest = max(method_rows, key=lambda row: row['requests'], default=None)
+        if busiest and busiest['p50_s'] is not None:
+            for key in ('p50', 'p95', 'p99'):
+                result[f'{key}_ms'] = round(busiest[f'{key}_s'] * 1000, 1)
+    return result
+
+
+def _print_table(results: List[Dict]):
+    header = f"{'suite':<8}{'rows':>8}{'seconds':>10}{'throughput':>18}  {'requests':>9}{'errors':>8}{'cached':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        fmt = lambda value: '-' if value is None else value
+        pct = lambda value: '-' if value is None else f"{value:.0%}"
+        print(f"{r['suite']:<8}{r['rows']:>8}{r['seconds']:>10}{str(r['throughput']) + ' ' + r['unit']:>18}  "
+              f"{r['requests']:>9}{r['errors']:>8}{pct(r['prompt_cache_read']):>8}{fmt(r['p50_ms']):>9}{fmt(r['p95_ms']):>9}{fmt(r['p99_ms']):>9}{r['peak_mb']:>9}")
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark SalesAssist against a fake Claude client")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 50000], help="Dataset sizes (default: 10 1000 50000)")
+    parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES), help="Suites to run (default: all)")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Median fake request latency in milliseconds")
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help="Log-normal latency shape; higher means heavier tails")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability that a fake request fails")
+    parser.add_argument('--error-types', nargs='+', choices=list(INJECTABLE_ERRORS), default=['rate_limit'], help="Errors to inject")
+    parser.add_argument('--retry-after', type=float, default=None, help="retry-after seconds sent with injected 429/529 errors")
+    parser.add_argument('--max-in-flight', type=int, default=32, help="Scoring worker threads and concurrency ceiling")
+    parser.add_argument('--requests-per-second', type=float, default=1000.0, help="Token-bucket request rate")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk for the ingest suite")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for data, latency and errors")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+    try:
+        for rows in args.sizes:
+            for suite in args.suites:
+                print(f"⏱️  {suite} x {rows} rows...", file=sys.stderr)
+                results.append(run_suite(suite, rows, args))
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; reporting completed runs.", file=sys.stderr)
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1254 @@
+"""
+Claude-powered startup analysis engine.
+Handles API calls to Claude for startup insights and sales strategy.
+"""
+
+import os
+import json
+import pandas as pd
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable
+import anthropic
+from anthropic import Anthropic
+from dotenv import load_dotenv
+import time
+import logging
+import traceback
+
+from response_cache import ResponseCache
+from request_scheduler import RequestScheduler
+from metrics import ClaudeMetrics, default_metrics
+from retrieval import StartupIndex
+from dedup import NameIndex
+from summary import StartupSummary
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Stable prompt prefixes (system prompts, and the dataset block of chat questions) are marked for
+# Anthropic's prompt cache, so repeated requests read them at a fraction of the input price.
+# Prefixes below the model's minimum cacheable length are simply processed as normal input.
+PROMPT_CACHING = os.getenv('CLAUDE_PROMPT_CACHING', '1') != '0'
+
+# Model routing: cheap structured tasks go to the small model, long-form writing to the large one.
+# A route is 'small', 'large' or an explicit model id; methods without a route use the large model.
+# Override per method with e.g. CLAUDE_ROUTES="get_claude_fit_score=large,generate_sales_brief=claude-3-opus-20240229"
+LARGE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-3-5-sonnet-20241022')
+SMALL_MODEL = os.getenv('CLAUDE_SMALL_MODEL', 'claude-3-5-haiku-20241022')
+DEFAULT_ROUTES = {
+    'get_claude_fit_score': 'small',
+    'get_claude_fit_scores_batch': 'small',
+    'enrich_startup_data': 'small',
+    'analyze_startup': 'small',
+}
+
+
+def _parse_routes(spec: str) -> Dict[str, str]:
+    """Parse a 'method=route,method=route' string into a routing table."""
+    routes = {}
+    for entry in spec.split(','):
+        if '=' in entry:
+            method, route = entry.split('=', 1)
+            routes[method.strip()] = route.strip()
+    return routes
+
+
+ROUTES = {**DEFAULT_ROUTES, **_parse_routes(os.getenv('CLAUDE_ROUTES', ''))}
+
+# Batch scoring budget: startups are packed into one request until either limit is reached
+BATCH_MAX_INPUT_TOKENS = 6000
+BATCH_MAX_SIZE = 25
+BATCH_OUTPUT_TOKENS_PER_STARTUP = 120
+BATCH_MAX_OUTPUT_TOKENS = 4096
+
+# Chat context: datasets larger than the threshold send only the top-k relevant startups
+RETRIEVAL_THRESHOLD = 50
+RETRIEVAL_TOP_K = 25
+
+# Combined score-and-enrich response: every key is required, text fields fall back to a placeholder
+ANALYSIS_SCHEMA = {
+    'claude_fit_score': int,
+    'claude_fit_justification': str,
+    'challenges': str,
+    'claude_integration_description': str,
+}
+ANALYSIS_PLACEHOLDERS = {
+    'challenges': "Could not identify specific challenges.",
+    'claude_integration_description': "Could not provide integration description.",
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+class ClaudeAnalyzer:
+    def __init__(self, cache: Optional[ResponseCache] = None, scheduler: Optional[RequestScheduler] = None,
+                 metrics: Optional[ClaudeMetrics] = None, client=None,
+                 routes: Optional[Dict[str, str]] = None):
+        """
+        Initialize the Claude analyzer with API key from environment.
+        
+        Args:
+            cache: Optional response cache; a persistent on-disk cache is created by default
+            scheduler: Optional request scheduler (retries and adaptive concurrency) shared by all calls
+            metrics: Optional metrics registry; defaults to the process-wide registry
+            client: Optional pre-built client (e.g. fake_client.FakeAnthropic); no API key is needed then
+            routes: Optional per-method routes ('small', 'large' or a model id) overriding ROUTES
+        """
+        try:
+            if client is None:
+                api_key = os.getenv('ANTHROPIC_API_KEY')
+                if not api_key:
+                    raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+                
+                # Retries are handled by the scheduler so backoff and concurrency are coordinated across threads
+                client = Anthropic(api_key=api_key, max_retries=0)
+            self.client = client
+            self.model = LARGE_MODEL
+            self.small_model = SMALL_MODEL
+            self.routes = {**ROUTES, **(routes or {})}
+            self.cache = cache if cache is not None else ResponseCache()
+            self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+            self.metrics = metrics if metrics is not None else default_metrics
+            logger.info("ClaudeAnalyzer initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize ClaudeAnalyzer: {e}")
+            raise
+
+    def model_for(self, method: str) -> str:
+        """The model a method's requests are routed to."""
+        route = self.routes.get(method, 'large')
+        if route == 'small':
+            return self.small_model
+        if route == 'large':
+            return self.model
+        return route
+
+    def scoring_model(self, enrich: bool = False) -> str:
+        """Model that scores startups (and enriches them with ``enrich``); scored leads are stored under it."""
+        return self.model_for('analyze_startup' if enrich else 'get_claude_fit_score')
+
+    def _request_params(self, system_prompt: str, user_message: str, max_tokens: int,
+                        user_prefix: str = "", model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the ``messages.create`` parameters for a single-turn request.
+        
+        The system prompt and ``user_prefix`` are sent as separate text blocks marked with
+        ``cache_control`` so their bytes, and therefore the cached prefix, never vary with the
+        per-request part of the message.
+        """
+        model = model or self.model
+        if not PROMPT_CACHING:
+            return dict(model=model, max_tokens=max_tokens, system=system_prompt,
+                        messages=[{"role": "user", "content": user_prefix + user_message}])
+        
+        cache_control = {"type": "ephemeral"}
+        content = user_message
+        if user_prefix:
+            content = [
+                {"type": "text", "text": user_prefix, "cache_control": cache_control},
+                {"type": "text", "text": user_message},
+            ]
+        return dict(
+            model=model,
+            max_tokens=max_tokens,
+            system=[{"type": "text", "text": system_prompt, "cache_control": cache_control}],
+            messages=[{"role": "user", "content": content}]
+        )
+
+    def _create_message(self, system_prompt: str, user_message: str, max_tokens: int,
+                        method: str = "unknown", user_prefix: str = "",
+                        validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Send a single-turn request to Claude, serving repeat requests from the response cache.
+        
+        The request goes to the model routed for ``method``. If that is not the large model and
+        the response fails ``validate``, the request is repeated on the large model.
+        
+        Args:
+            system_prompt: System prompt for the request
+            user_message: User message content
+            max_tokens: Maximum tokens to generate
+            method: Name of the calling method, used to label metrics
+            user_prefix: Stable start of the user message (e.g. the dataset), cached separately
+            validate: Optional check of the response text (e.g. that it parses as the expected JSON)
+            
+        Returns:
+            The response text, or an empty string if the model returned no content
+        """
+        model = self.model_for(method)
+        cache_key = self.cache.make_key(model, system_prompt, user_prefix + user_message, max_tokens)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("Serving Claude response from cache")
+            self.metrics.record_cache_hit(method, model)
+            return cached
+        
+        params = self._request_params(system_prompt, user_message, max_tokens, user_prefix, model)
+        response_text = self._send(method, params)
+        valid = validate is None or validate(response_text)
+        if not valid and model != self.model:
+            logger.warning(f"{method}: response from {model} failed validation, escalating to {self.model}")
+            self.metrics.record_escalation(method, model)
+            response_text = self._send(method, dict(params, model=self.model))
+            valid = validate(response_text)
+        
+        # Responses that fail validation are not cached, so the next attempt asks again
+        if response_text and valid:
+            self.cache.set(cache_key, response_text)
+        return response_text
+
+    def _send(self, method: str, params: Dict[str, Any]) -> str:
+        """Send one request through the scheduler and return its text."""
+        response = self.scheduler.call(self._timed_create, method, **params,
+                                       on_retry=lambda error: self.metrics.record_retry(method, params['model']))
+        if not response or not response.content:
+            return ""
+        return response.content[0].text
+
+    def _timed_create(self, method: str, **kwargs):
+        """Call ``client.messages.create`` once, recording latency, token usage and errors."""
+        started = time.monotonic()
+        try:
+            response = self.client.messages.create(**kwargs)
+        except Exception as e:
+            self.metrics.record_error(method, e, kwargs['model'])
+            raise
+        usage = getattr(response, 'usage', None)
+        self.metrics.record_request(method, kwargs['model'], time.monotonic() - started, usage)
+        self._log_prompt_cache_usage(method, usage)
+        return response
+
+    @staticmethod
+    def _log_prompt_cache_usage(method: str, usage):
+        cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        if cache_read or cache_write:
+            logger.debug(f"{method}: {cache_read} prompt tokens read from cache, {cache_write} written")
+
+    def prometheus_metrics(self, metrics: Optional[ClaudeMetrics] = None,
+                           scheduler_stats: Optional[Dict] = None) -> str:
+        """
+        Request metrics plus scheduler and response-cache state in Prometheus text format.
+
+        Args:
+            metrics: Metrics to export instead of this analyzer's (e.g. merged with scoring workers')
+            scheduler_stats: Scheduler counters to export instead of this analyzer's
+        """
+        metrics = metrics if metrics is not None else self.metrics
+        scheduler_stats = scheduler_stats if scheduler_stats is not None else self.scheduler.stats()
+        cache_stats = self.cache.stats()
+        return metrics.to_prometheus({
+            'claude_concurrency_window': scheduler_stats['window'],
+            'claude_in_flight_requests': scheduler_stats['in_flight'],
+            'claude_retries': scheduler_stats['retries'],
+            'claude_throttled_responses': scheduler_stats['throttled'],
+            'claude_response_cache_hit_rate': round(cache_stats['hit_rate'], 4),
+            'claude_response_cache_entries': cache_stats['entries'],
+            'claude_response_cache_size_bytes': cache_stats['size_bytes'],
+        })
+
+    def test_api_connection(self):
+        """Make a small test call to verify the API key and connection."""
+        try:
+            self.client.messages.create(
+                model=self.model,
+                max_tokens=10,
+                messages=[{"role": "user", "content": "Hello"}]
+            )
+            return True, "API Key is valid and connection is successful."
+        except Exception as e:
+            # Catch specific error types if possible, e.g., authentication errors
+            error_message = f"API Key is invalid or connection failed: {e}"
+            return False, error_message
+    
+    def _stream_message(self, system_prompt: str, user_message: str, max_tokens: int,
+                        method: str = "unknown", user_prefix: str = "") -> Iterator[str]:
+        """
+        Stream a single-turn request to Claude, yielding text deltas as they arrive.
+        
+        Cached responses are yielded in one piece, and completed streams are added to the cache.
+        Latency is measured from opening the stream to its last event.
+        """
+        model = self.model_for(method)
+        cache_key = self.cache.make_key(model, system_prompt, user_prefix + user_message, max_tokens)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info("Serving Claude response from cache")
+            self.metrics.record_cache_hit(method, model)
+            yield cached
+            return
+        
+        chunks = []
+        started = [0.0]
+        
+        def open_stream():
+            started[0] = time.monotonic()
+            return self.client.messages.stream(**self._request_params(system_prompt, user_message, max_tokens, user_prefix, model))
+        
+        def on_complete(stream):
+            final_message = stream.get_final_message() if hasattr(stream, 'get_final_message') else None
+            usage = getattr(final_message, 'usage', None)
+            self.metrics.record_request(method, model, time.monotonic() - started[0], usage)
+            self._log_prompt_cache_usage(method, usage)
+        
+        try:
+            for text in self.scheduler.stream(open_stream, on_complete=on_complete,
+                                              on_retry=lambda error: self.metrics.record_retry(method, model)):
+                chunks.append(text)
+                yield text
+        except Exception as e:
+            self.metrics.record_error(method, e, model)
+            raise
+        
+        response_text = "".join(chunks)
+        if response_text:
+            self.cache.set(cache_key, response_text)
+    
+    def _find_startup(self, startup_name: str, startups_data: List[Dict],
+                      name_index: Optional[NameIndex] = None) -> Optional[Dict]:
+        """
+        Find a startup by company name.
+        
+        The analyzer is shared across sessions, so it keeps no per-dataset state: callers that look up
+        names repeatedly pass a NameIndex built once for their data (e.g. in the session state).
+        """
+        if name_index is None:
+            name_index = NameIndex(startups_data)
+        return name_index.get(startup_name)
+    
+    def _startup_analysis_messages(self, startups_data: List[Dict], query: str,
+                                   summary: Optional[StartupSummary] = None,
+                                   index: Optional[StartupIndex] = None) -> Tuple[str, str, str]:
+        """
+        Build the system prompt, stable user prefix and question message for a question about the data.
+        
+        Small datasets are sent in full. Larger ones are reduced to aggregate statistics plus
+        the startups most relevant to the question, so the prompt size stays flat as the list grows.
+        The prefix holds the part that is the same for every question about the dataset, so
+        follow-up questions read it from the prompt cache.
+        """
+        system_prompt = self._get_system_prompt()
+        
+        if len(startups_data) <= RETRIEVAL_THRESHOLD:
+            # Convert data to a more readable format for Claude
+            data_summary = self._format_data_for_claude(startups_data)
+            
+            user_prefix = f"""
+Data about {len(startups_data)} startups:
+
+{data_summary}
+
+"""
+            user_message = f"""User Question: {query}
+
+Please provide a comprehensive analysis. Format your response in a clear, structured way.
+"""
+            return system_prompt, user_prefix, user_message
+        
+        # Callers asking several questions about the same data pass the index and summary they built once
+        if index is None:
+            index = StartupIndex(startups_data)
+        dataset_summary = summary if summary is not None else StartupSummary.from_startups(startups_data)
+        relevant_startups = index.select(query, top_k=RETRIEVAL_TOP_K)
+        logger.info(f"Selected {len(relevant_startups)} of {len(startups_data)} startups as chat context")
+        
+        user_prefix = f"""
+Data about {len(startups_data)} startups.
+
+Statistics for the full dataset:
+{dataset_summary.to_context()}
+
+"""
+        user_message = f"""The {len(relevant_startups)} startups most relevant to the question:
+
+{self._format_data_for_claude(relevant_startups)}
+
+User Question: {query}
+
+Please provide a comprehensive analysis. Format your response in a clear, structured way. Only the startups listed above are shown in detail; use the statistics for questions about the whole dataset.
+"""
+        return system_prompt, user_prefix, user_message
+    
+    def analyze_startup_data(self, startups_data: List[Dict], query: str,
+                             summary: Optional[StartupSummary] = None,
+                             index: Optional[StartupIndex] = None) -> str:
+        """
+        Analyze startup data using Claude based on user query.
+        
+        Args:
+            startups_data: List of startup dictionaries
+            query: User's question about the data
+            summary: Optional precomputed summary of startups_data, used as context for large datasets
+            index: Optional prebuilt retrieval index over startups_data, used to pick context for large datasets
+            
+        Returns:
+            Claude's analysis response
+        """
+        system_prompt, user_prefix, user_message = self._startup_analysis_messages(startups_data, query, summary, index)
+        
+        try:
+            return self._create_message(system_prompt, user_message, max_tokens=4000, method="analyze_startup_data",
+                                        user_prefix=user_prefix)
+        except Exception as e:
+            return f"Error communicating with Claude API: {str(e)}"
+    
+    def stream_startup_data_analysis(self, startups_data: List[Dict], query: str,
+                                     summary: Optional[StartupSummary] = None,
+                                     index: Optional[StartupIndex] = None) -> Iterator[str]:
+        """
+        Streaming variant of analyze_startup_data.
+        
+        Yields:
+            Text deltas of Claude's analysis response as they arrive
+        """
+        system_prompt, user_prefix, user_message = self._startup_analysis_messages(startups_data, query, summary, index)
+        
+        try:
+            yield from self._stream_message(system_prompt, user_message, max_tokens=4000, method="stream_startup_data_analysis",
+                                            user_prefix=user_prefix)
+        except Exception as e:
+            yield f"Error communicating with Claude API: {str(e)}"
+    
+    def _claude_fit_analysis_messages(self, startup: Dict) -> Tuple[str, str]:
+        """Build the system prompt and user message for a Claude fit analysis."""
+        system_prompt = self._get_claude_fit_prompt()
+        
+        user_message = f"""
+Analyze this startup for Claude product fit:
+
+Company: {startup['company']}
+Industry: {startup['industry']}
+Business Model: {startup['business_model']}
+Target Audience: {startup['target_audience']}
+Pain Point: {startup['pain_point']}
+Solution: {startup['solution']}
+Use Case: {startup['use_case']}
+Tech Stack: {startup['tech_stack']}
+
+Current Claude Fit Score: {startup['claude_fit_score']}/10
+Current Claude Features: {', '.join(startup['claude_features'])}
+
+Please provide:
+1. Detailed Claude product recommendations
+2. Specific Claude features that would benefit them most
+3. Discovery questions for sales calls
+4. Sample Claude prompts they could use
+5. Implementation suggestions
+"""
+        return system_prompt, user_message
+    
+    def get_claude_fit_analysis(self, startup_name: str, startups_data: List[Dict],
+                                name_index: Optional[NameIndex] = None) -> str:
+        """
+        Get detailed Claude fit analysis for a specific startup.
+        
+        Args:
+            startup_name: Name of the startup to analyze
+            startups_data: List of all startup data
+            name_index: Optional NameIndex over startups_data, reused across lookups
+            
+        Returns:
+            Detailed Claude fit analysis
+        """
+        startup = self._find_startup(startup_name, startups_data, name_index)
+        if not startup:
+            return f"Startup '{startup_name}' not found in the data."
+        
+        system_prompt, user_message = self._claude_fit_analysis_messages(startup)
+        
+        try:
+            return self._create_message(system_prompt, user_message, max_tokens=3000, method="get_claude_fit_analysis")
+        except Exception as e:
+            return f"Error analyzing Claude fit: {str(e)}"
+    
+    def stream_claude_fit_analysis(self, startup_name: str, startups_data: List[Dict],
+                                   name_index: Optional[NameIndex] = None) -> Iterator[str]:
+        """
+        Streaming variant of get_claude_fit_analysis.
+        
+        Yields:
+            Text deltas of the Claude fit analysis as they arrive
+        """
+        startup = self._find_startup(startup_name, startups_data, name_index)
+        if not startup:
+            yield f"Startup '{startup_name}' not found in the data."
+            return
+        
+        system_prompt, user_message = self._claude_fit_analysis_messages(startup)
+        
+        try:
+            yield from self._stream_message(system_prompt, user_message, max_tokens=3000, method="stream_claude_fit_analysis")
+        except Exception as e:
+            yield f"Error analyzing Claude fit: {str(e)}"
+    
+    def _sales_brief_messages(self, startup: Dict) -> Tuple[str, str]:
+        """Build the system prompt and user message for a sales brief."""
+        system_prompt = self._get_sales_brief_prompt()
+        
+        user_message = f"""
+Create a sales brief for outreach to this startup:
+
+Company: {startup['company']}
+Industry: {startup['industry']}
+Business Model: {startup['business_model']}
+Target Audience: {startup['target_audience']}
+Pain Point: {startup['pain_point']}
+Solution: {startup['solution']}
+Stage: {startup['stage']}
+Team Size: {startup['team_size']}
+Claude Fit Score: {startup['claude_fit_score']}/10
+
+Please provide:
+1. Email introduction template
+2. Key talking points for initial call
+3. Specific Claude value propositions
+4. Potential objections and responses
+5. Next steps and follow-up strategy
+"""
+        return system_prompt, user_message
+    
+    def generate_sales_brief(self, startup_name: str, startups_data: List[Dict],
+                             name_index: Optional[NameIndex] = None) -> str:
+        """
+        Generate a sales brief for outreach to a specific startup.
+        
+        Args:
+            startup_name: Name of the startup
+            startups_data: List of all startup data
+            name_index: Optional NameIndex over startups_data, reused across lookups
+            
+        Returns:
+            Sales brief with outreach strategy
+        """
+        startup = self._find_startup(startup_name, startups_data, name_index)
+        if not startup:
+            return f"Startup '{startup_name}' not found in the data."
+        
+        system_prompt, user_message = self._sales_brief_messages(startup)
+        
+        try:
+            return self._create_message(system_prompt, user_message, max_tokens=3000, method="generate_sales_brief")
+        except Exception as e:
+            return f"Error generating sales brief: {str(e)}"
+    
+    def stream_sales_brief(self, startup_name: str, startups_data: List[Dict],
+                           name_index: Optional[NameIndex] = None) -> Iterator[str]:
+        """
+        Streaming variant of generate_sales_brief.
+        
+        Yields:
+            Text deltas of the sales brief as they arrive
+        """
+        startup = self._find_startup(startup_name, startups_data, name_index)
+        if not startup:
+            yield f"Startup '{startup_name}' not found in the data."
+            return
+        
+        system_prompt, user_message = self._sales_brief_messages(startup)
+        
+        try:
+            yield from self._stream_message(system_prompt, user_message, max_tokens=3000, method="stream_sales_brief")
+        except Exception as e:
+            yield f"Error generating sales brief: {str(e)}"
+    
+    def _prompt_ideas_messages(self, startup: Dict) -> Tuple[str, str]:
+        """Build the system prompt and user message for prompt ideas."""
+        system_prompt = """You are a Claude prompt engineering expert helping startups create effective prompts for their use cases.
+
+For each startup, create:
+1. **Industry-Specific Prompts**: Prompts tailored to their business domain
+2. **Workflow Prompts**: Prompts for their specific pain points
+3. **Role-Based Prompts**: Prompts for different team members
+4. **Integration Prompts**: Prompts for their tech stack
+5. **Advanced Prompts**: Complex prompts for sophisticated use cases
+
+Make prompts practical, specific, and ready-to-use."""
+        
+        user_message = f"""
+Generate Claude prompt ideas for this startup:
+
+Company: {startup['company']}
+Industry: {startup['industry']}
+Business Model: {startup['business_model']}
+Target Audience: {startup['target_audience']}
+Pain Point: {startup['pain_point']}
+Solution: {startup['solution']}
+Use Case: {startup['use_case']}
+Tech Stack: {startup['tech_stack']}
+
+Please provide:
+1. 5-10 specific Claude prompts they could use immediately
+2. Prompts for different use cases (customer support, data analysis, content creation, etc.)
+3. Prompts tailored to their industry and pain points
+4. Advanced prompts for complex workflows
+5. Tips for optimizing these prompts
+"""
+        return system_prompt, user_message
+    
+    def generate_prompt_ideas(self, startup_name: str, startups_data: List[Dict],
+                              name_index: Optional[NameIndex] = None) -> str:
+        """
+        Generate Claude prompt ideas for a specific startup.
+        
+        Args:
+            startup_name: Name of the startup
+            startups_data: List of all startup data
+            name_index: Optional NameIndex over startups_data, reused across lookups
+            
+        Returns:
+            Prompt ideas and examples
+        """
+        startup = self._find_startup(startup_name, startups_data, name_index)
+        if not startup:
+            return f"Startup '{startup_name}' not found in the data."
+        
+        system_prompt, user_message = self._prompt_ideas_messages(startup)
+        
+        try:
+            return self._create_message(system_prompt, user_message, max_tokens=3000, method="generate_prompt_ideas")
+        except Exception as e:
+            return f"Error generating prompt ideas: {str(e)}"
+    
+    def stream_prompt_ideas(self, startup_name: str, startups_data: List[Dict],
+                            name_index: Optional[NameIndex] = None) -> Iterator[str]:
+        """
+        Streaming variant of generate_prompt_ideas.
+        
+        Yields:
+            Text deltas of the prompt ideas as they arrive
+        """
+        startup = self._find_startup(startup_name, startups_data, name_index)
+        if not startup:
+            yield f"Startup '{startup_name}' not found in the data."
+            return
+        
+        system_prompt, user_message = self._prompt_ideas_messages(startup)
+        
+        try:
+            yield from self._stream_message(system_prompt, user_message, max_tokens=3000, method="stream_prompt_ideas")
+        except Exception as e:
+            yield f"Error generating prompt ideas: {str(e)}"
+    
+    def enrich_startup_data(self, startup_info: Dict) -> Dict:
+        """
+        Enrich startup data with inferred challenges and Claude integration ideas,
+        role-playing as a senior Anthropic Sales Engineer.
+        """
+        # Input validation
+        if not startup_info:
+            logger.error("startup_info is None or empty in enrich_startup_data")
+            return {
+                'challenges': "No startup data provided for enrichment.",
+                'claude_integration_description': "No startup data provided for enrichment."
+            }
+        
+        if not isinstance(startup_info, dict):
+            logger.error(f"startup_info is not a dict in enrich_startup_data, got {type(startup_info)}")
+            return {
+                'challenges': "Invalid startup data format for enrichment.",
+                'claude_integration_description': "Invalid startup data format for enrichment."
+            }
+        
+        # Validate required fields
+        company = startup_info.get('company', '')
+        if not company or company == 'N/A':
+            logger.warning("Company name is missing or invalid in enrich_startup_data")
+            company = "Unknown Company"
+        
+        logger.info(f"Starting data enrichment for: {company}")
+        
+        system_prompt = """
+You are a top-tier, senior Sales Engineer at Anthropic. Your expertise lies in deeply understanding a startup's business and technical landscape and identifying the most valuable and impactful ways they can leverage Claude. You have a master-level understanding of all Claude models and features.
+
+Your task is to analyze a startup based on limited data and provide two key insights. Your response MUST be a valid JSON object with ONLY two keys: "challenges" and "claude_integration_description".
+
+1.  **challenges**: In 1-2 sentences, identify the most critical business or technical challenge this startup likely faces. Be sharp, insightful, and specific. Think about market competition, technical debt, user adoption, or scaling issues.
+
+2.  **claude_integration_description**: In 2-3 sentences, propose a specific, high-value integration using a concrete Claude model.
+    *   **Name the Model:** Explicitly recommend **Claude 3.5 Sonnet**, **Claude 3 Opus**, or **Claude 3 Haiku**.
+    *   **Justify Your Choice:** Briefly explain *why* that model is the best fit (e.g., "due to its state-of-the-art intelligence for complex analysis," or "for its industry-leading speed in real-time applications").
+    *   **Describe the Use Case:** Detail a compelling use case that solves their core pain point or addresses one of their challenges. Mention advanced features like **Tool Use** if it allows them to connect Claude to their existing systems.
+
+Example Response:
+{
+    "challenges": "The startup likely faces intense competition in the QA automation space and may struggle to differentiate from established players. Their core challenge is proving a significant leap in efficiency over traditional testing frameworks.",
+    "claude_integration_description": "We recommend integrating **Claude 3.5 Sonnet** to power their AI agents. Due to its sophisticated reasoning and code generation capabilities, it can analyze requirement specs and auto-generate comprehensive QA test suites, drastically reducing manual effort. Using **Tool Use**, they could connect Claude to their CI/CD pipeline to automatically run tests and report results."
+}
+"""
+        
+        # Create a clean summary of the startup for the prompt
+        info_str = self._format_startup_info(startup_info, company)
+        user_message = f"Analyze the following startup and provide your response as a single, valid JSON object.\n\nStartup Information:\n{info_str}"
+        
+        try:
+            logger.info(f"Making enrichment API call for {company}")
+            response_text = self._create_message(system_prompt, user_message, max_tokens=1024, method="enrich_startup_data",
+                                                 validate=self._has_json_fields('challenges', 'claude_integration_description'))
+            
+            if not response_text:
+                logger.error(f"Empty response from enrichment API for {company}")
+                startup_info['challenges'] = "Received empty response from AI model."
+                startup_info['claude_integration_description'] = "Received empty response from AI model."
+                return startup_info
+            
+            logger.info(f"Received enrichment response for {company}: {response_text[:100]}...")
+            
+            json_start = response_text.find('{')
+            json_end = response_text.rfind('}') + 1
+            if json_start != -1 and json_end != -1:
+                json_str = response_text[json_start:json_end]
+                try:
+                    enriched_data = json.loads(json_str)
+                    
+                    # Validate the parsed data
+                    if not isinstance(enriched_data, dict):
+                        logger.error(f"Parsed enrichment data is not a dict for {company}: {type(enriched_data)}")
+                        startup_info['challenges'] = "Could not parse enrichment data - unexpected format."
+                        startup_info['claude_integration_description'] = "Could not parse enrichment data - unexpected format."
+                        return startup_info
+                    
+                    # Validate required fields
+                    challenges = enriched_data.get('challenges')
+                    if not challenges or not str(challenges).strip():
+                        logger.warning(f"No challenges found in enrichment for {company}")
+                        challenges = "Could not identify specific challenges."
+                    
+                    integration_desc = enriched_data.get('claude_integration_description')
+                    if not integration_desc or not str(integration_desc).strip():
+                        logger.warning(f"No integration description found in enrichment for {company}")
+                        integration_desc = "Could not provide integration description."
+                    
+                    startup_info['challenges'] = str(challenges).strip()
+                    startup_info['claude_integration_description'] = str(integration_desc).strip()
+                    
+                    logger.info(f"Successfully enriched data for {company}")
+                    
+                except json.JSONDecodeError as json_err:
+                    logger.error(f"JSON decode error in enrichment for {company}: {json_err}. Response: {json_str}")
+                    startup_info['challenges'] = "Could not parse enrichment data from model - invalid JSON."
+                    startup_info['claude_integration_description'] = "Could not parse enrichment data from model - invalid JSON."
+            else:
+                logger.error(f"Could not find JSON in enrichment response for {company}: {response_text}")
+                startup_info['challenges'] = "Could not parse enrichment data from model - invalid JSON format."
+                startup_info['claude_integration_description'] = "Could not parse enrichment data from model - invalid JSON format."
+            
+            return startup_info
+
+        except anthropic.RateLimitError as e:
+            logger.error(f"Rate limit exceeded in enrichment for {company} after retries: {e}")
+            startup_info['challenges'] = "Enrichment rate limited - please try again later."
+            startup_info['claude_integration_description'] = "Enrichment rate limited - please try again later."
+            return startup_info
+        
+        except anthropic.AuthenticationError as e:
+            logger.error(f"Authentication error in enrichment for {company}: {e}")
+            startup_info['challenges'] = "Enrichment authentication failed - check API key."
+            startup_info['claude_integration_description'] = "Enrichment authentication failed - check API key."
+            return startup_info
+        
+        except anthropic.APIError as e:
+            logger.error(f"API error in enrichment for {company}: {e}")
+            startup_info['challenges'] = f"Enrichment API error: {str(e)}"
+            startup_info['claude_integration_description'] = f"Enrichment API error: {str(e)}"
+            return startup_info
+        
+        except Exception as e:
+            logger.error(f"Unexpected error in enrichment for {company}: {e}")
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+            startup_info['challenges'] = f"Could not enrich data: {str(e)}"
+            startup_info['claude_integration_description'] = f"Could not enrich data: {str(e)}"
+            return startup_info
+    
+    def get_claude_fit_score(self, startup_info: Dict) -> Dict:
+        """
+        Analyzes a startup to generate a Claude fit score and justification.
+        """
+        # Input validation
+        if not startup_info:
+            logger.error("startup_info is None or empty")
+            return {"claude_fit_score": 5, "claude_fit_justification": "No startup data provided for analysis.", "analysis_failed": True}
+        
+        if not isinstance(startup_info, dict):
+            logger.error(f"startup_info is not a dict, got {type(startup_info)}")
+            return {"claude_fit_score": 5, "claude_fit_justification": "Invalid startup data format.", "analysis_failed": True}
+        
+        # Validate required fields
+        company = startup_info.get('company', '')
+        if not company or company == 'N/A':
+            logger.warning("Company name is missing or invalid")
+            company = "Unknown Company"
+        
+        logger.info(f"Starting Claude fit analysis for: {company}")
+        
+        system_prompt = """
+You are a senior Sales Engineer at Anthropic. Your task is to analyze a startup and determine a "Claude Fit Score" from 1 to 10. The score represents how much value the startup could derive from integrating a Claude model into their core business or operations.
+
+Your response MUST be a valid JSON object with ONLY two keys: "claude_fit_score" (an integer) and "claude_fit_justification" (a 1-2 sentence string).
+
+- A score of 1-3 means a poor fit, where Claude offers little to no advantage.
+- A score of 4-6 indicates a moderate fit, with potential for some specific, non-critical use cases.
+- A score of 7-8 signifies a strong fit, where Claude could become a key part of their product or a significant operational accelerator.
+- A score of 9-10 represents an exceptional fit, where Claude could be a transformative, strategic technology for the company.
+
+Base your score on factors like their industry (e.g., SaaS, fintech are often high-fit), their business model, the problems they solve, and their likely need for advanced language processing, reasoning, or content generation.
+
+Example Response:
+{
+    "claude_fit_score": 8,
+    "claude_fit_justification": "As a B2B SaaS in the legal tech space, this company has a strong need for document analysis and summarization, making it a prime candidate for leveraging Claude for core product features."
+}
+"""
+        
+        # Create input string with validation
+        info_str = self._format_startup_info(startup_info, company)
+        user_message = f"Analyze the following startup and provide your response as a single, valid JSON object.\n\nStartup Information:\n{info_str}"
+
+        try:
+            logger.info(f"Making API call for {company}")
+            response_text = self._create_message(system_prompt, user_message, max_tokens=512, method="get_claude_fit_score",
+                                                 validate=self._has_json_fields('claude_fit_score', 'claude_fit_justification'))
+            
+            if not response_text:
+                logger.error(f"Empty response from API for {company}")
+                return {"claude_fit_score": 5, "claude_fit_justification": "Received empty response from AI model.", "analysis_failed": True}
+            
+            logger.info(f"Received response for {company}: {response_text[:100]}...")
+            
+            # Parse JSON response
+            json_start = response_text.find('{')
+            json_end = response_text.rfind('}') + 1
+            
+            if json_start == -1 or json_end == -1:
+                logger.error(f"Could not find JSON in response for {company}: {response_text}")
+                return {"claude_fit_score": 5, "claude_fit_justification": "Could not parse score from model - invalid JSON format.", "analysis_failed": True}
+            
+            json_str = response_text[json_start:json_end]
+            
+            try:
+                fit_data = json.loads(json_str)
+            except json.JSONDecodeError as json_err:
+                logger.error(f"JSON decode error for {company}: {json_err}. Response: {json_str}")
+                return {"claude_fit_score": 5, "claude_fit_justification": "Could not parse score from model - invalid JSON.", "analysis_failed": True}
+            
+            # Validate the parsed data
+            if not isinstance(fit_data, dict):
+                logger.error(f"Parsed data is not a dict for {company}: {type(fit_data)}")
+                return {"claude_fit_score": 5, "claude_fit_justification": "Could not parse score from model - unexpected data format.", "analysis_failed": True}
+            
+            final_data = self._normalize_fit_score(fit_data, company)
+            score = final_data['claude_fit_score']
+            
+            logger.info(f"Successfully analyzed {company}: score={score}")
+            return final_data
+            
+        except anthropic.RateLimitError as e:
+            logger.error(f"Rate limit exceeded for {company} after retries: {e}")
+            return {"claude_fit_score": 5, "claude_fit_justification": "AI analysis rate limited - please try again later.", "analysis_failed": True}
+        
+        except anthropic.AuthenticationError as e:
+            logger.error(f"Authentication error for {company}: {e}")
+            return {"claude_fit_score": 5, "claude_fit_justification": "AI analysis authentication failed - check API key.", "analysis_failed": True}
+        
+        except anthropic.APIError as e:
+            logger.error(f"API error for {company}: {e}")
+            return {"claude_fit_score": 5, "claude_fit_justification": f"AI analysis API error: {str(e)}", "analysis_failed": True}
+        
+        except Exception as e:
+            logger.error(f"Unexpected error analyzing {company}: {e}")
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+            return {"claude_fit_score": 5, "claude_fit_justification": f"An error occurred during analysis: {str(e)}", "analysis_failed": True}
+    
+    def analyze_startup(self, startup_info: Dict) -> Dict:
+        """
+        Score and enrich a startup in a single request.
+        
+        Returns the fit score, justification, challenges and Claude integration description
+        in one response validated against ANALYSIS_SCHEMA, replacing separate calls to
+        get_claude_fit_score and enrich_startup_data.
+        """
+        # Input validation
+        if not startup_info or not isinstance(startup_info, dict):
+            logger.error(f"Invalid startup_info in analyze_startup: {type(startup_info)}")
+            return self._failed_analysis("No valid startup data provided for analysis.")
+        
+        company = startup_info.get('company', '')
+        if not company or company == 'N/A':
+            logger.warning("Company name is missing or invalid in analyze_startup")
+            company = "Unknown Company"
+        
+        logger.info(f"Starting combined Claude analysis for: {company}")
+        
+        system_prompt = """
+You are a top-tier, senior Sales Engineer at Anthropic. Your task is to analyze a startup, determine a "Claude Fit Score" from 1 to 10, and identify how they could best leverage Claude. The score represents how much value the startup could derive from integrating a Claude model into their core business or operations.
+
+Your response MUST be a valid JSON object with ONLY four keys:
+
+1.  **claude_fit_score**: An integer from 1 to 10.
+    - A score of 1-3 means a poor fit, where Claude offers little to no advantage.
+    - A score of 4-6 indicates a moderate fit, with potential for some specific, non-critical use cases.
+    - A score of 7-8 signifies a strong fit, where Claude could become a key part of their product or a significant operational accelerator.
+    - A score of 9-10 represents an exceptional fit, where Claude could be a transformative, strategic technology for the company.
+    Base your score on factors like their industry, their business model, the problems they solve, and their likely need for advanced language processing, reasoning, or content generation.
+
+2.  **claude_fit_justification**: A 1-2 sentence string explaining the score.
+
+3.  **challenges**: In 1-2 sentences, identify the most critical business or technical challenge this startup likely faces. Be sharp, insightful, and specific.
+
+4.  **claude_integration_description**: In 2-3 sentences, propose a specific, high-value integration using a concrete Claude model (**Claude 3.5 Sonnet**, **Claude 3 Opus**, or **Claude 3 Haiku**), explain why that model fits, and describe a compelling use case. Mention advanced features like **Tool Use** if it allows them to connect Claude to their existing systems.
+
+Example Response:
+{
+    "claude_fit_score": 8,
+    "claude_fit_justification": "As a B2B SaaS in the QA automation space, this company has a strong need for code understanding and generation, making Claude a natural core product component.",
+    "challenges": "The startup likely faces intense competition in the QA automation space and must prove a significant leap in efficiency over traditional testing frameworks.",
+    "claude_integration_description": "We recommend **Claude 3.5 Sonnet** to power their AI agents, since its reasoning and code generation can turn requirement specs into comprehensive test suites. Using **Tool Use**, they could connect Claude to their CI/CD pipeline to run tests and report results automatically."
+}
+"""
+        
+        info_str = self._format_startup_info(startup_info, company)
+        user_message = f"Analyze the following startup and provide your response as a single, valid JSON object.\n\nStartup Information:\n{info_str}"
+        
+        try:
+            response_text = self._create_message(system_prompt, user_message, max_tokens=1024, method="analyze_startup",
+                                                 validate=self._has_json_fields(*ANALYSIS_SCHEMA))
+        except anthropic.RateLimitError as e:
+            logger.error(f"Rate limit exceeded for {company} after retries: {e}")
+            return self._failed_analysis("AI analysis rate limited - please try again later.")
+        except anthropic.AuthenticationError as e:
+            logger.error(f"Authentication error for {company}: {e}")
+            return self._failed_analysis("AI analysis authentication failed - check API key.")
+        except anthropic.APIError as e:
+            logger.error(f"API error for {company}: {e}")
+            return self._failed_analysis(f"AI analysis API error: {str(e)}")
+        except Exception as e:
+            logger.error(f"Unexpected error analyzing {company}: {e}")
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+            return self._failed_analysis(f"An error occurred during analysis: {str(e)}")
+        
+        analysis = self._parse_json_object(response_text)
+        if analysis is None:
+            logger.error(f"Could not parse combined analysis for {company}: {response_text}")
+            return self._failed_analysis("Could not parse analysis from model - invalid JSON.")
+        
+        final_data = self._validate_analysis(analysis, company)
+        logger.info(f"Successfully analyzed {company}: score={final_data['claude_fit_score']}")
+        return final_data
+    
+    def _has_json_fields(self, *fields: str) -> Callable[[str], bool]:
+        """Response validator: the text holds a JSON object with every one of ``fields``."""
+        def validate(response_text: str) -> bool:
+            parsed = self._parse_json_object(response_text)
+            return parsed is not None and all(parsed.get(field) not in (None, '') for field in fields)
+        return validate
+    
+    def _parse_json_object(self, response_text: str) -> Optional[Dict]:
+        """Extract the outermost JSON object from a response, or None if there is none."""
+        json_start = response_text.find('{') if response_text else -1
+        json_end = response_text.rfind('}') + 1 if response_text else 0
+        if json_start == -1 or json_end <= json_start:
+            return None
+        try:
+            parsed = json.loads(response_text[json_start:json_end])
+        except json.JSONDecodeError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    
+    def _validate_analysis(self, analysis: Dict, company: str) -> Dict:
+        """Validate a combined analysis against ANALYSIS_SCHEMA, filling placeholders for missing text fields."""
+        final_data = self._normalize_fit_score(analysis, company)
+        for field, field_type in ANALYSIS_SCHEMA.items():
+            if field in final_data:
+                continue
+            value = analysis.get(field)
+            if not isinstance(value, field_type) or not value.strip():
+                logger.warning(f"No {field} found in analysis for {company}")
+                value = ANALYSIS_PLACEHOLDERS[field]
+            final_data[field] = value.strip()
+        return final_data
+    
+    def _failed_analysis(self, reason: str) -> Dict:
+        """Neutral combined analysis used when a startup could not be analyzed."""
+        return {
+            "claude_fit_score": 5,
+            "claude_fit_justification": reason,
+            "challenges": reason,
+            "claude_integration_description": reason,
+            "analysis_failed": True
+        }
+    
+    def plan_score_batches(self, startups: List[Dict],
+                           max_input_tokens: int = BATCH_MAX_INPUT_TOKENS,
+                           max_batch_size: int = BATCH_MAX_SIZE) -> List[List[int]]:
+        """
+        Group startups into batches that fit the per-request token budget.
+        
+        Args:
+            startups: List of startup dictionaries
+            max_input_tokens: Estimated input-token budget for the startup data in one request
+            max_batch_size: Maximum number of startups in one request
+            
+        Returns:
+            Lists of indices into ``startups``, one list per request
+        """
+        batches = []
+        current_batch = []
+        current_tokens = 0
+        for i, startup in enumerate(startups):
+            company = startup.get('company') or 'Unknown Company'
+            tokens = _estimate_tokens(self._format_startup_info(startup, company))
+            if current_batch and (current_tokens + tokens > max_input_tokens or len(current_batch) >= max_batch_size):
+                batches.append(current_batch)
+                current_batch = []
+                current_tokens = 0
+            current_batch.append(i)
+            current_tokens += tokens
+        
+        if current_batch:
+            batches.append(current_batch)
+        return batches
+    
+    def get_claude_fit_scores_batch(self, startups: List[Dict]) -> List[Dict]:
+        """
+        Score several startups in a single request.
+        
+        The model is asked for a JSON array keyed by company. If the response cannot be
+        parsed, the batch is split in half and retried; single startups fall back to
+        get_claude_fit_score.
+        
+        Args:
+            startups: List of startup dictionaries, ideally planned with plan_score_batches
+            
+        Returns:
+            One fit score dictionary per startup, in input order
+        """
+        if not startups:
+            return []
+        if len(startups) == 1:
+            return [self.get_claude_fit_score(startups[0])]
+        
+        companies = [s.get('company') or f'Unknown Company {i+1}' for i, s in enumerate(startups)]
+        logger.info(f"Starting batch Claude fit analysis for {len(startups)} startups")
+        
+        system_prompt = """
+You are a senior Sales Engineer at Anthropic. Your task is to analyze a list of startups and determine a "Claude Fit Score" from 1 to 10 for each one. The score represents how much value the startup could derive from integrating a Claude model into their core business or operations.
+
+Your response MUST be a valid JSON array containing exactly one object per startup, in the order given. Each object MUST have ONLY four keys: "id" (the startup's id as given), "company" (the company name as given), "claude_fit_score" (an integer) and "claude_fit_justification" (a 1-2 sentence string).
+
+- A score of 1-3 means a poor fit, where Claude offers little to no advantage.
+- A score of 4-6 indicates a moderate fit, with potential for some specific, non-critical use cases.
+- A score of 7-8 signifies a strong fit, where Claude could become a key part of their product or a significant operational accelerator.
+- A score of 9-10 represents an exceptional fit, where Claude could be a transformative, strategic technology for the company.
+
+Base each score on factors like their industry (e.g., SaaS, fintech are often high-fit), their business model, the problems they solve, and their likely need for advanced language processing, reasoning, or content generation. Score every startup independently.
+
+Example Response:
+[
+    {"id": 0, "company": "Acme Legal", "claude_fit_score": 8, "claude_fit_justification": "As a B2B SaaS in the legal tech space, this company has a strong need for document analysis and summarization, making it a prime candidate for leveraging Claude for core product features."},
+    {"id": 1, "company": "BoltFreight", "claude_fit_score": 4, "claude_fit_justification": "Their logistics hardware business has limited language-heavy workflows, though Claude could assist with customer support."}
+]
+"""
+        
+        startup_blocks = [
+            f"Startup id {i}:\n{self._format_startup_info(startup, companies[i])}"
+            for i, startup in enumerate(startups)
+        ]
+        user_message = (
+            f"Analyze the following {len(startups)} startups and provide your response as a single, valid JSON array.\n\n"
+            + "\n\n".join(startup_blocks)
+        )
+        max_tokens = min(BATCH_MAX_OUTPUT_TOKENS, BATCH_OUTPUT_TOKENS_PER_STARTUP * len(startups) + 256)
+        
+        try:
+            response_text = self._create_message(
+                system_prompt, user_message, max_tokens=max_tokens, method="get_claude_fit_scores_batch",
+                validate=lambda text: bool(self._parse_batch_scores(text, companies))
+            )
+        except anthropic.RateLimitError as e:
+            logger.error(f"Rate limit exceeded for batch of {len(startups)} after retries: {e}")
+            return [{"claude_fit_score": 5, "claude_fit_justification": "AI analysis rate limited - please try again later.", "analysis_failed": True} for _ in startups]
+        except anthropic.AuthenticationError as e:
+            logger.error(f"Authentication error for batch of {len(startups)}: {e}")
+            return [{"claude_fit_score": 5, "claude_fit_justification": "AI analysis authentication failed - check API key.", "analysis_failed": True} for _ in startups]
+        except anthropic.APIError as e:
+            logger.error(f"API error for batch of {len(startups)}: {e}")
+            return [{"claude_fit_score": 5, "claude_fit_justification": f"AI analysis API error: {str(e)}", "analysis_failed": True} for _ in startups]
+        except Exception as e:
+            logger.error(f"Unexpected error analyzing batch of {len(startups)}: {e}")
+            logger.error(f"Full traceback: {traceback.format_exc()}")
+            return [{"claude_fit_score": 5, "claude_fit_justification": f"An error occurred during analysis: {str(e)}", "analysis_failed": True} for _ in startups]
+        
+        parsed = self._parse_batch_scores(response_text, companies)
+        if not parsed:
+            mid = len(startups) // 2
+            logger.warning(f"Could not parse batch response for {len(startups)} startups, splitting into {mid} + {len(startups) - mid}")
+            return self.get_claude_fit_scores_batch(startups[:mid]) + self.get_claude_fit_scores_batch(startups[mid:])
+        
+        missing = [i for i in range(len(startups)) if i not in parsed]
+        if missing:
+            logger.warning(f"Batch response omitted {len(missing)} of {len(startups)} startups, re-scoring them")
+            retried = self.get_claude_fit_scores_batch([startups[i] for i in missing])
+            parsed.update(zip(missing, retried))
+        
+        logger.info(f"Successfully analyzed batch of {len(startups)} startups")
+        return [parsed[i] for i in range(len(startups))]
+    
+    def _parse_batch_scores(self, response_text: str, companies: List[str]) -> Dict[int, Dict]:
+        """Map each object of a batch scoring response back to its startup's position."""
+        json_start = response_text.find('[') if response_text else -1
+        json_end = response_text.rfind(']') + 1 if response_text else 0
+        if json_start == -1 or json_end <= json_start:
+            logger.error(f"Could not find JSON array in batch response: {response_text}")
+            return {}
+        
+        try:
+            items = json.loads(response_text[json_start:json_end])
+        except json.JSONDecodeError as json_err:
+            logger.error(f"JSON decode error in batch response: {json_err}")
+            return {}
+        
+        if not isinstance(items, list):
+            return {}
+        
+        positions_by_company = {}
+        for i, company in enumerate(companies):
+            positions_by_company.setdefault(str(company).strip().lower(), []).append(i)
+        
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            
+            position = None
+            try:
+                candidate = int(item.get('id'))
+                if 0 <= candidate < len(companies) and candidate not in parsed:
+                    position = candidate
+            except (ValueError, TypeError):
+                pass
+            
+            if position is None:
+                candidates = positions_by_company.get(str(item.get('company', '')).strip().lower(), [])
+                position = next((i for i in candidates if i not in parsed), None)
+            
+            if position is not None:
+                parsed[position] = self._normalize_fit_score(item, companies[position])
+        
+        return parsed
+    
+    def _format_startup_info(self, startup_info: Dict, company: str) -> str:
+        """Format the populated fields of a startup as a bulleted list for a prompt."""
+        valid_info = {k: v for k, v in startup_info.items() if v and v != 'N/A' and str(v).strip() and k != 'analysis_failed'}
+        if not valid_info:
+            logger.warning(f"No valid data found for {company}, using minimal info")
+            valid_info = {'company': company}
+        
+        return "\n".join([f"- {key}: {value}" for key, value in valid_info.items()])
+    
+    def _normalize_fit_score(self, fit_data: Dict, company: str) -> Dict:
+        """Validate a parsed fit score, falling back to 5 and a placeholder justification."""
+        # Extract and validate score
+        score = fit_data.get('claude_fit_score')
+        if score is None:
+            logger.warning(f"No claude_fit_score found in response for {company}")
+            score = 5
+        else:
+            try:
+                score = int(score)
+                if not (1 <= score <= 10):
+                    logger.warning(f"Score out of range for {company}: {score}, clamping to 5")
+                    score = 5
+            except (ValueError, TypeError):
+                logger.warning(f"Invalid score format for {company}: {score}, using default 5")
+                score = 5
+        
+        # Extract and validate justification
+        justification = fit_data.get('claude_fit_justification')
+        if not justification or not str(justification).strip():
+            logger.warning(f"No justification found for {company}")
+            justification = "Justification not provided by model."
+        
+        return {
+            'claude_fit_score': score,
+            'claude_fit_justification': str(justification).strip(),
+            'analysis_failed': False
+        }
+    
+    def _format_data_for_claude(self, startups_data: List[Dict]) -> str:
+        """Format startup data in a readable way for Claude."""
+        formatted_data = []
+        for startup in startups_data:
+            # Robustness check to prevent crashes on malformed data
+            if not isinstance(startup, dict):
+                continue
+            
+            s_info = {
+                "Company": startup.get('company', 'N/A'),
+                "Industry": startup.get('industry', 'N/A'),
+                "Description": startup.get('solution', 'N/A'),
+                "Pain Point": startup.get('pain_point', 'N/A')
+            }
+            formatted_startup = "\n".join([f"- {key}: {value}" for key, value in s_info.items()])
+            formatted_data.append(f"Startup:\n{formatted_startup}")
+        
+        return "\n\n".join(formatted_data)
+    
+    def _get_system_prompt(self) -> str:
+        """Get the main system prompt for general analysis."""
+        return """You are a Claude-powered startup analysis assistant for Anthropic's sales team. 
+
+Your role is to:
+1. Analyze startup data to answer questions about trends, patterns, and insights.
+2. Identify which startups would benefit most from Claude products.
+3. Provide strategic recommendations for sales outreach.
+4. Suggest specific Claude features and use cases for each startup.
+
+When asked to generate a sales brief or suggest questions for a specific company, please do so.
+Always provide actionable insights that would help a sales team prioritize and engage with prospects.
+
+IMPORTANT: Focus on direct analysis of the provided data. Do not include generic recommendations like "Top candidates for Claude's prompt generation" or similar boilerplate text. Instead, provide specific, contextual insights based on the actual startup data provided."""
+    
+    def _get_claude_fit_prompt(self) -> str:
+        """Get the system prompt for Claude fit analysis."""
+        return """You are a Claude product specialist helping to identify the best Claude solutions for startups.
+
+For each startup, analyze:
+1. **Claude Product Recommendations**: Which specific Claude products would be most valuable
+2. **Feature Mapping**: Which Claude features align with their pain points
+3. **Implementation Strategy**: How they could integrate Claude into their workflow
+4. **Discovery Questions**: Questions to ask during sales calls to uncover needs
+5. **Sample Prompts**: Example Claude prompts they could use immediately
+
+Consider Claude's strengths:
+- Long context understanding
+- Safe reasoning and compliance
+- Structured output generation
+- Multi-agent orchestration
+- Document analysis and summarization
+- Tone control and empathy
+
+Provide specific, actionable recommendations that demonstrate deep understanding of both the startup's needs and Claude's capabilities."""
+    
+    def _get_sales_brief_prompt(self) -> str:
+        """Get the system prompt for sales brief generation."""
+        return """You are a senior sales strategist creating outreach briefs for Claude prospects.
+
+For each startup, create:
+1. **Email Introduction**: A compelling, personalized email template
+2. **Call Talking Points**: Key points to cover in initial discovery calls
+3. **Value Propositions**: Specific Claude benefits relevant to their business
+4. **Objection Handling**: Common objections and how to address them
+5. **Next Steps**: Clear follow-up actions and timeline
+
+Focus on:
+- Their specific pain points and how Claude solves them
+- Industry-specific use cases and examples
+- Technical integration possibilities
+- ROI and business impact
+- Risk mitigation and safety features
+
+Make the brief practical and ready-to-use for a sales representative.""" 
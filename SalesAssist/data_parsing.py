@@ -0,0 +1,249 @@
+"""
+Spreadsheet parsing helpers shared by the Streamlit app and the command-line scorer.
+Maps common column variations onto the standard startup fields.
+"""
+
+import logging
+from typing import List, Dict, Iterator, Tuple, Optional, Callable
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Map common column variations to standard names
+COLUMN_MAPPING = {
+    'company': ['company', 'Company', 'COMPANY', 'name', 'Name', 'NAME', 'startup', 'Startup', 'STARTUP', 'Startup Name', 'startup_name'],
+    'industry': ['industry', 'Industry', 'INDUSTRY', 'sector', 'Sector', 'SECTOR', 'category', 'Category', 'CATEGORY', 'Industry Vertical'],
+    'business_model': ['business_model', 'Business Model', 'BUSINESS_MODEL', 'model', 'Model', 'MODEL', 'business type', 'Business Type', 'Business Type'],
+    'target_audience': ['target_audience', 'Target Audience', 'TARGET_AUDIENCE', 'audience', 'Audience', 'AUDIENCE', 'customer', 'Customer', 'CUSTOMER', 'Target Market'],
+    'pain_point': ['pain_point', 'Pain Point', 'PAIN_POINT', 'problem', 'Problem', 'PROBLEM', 'challenge', 'Challenge', 'CHALLENGE', 'Problem Statement', 'Pain', 'pain', 'The Problem', 'Painpoint', 'Customer Pain'],
+    'solution': ['solution', 'Solution', 'SOLUTION', 'product', 'Product', 'PRODUCT', 'offering', 'Offering', 'OFFERING', 'Product Description', 'desc', 'description', 'Description', 'Company Description', 'company_description'],
+}
+
+
+# Rows parsed per chunk when ingesting uploads; bounds peak memory independently of file size
+DEFAULT_CHUNK_SIZE = 20000
+
+# Low-cardinality fields parsed as categoricals, so rows share one string object per distinct value
+CATEGORICAL_FIELDS = ('industry', 'business_model')
+
+
+def read_table(source, name: str) -> pd.DataFrame:
+    """
+    Read a CSV or Excel file into a DataFrame.
+
+    Args:
+        source: File path or file-like object
+        name: File name, used to detect the format
+
+    Raises:
+        ValueError: If the file is neither CSV nor Excel
+    """
+    if name.endswith('.csv'):
+        return pd.read_csv(source)
+    if name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(source)
+    raise ValueError("Please upload a CSV or Excel file.")
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _unique_columns(header) -> List[str]:
+    """Name blank and duplicate header cells the way pandas does ('Unnamed: 3', 'Name.1')."""
+    seen = {}
+    columns = []
+    for i, value in enumerate(header):
+        column = f"Unnamed: {i}" if value is None or str(value).strip() == '' else str(value)
+        if column in seen:
+            seen[column] += 1
+            column = f"{column}.{seen[column]}"
+        else:
+            seen[column] = 0
+        columns.append(column)
+    return columns
+
+
+def read_columns(source, name: str) -> List[str]:
+    """
+    Read only the header row of a CSV or Excel file, leaving file-like sources rewound.
+
+    Raises:
+        ValueError: If the file is neither CSV nor Excel
+    """
+    if name.endswith('.csv'):
+        columns = list(pd.read_csv(source, nrows=0).columns)
+    elif name.endswith('.xlsx'):
+        from openpyxl import load_workbook
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            header = next(workbook.worksheets[0].iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        columns = _unique_columns(header)
+    else:
+        columns = list(read_table(source, name).columns)
+    _rewind(source)
+    return columns
+
+
+def _iter_xlsx_chunks(source, chunk_size: int, usecols: Optional[Callable[[str], bool]]) -> Iterator[pd.DataFrame]:
+    """Stream the first worksheet of an .xlsx file row by row with openpyxl's read-only mode."""
+    from openpyxl import load_workbook
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _unique_columns(header)
+        keep = [i for i, column in enumerate(columns) if usecols is None or usecols(column)]
+        kept_columns = [columns[i] for i in keep]
+
+        batch = []
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in keep]
+            if all(value is None for value in values):
+                continue  # Formatted but empty rows, which pandas also skips
+            batch.append(values)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=kept_columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=kept_columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def iter_table_chunks(source, name: str, chunk_size: int,
+                      usecols: Optional[Callable[[str], bool]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV or Excel file in chunks of at most ``chunk_size`` rows.
+
+    CSV files are streamed with every column read as a string, so pandas never has to infer
+    (and re-infer per chunk) column types; .xlsx files are streamed row by row. Legacy .xls
+    files cannot be read incrementally, so they are loaded once and sliced.
+
+    Args:
+        source: File path or file-like object
+        name: File name, used to detect the format
+        chunk_size: Maximum rows per chunk
+        usecols: Optional predicate on column names; other columns are skipped while parsing
+    """
+    if name.endswith('.csv'):
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, usecols=usecols)
+        return
+    if name.endswith('.xlsx'):
+        yield from _iter_xlsx_chunks(source, chunk_size, usecols)
+        return
+
+    df = read_table(source, name)
+    if usecols is not None:
+        df = df[[column for column in df.columns if usecols(str(column))]]
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+# Case-insensitive alias index: standard name -> lower-cased candidate column names, in priority order
+_COLUMN_ALIASES = {
+    standard_name: list(dict.fromkeys(name.strip().lower() for name in possible_names))
+    for standard_name, possible_names in COLUMN_MAPPING.items()
+}
+
+_ALL_ALIASES = frozenset(alias for aliases in _COLUMN_ALIASES.values() for alias in aliases)
+
+MISSING_VALUES = ['', 'nan', 'none', 'null']
+
+
+def is_mapped_column(column) -> bool:
+    """True if ``column`` matches any alias in COLUMN_MAPPING; other columns are never used."""
+    return str(column).strip().lower() in _ALL_ALIASES
+
+
+def resolve_column_mapping(columns) -> Dict[str, str]:
+    """
+    Resolve which source column feeds each standard field.
+
+    Matching is case-insensitive and ignores surrounding whitespace; when several
+    columns match, the earliest alias in COLUMN_MAPPING wins.
+
+    Returns:
+        Mapping of standard name -> source column, for the fields that were found
+    """
+    columns_by_alias = {}
+    for column in columns:
+        columns_by_alias.setdefault(str(column).strip().lower(), column)
+
+    mapping = {}
+    for standard_name, aliases in _COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in columns_by_alias:
+                mapping[standard_name] = columns_by_alias[alias]
+                break
+    return mapping
+
+
+def _clean_column(series: pd.Series) -> pd.Series:
+    """Strip whitespace and turn empty or placeholder values ('nan', 'none', 'null') into None."""
+    cleaned = series.astype('string').str.strip()
+    missing = cleaned.isna() | cleaned.str.lower().isin(MISSING_VALUES)
+    return cleaned.astype(object).where(~missing, None)
+
+
+def _to_records(df: pd.DataFrame) -> List[Dict]:
+    """Convert a DataFrame to a list of dicts (several times faster than ``to_dict('records')``)."""
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[column].tolist() for column in columns))]
+
+
+def standardize_records(df: pd.DataFrame) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Map a raw DataFrame onto the standard startup fields.
+
+    Column names are resolved once against ``df.columns`` and values are cleaned with
+    vectorized string operations; mapped fields that are absent from the file are set to 'N/A'.
+
+    Returns:
+        A tuple of (standardized startups, discarded rows without a company name)
+    """
+    mapping = resolve_column_mapping(df.columns)
+
+    standardized = pd.DataFrame(index=df.index)
+    for standard_name in COLUMN_MAPPING:
+        if standard_name in mapping:
+            standardized[standard_name] = _clean_column(df[mapping[standard_name]])
+            if standard_name in CATEGORICAL_FIELDS:
+                # Round-trip through a categorical: the resulting rows reference one string per category
+                categories = standardized[standard_name].astype('category')
+                standardized[standard_name] = categories.astype(object).where(categories.notna(), None)
+        else:
+            # Set a default for any mapped column that isn't found
+            standardized[standard_name] = 'N/A'
+
+    # Ensure a default fit score exists before AI analysis
+    standardized['claude_fit_score'] = 5
+
+    # Only keep rows that have at least a company name
+    has_company = standardized['company'].notna() & (standardized['company'] != 'N/A')
+    standardized_data = _to_records(standardized[has_company])
+    discarded_rows = df[~has_company].to_dict('records')
+
+    return standardized_data, discarded_rows
+
+
+def iter_standardized_chunks(source, name: str,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, List[Dict], List[Dict]]]:
+    """
+    Parse and standardize a CSV or Excel file one bounded chunk at a time.
+
+    Only columns that map onto a standard field are parsed, and each raw chunk is released
+    before the next is read, so peak memory is set by ``chunk_size`` rather than the file size.
+
+    Yields:
+        Tuples of (raw rows read, standardized startups, discarded rows without a company name)
+    """
+    for chunk in iter_table_chunks(source, name, chunk_size, usecols=is_mapped_column):
+        standardized_data, discarded_rows = standardize_records(chunk)
+        yield len(chunk), standardized_data, discarded_rows
@@ -0,0 +1,236 @@
+"""
+Company-name normalization, duplicate clustering and a hashed name index.
+Lets scoring send one representative per duplicated company instead of paying for every copy.
+"""
+
+import os
+import re
+import zlib
+import unicodedata
+import logging
+from collections import defaultdict
+from typing import List, Dict, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Names whose character 3-gram Jaccard similarity reaches this are treated as the same company.
+# The default of 1.0 merges only names that are identical once normalized ('Acme, Inc.' and 'ACME');
+# fuzzy matching is opt-in, since lower values also merge different companies such as
+# 'MedTech Solutions' and 'EdTech Solutions' (0.9 or higher is recommended)
+DEFAULT_SIMILARITY_THRESHOLD = float(os.getenv('CLAUDE_DEDUPE_THRESHOLD', '1.0'))
+
+# Rows are only merged when these fields also agree (a missing value only matches another missing value)
+MATCH_FIELDS = ('industry', 'website')
+
+# MinHash signature length, split into LSH bands; 16 bands x 4 rows makes names at the
+# threshold candidates with near certainty while dissimilar names rarely share a bucket
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Band buckets larger than this come from shingles shared by many names (e.g. 'ing ') and are skipped;
+# genuinely similar names still meet in their other bands
+MAX_BUCKET_SIZE = 100
+
+# Trailing legal forms and filler words that do not distinguish companies
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'llp', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'gmbh', 'ag', 'sa', 'sas', 'bv', 'nv', 'plc', 'pty', 'oy', 'ab', 'srl', 'spa', 'pvt',
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(0)
+# Multipliers stay below 2**31 so a * crc32 + b cannot overflow 64 bits
+_PERM_A = _rng.integers(1, 1 << 31, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _MERSENNE_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+
+def normalize_company_name(name) -> str:
+    """
+    Canonical form of a company name for matching.
+
+    Lower-cases, strips accents and punctuation, and drops a leading 'the' and trailing legal
+    forms, so 'The Acme Corp.', 'ACME, Inc' and 'acme' all normalize to 'acme'.
+    """
+    if name is None:
+        return ""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').lower()
+    tokens = re.findall(r"[a-z0-9]+", text.replace('&', ' and '))
+    if len(tokens) > 1 and tokens[0] == 'the':
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens = tokens[:-1]
+    return " ".join(tokens)
+
+
+def _match_key(normalized: str) -> str:
+    # Spacing is ignored so 'Open AI' and 'OpenAI' match exactly
+    return normalized.replace(" ", "")
+
+
+def _field_key(startup: Dict) -> tuple:
+    """Normalized values of MATCH_FIELDS, so 'https://www.acme.com/' and 'acme.com' agree."""
+    values = []
+    for field in MATCH_FIELDS:
+        value = str(startup.get(field) or '').strip().lower()
+        if field == 'website':
+            value = re.sub(r"^[a-z]+://", "", value)
+            value = re.sub(r"^www\.", "", value).rstrip('/')
+        values.append('' if value == 'n/a' else value)
+    return tuple(values)
+
+
+def rename_result(result: Dict, from_name: str, to_name: str) -> Dict:
+    """
+    Copy of a scoring result for another row of the same company, with the representative's
+    name in text fields (e.g. the justification) replaced by the row's own name.
+    """
+    if not from_name or not to_name or from_name == to_name:
+        return dict(result)
+    pattern = re.compile(re.escape(from_name), re.IGNORECASE)
+    return {key: pattern.sub(lambda _: to_name, value) if isinstance(value, str) else value
+            for key, value in result.items()}
+
+
+def _shingles(key: str, n: int = 3) -> set:
+    padded = f" {key} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def _minhash_signatures(keys: List[str], block_size: int = 1024) -> np.ndarray:
+    """MinHash signatures of the keys' 3-gram sets, one row per key, computed with vectorized universal hashing."""
+    signatures = np.empty((len(keys), MINHASH_PERMUTATIONS), dtype=np.uint64)
+    # Blocks keep the shingles and the (permutations x shingles) intermediate small for large uploads
+    for block_start in range(0, len(keys), block_size):
+        block = [_shingles(key) for key in keys[block_start:block_start + block_size]]
+        hashes = np.array([zlib.crc32(s.encode('utf-8')) for shingles in block for s in shingles], dtype=np.uint64)
+        starts = np.cumsum([0] + [len(shingles) for shingles in block[:-1]])
+        permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+        signatures[block_start:block_start + len(block)] = np.minimum.reduceat(permuted, starts, axis=1).T
+    return signatures
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _completeness(startup: Dict) -> int:
+    return sum(1 for value in startup.values() if value not in (None, '', 'N/A'))
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def cluster_duplicates(startups: List[Dict], threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> List[List[int]]:
+    """
+    Group startups that refer to the same company.
+
+    Names are normalized and grouped exactly first. With a threshold below 1.0 the distinct names
+    are then blocked with MinHash LSH over character 3-grams, and candidate pairs are confirmed by
+    their exact Jaccard similarity. Rows whose MATCH_FIELDS differ, or whose names differ in any
+    number (e.g. 'Acme 2' and 'Acme 3'), are never merged.
+
+    Args:
+        startups: Startup dictionaries with a 'company' field
+        threshold: Minimum 3-gram Jaccard similarity for two distinct names to be merged
+
+    Returns:
+        Clusters of indices into ``startups``, ordered by first occurrence. The first index of each
+        cluster is its representative: the most complete row, earliest on ties.
+    """
+    rows_by_key = defaultdict(list)
+    for i, startup in enumerate(startups):
+        name = _match_key(normalize_company_name(startup.get('company')))
+        # Rows without a usable name are never merged with anything
+        rows_by_key[(name or f"\0{i}", _field_key(startup))].append(i)
+
+    keys = list(rows_by_key)
+    groups = _DisjointSet(len(keys))
+    if threshold < 1.0 and len(keys) > 1:
+        # Names with different numbers or fields can never merge, so they are blocked apart up front
+        number_ids = {}
+        numbers = np.array([number_ids.setdefault((tuple(re.findall(r"\d+", name)), fields), len(number_ids))
+                            for name, fields in keys], dtype=np.uint64)
+        signatures = _minhash_signatures([name for name, _ in keys])
+        rows_per_band = MINHASH_PERMUTATIONS // LSH_BANDS
+        checked = set()
+        for band in range(LSH_BANDS):
+            # Fold the band's rows (and the number block) into one 64-bit bucket key per name
+            bucket_keys = numbers * np.uint64(0x9E3779B97F4A7C15)
+            for row in range(band * rows_per_band, (band + 1) * rows_per_band):
+                bucket_keys = (bucket_keys ^ signatures[:, row]) * np.uint64(0xBF58476D1CE4E5B9)
+            order = np.argsort(bucket_keys, kind='stable')
+            sorted_keys = bucket_keys[order]
+            boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(sorted_keys)]))
+            for start, end in zip(starts, ends):
+                if end - start < 2 or end - start > MAX_BUCKET_SIZE:
+                    continue
+                members = order[start:end].tolist()
+                for position, a in enumerate(members):
+                    for b in members[position + 1:]:
+                        if (a, b) in checked:
+                            continue
+                        checked.add((a, b))
+                        if _jaccard(_shingles(keys[a][0]), _shingles(keys[b][0])) >= threshold:
+                            groups.union(a, b)
+
+    clusters = defaultdict(list)
+    for k, key in enumerate(keys):
+        clusters[groups.find(k)].extend(rows_by_key[key])
+
+    result = []
+    for members in clusters.values():
+        members.sort()
+        representative = max(members, key=lambda i: (_completeness(startups[i]), -i))
+        result.append([representative] + [i for i in members if i != representative])
+    result.sort(key=lambda cluster: min(cluster))
+
+    duplicates = len(startups) - len(result)
+    if duplicates:
+        logger.info(f"Found {duplicates} duplicate rows in {sum(len(c) > 1 for c in result)} companies")
+    return result
+
+
+class NameIndex:
+    """Hashed lookup of startups by company name, tolerant of case, punctuation and legal suffixes."""
+
+    def __init__(self, startups: List[Dict]):
+        """
+        Args:
+            startups: Startup dictionaries to index; the first row wins for repeated names
+        """
+        self._exact = {}
+        self._normalized = {}
+        for startup in startups:
+            if not isinstance(startup, dict) or startup.get('company') is None:
+                continue
+            name = str(startup['company'])
+            self._exact.setdefault(name.lower(), startup)
+            self._normalized.setdefault(_match_key(normalize_company_name(name)), startup)
+
+    def get(self, name: str) -> Optional[Dict]:
+        """The startup named ``name``, matched case-insensitively, then by normalized name."""
+        if name is None:
+            return None
+        startup = self._exact.get(str(name).lower())
+        if startup is None:
+            startup = self._normalized.get(_match_key(normalize_company_name(name)))
+        return startup
@@ -0,0 +1,297 @@
+"""
+Offline stand-in for the Anthropic client, for benchmarks and development without API spend.
+Replays recorded responses (or synthesizes plausible ones) with configurable latency and error rates,
+and reports prompt-cache usage for requests that mark cacheable prefixes.
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+import logging
+from types import SimpleNamespace
+from typing import Dict, Optional, Sequence
+
+import anthropic
+import httpx
+
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Errors the fake can inject, by name: (HTTP status, exception class)
+INJECTABLE_ERRORS = {
+    'rate_limit': (429, anthropic.RateLimitError),
+    'overloaded': (529, anthropic.InternalServerError),
+    'server_error': (500, anthropic.InternalServerError),
+    'connection': (None, anthropic.APIConnectionError),
+}
+
+# Prefixes shorter than this are not cached, mirroring the API's minimum cacheable prompt length
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+_BATCH_ITEM = re.compile(r"Startup id (\d+):\n- company: (.+)")
+_COMPANY = re.compile(r"- company: (.+)")
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _blocks(content) -> list:
+    """Normalize a system prompt or message content (a string or a list of text blocks) to blocks."""
+    if not content:
+        return []
+    if isinstance(content, str):
+        return [{'type': 'text', 'text': content}]
+    return list(content)
+
+
+def _request_parts(kwargs: Dict):
+    """(system prompt, user message) of a single-turn messages request, with text blocks joined."""
+    messages = kwargs.get('messages') or []
+    system_prompt = "".join(block['text'] for block in _blocks(kwargs.get('system')))
+    user_message = "".join(block['text'] for block in _blocks(messages[-1]['content'])) if messages else ""
+    return system_prompt, user_message
+
+
+def _cacheable_prefix(kwargs: Dict) -> str:
+    """Text up to and including the last block marked with ``cache_control`` (system first, then messages)."""
+    blocks = _blocks(kwargs.get('system'))
+    for message in kwargs.get('messages') or []:
+        blocks += _blocks(message['content'])
+    marked = [i for i, block in enumerate(blocks) if block.get('cache_control')]
+    return "".join(block['text'] for block in blocks[:marked[-1] + 1]) if marked else ""
+
+
+def _request_key(kwargs: Dict) -> str:
+    system_prompt, user_message = _request_parts(kwargs)
+    return ResponseCache.make_key(kwargs.get('model'), system_prompt, user_message, kwargs.get('max_tokens'))
+
+
+def _fit_score(company: str) -> int:
+    """Deterministic pseudo-score so repeated runs produce the same rankings."""
+    return int(hashlib.md5(company.encode('utf-8')).hexdigest(), 16) % 10 + 1
+
+
+def synthesize_response(system_prompt: str, user_message: str) -> str:
+    """Produce a well-formed response of the shape ClaudeAnalyzer expects for this prompt."""
+    if "valid JSON array" in user_message:
+        return json.dumps([
+            {"id": int(i), "company": company, "claude_fit_score": _fit_score(company),
+             "claude_fit_justification": f"{company} has language-heavy workflows Claude could automate."}
+            for i, company in _BATCH_ITEM.findall(user_message)
+        ])
+
+    if "valid JSON object" in user_message:
+        match = _COMPANY.search(user_message)
+        company = match.group(1) if match else "Unknown Company"
+        response = {}
+        if '"claude_fit_score"' in system_prompt:
+            response['claude_fit_score'] = _fit_score(company)
+            response['claude_fit_justification'] = f"{company} has language-heavy workflows Claude could automate."
+        if '"challenges"' in system_prompt:
+            response['challenges'] = f"{company} must differentiate in a crowded market while scaling support."
+            response['claude_integration_description'] = (
+                f"We recommend **Claude 3.5 Sonnet** to power {company}'s support and analytics workflows."
+            )
+        return json.dumps(response)
+
+    return (
+        "Based on the data provided, the strongest prospects combine B2B models with "
+        "document-heavy workflows. Prioritize outreach to the highest fit scores and lead with "
+        "concrete automation use cases."
+    )
+
+
+class _FakeStream:
+    """Mimics the ``client.messages.stream`` context manager."""
+
+    def __init__(self, client: 'FakeAnthropic', kwargs: Dict):
+        self._client = client
+        self._kwargs = kwargs
+        self._message = None
+
+    def __enter__(self):
+        self._message = self._client._respond(self._kwargs, stream=True)
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        text = self._message.content[0].text
+        words = text.split(" ")
+        delay = self._client._sample_latency() / max(1, len(words)) if self._client.stream_token_delay else 0.0
+        for n, word in enumerate(words):
+            if delay:
+                time.sleep(delay)
+            yield word if n == 0 else " " + word
+
+    def get_final_message(self):
+        return self._message
+
+
+class _FakeMessages:
+    def __init__(self, client: 'FakeAnthropic'):
+        self._client = client
+
+    def create(self, **kwargs):
+        return self._client._respond(kwargs)
+
+    def stream(self, **kwargs):
+        return _FakeStream(self._client, kwargs)
+
+
+class FakeAnthropic:
+    """
+    Drop-in replacement for ``anthropic.Anthropic`` that never touches the network.
+
+    Responses come from a recording made with RecordingClient when one matches the request,
+    otherwise they are synthesized. Each request sleeps for a log-normally distributed latency
+    and fails with probability ``error_rate``, raising the same exception types as the real SDK.
+    """
+
+    def __init__(self, recording_path: Optional[str] = None,
+                 latency_median: float = 0.5, latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, error_types: Sequence[str] = ('rate_limit',),
+                 retry_after: Optional[float] = None, stream_token_delay: bool = True,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            recording_path: JSONL file written by RecordingClient to replay
+            latency_median: Median request latency in seconds (0 for none)
+            latency_sigma: Log-normal shape; larger values give heavier tails
+            error_rate: Probability that a request fails
+            error_types: Names from INJECTABLE_ERRORS to choose injected errors from
+            retry_after: retry-after header (seconds) sent with injected 429/529 responses
+            stream_token_delay: Spread the latency across streamed words instead of front-loading it
+            seed: Random seed for reproducible latency and error sequences
+        """
+        unknown = set(error_types) - set(INJECTABLE_ERRORS)
+        if unknown:
+            raise ValueError(f"Unknown error types: {', '.join(sorted(unknown))}")
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.error_types = list(error_types)
+        self.retry_after = retry_after
+        self.stream_token_delay = stream_token_delay
+        self.requests = 0
+        self.replayed = 0
+        self._prompt_cache = set()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recordings = self._load_recordings(recording_path) if recording_path else {}
+        self.messages = _FakeMessages(self)
+
+    @staticmethod
+    def _load_recordings(path: str) -> Dict[str, Dict]:
+        recordings = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    recordings[record['key']] = record
+        logger.info(f"Loaded {len(recordings)} recorded responses from {path}")
+        return recordings
+
+    def _sample_latency(self) -> float:
+        if self.latency_median <= 0:
+            return 0.0
+        with self._lock:
+            return self.latency_median * self._random.lognormvariate(0, self.latency_sigma)
+
+    def _maybe_fail(self):
+        with self._lock:
+            if self._random.random() >= self.error_rate:
+                return
+            error_type = self._random.choice(self.error_types)
+        status, error_class = INJECTABLE_ERRORS[error_type]
+        request = httpx.Request('POST', 'https://api.anthropic.com/v1/messages')
+        if status is None:
+            raise error_class(request=request)
+        headers = {'retry-after': str(self.retry_after)} if self.retry_after is not None and status in (429, 529) else {}
+        response = httpx.Response(status, request=request, headers=headers)
+        raise error_class(f"Injected {error_type} error", response=response, body=None)
+
+    def _respond(self, kwargs: Dict, stream: bool = False):
+        with self._lock:
+            self.requests += 1
+        if not (stream and self.stream_token_delay):
+            latency = self._sample_latency()
+            if latency:
+                time.sleep(latency)
+        self._maybe_fail()
+
+        system_prompt, user_message = _request_parts(kwargs)
+        record = self._recordings.get(_request_key(kwargs))
+        if record is not None:
+            with self._lock:
+                self.replayed += 1
+            text = record['text']
+            usage = record.get('usage') or {}
+        else:
+            text = synthesize_response(system_prompt, user_message)
+            usage = {}
+        input_tokens = usage.get('input_tokens') or _estimate_tokens(system_prompt + user_message)
+        cache_read = usage.get('cache_read_input_tokens') or 0
+        cache_write = usage.get('cache_creation_input_tokens') or 0
+        prefix = _cacheable_prefix(kwargs)
+        # Recorded responses keep the cache usage the API reported; synthesized ones simulate it
+        if record is None and prefix and _estimate_tokens(prefix) >= PROMPT_CACHE_MIN_TOKENS:
+            prefix_tokens = min(input_tokens, _estimate_tokens(prefix))
+            with self._lock:
+                prompt_cache_key = (kwargs.get('model'), prefix)
+                hit = prompt_cache_key in self._prompt_cache
+                self._prompt_cache.add(prompt_cache_key)
+            cache_read, cache_write = (prefix_tokens, 0) if hit else (0, prefix_tokens)
+            input_tokens -= prefix_tokens
+        return SimpleNamespace(
+            content=[SimpleNamespace(type='text', text=text)],
+            model=kwargs.get('model'),
+            usage=SimpleNamespace(
+                input_tokens=input_tokens,
+                output_tokens=usage.get('output_tokens') or _estimate_tokens(text),
+                cache_read_input_tokens=cache_read,
+                cache_creation_input_tokens=cache_write,
+            ),
+        )
+
+
+class RecordingClient:
+    """
+    Wraps a real Anthropic client and appends every completed ``messages.create`` request to a
+    JSONL file that FakeAnthropic can replay later. Streamed requests pass through unrecorded.
+    """
+
+    def __init__(self, client, path: str):
+        """
+        Args:
+            client: A real ``anthropic.Anthropic`` client
+            path: JSONL file that recordings are appended to
+        """
+        self._client = client
+        self.path = path
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create, stream=self._client.messages.stream)
+
+    def _create(self, **kwargs):
+        response = self._client.messages.create(**kwargs)
+        usage = getattr(response, 'usage', None)
+        record = {
+            'key': _request_key(kwargs),
+            'text': response.content[0].text if response.content else "",
+            'usage': {
+                'input_tokens': getattr(usage, 'input_tokens', None),
+                'output_tokens': getattr(usage, 'output_tokens', None),
+                'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None),
+                'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None),
+            },
+        }
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return response
@@ -0,0 +1,243 @@
+"""
+SQLite-backed queue of scoring jobs, shared by the Streamlit app and the scoring worker process.
+Jobs and their rows survive app reruns and worker restarts; results are written as each row completes.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from typing import List, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_DB_PATH = os.getenv('CLAUDE_JOB_DB_PATH', '.scoring_jobs.sqlite')
+
+# A running job whose worker has not reported progress for this long is handed to another worker
+STALE_JOB_SECONDS = 120
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+
+class JobQueue:
+    """Durable queue of scoring jobs; safe to use from several threads and processes."""
+
+    def __init__(self, path: str = DEFAULT_JOB_DB_PATH):
+        """
+        Args:
+            path: SQLite database file shared by the app and the workers
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                enrich INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                heartbeat_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS job_rows (
+                job_id INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                scored INTEGER NOT NULL DEFAULT 0,
+                scored_order INTEGER,
+                PRIMARY KEY (job_id, idx)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+            CREATE TABLE IF NOT EXISTS worker_metrics (
+                worker TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        # Queues created before rows were numbered in scoring order lack the column
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(job_rows)")]
+        if 'scored_order' not in columns:
+            self._conn.execute("ALTER TABLE job_rows ADD COLUMN scored_order INTEGER")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_rows_scored_order ON job_rows (job_id, scored_order)")
+
+    def submit(self, startups: List[Dict], enrich: bool = False, name: Optional[str] = None) -> int:
+        """
+        Queue a scoring job.
+
+        Args:
+            startups: Startup dictionaries to score
+            enrich: Also infer challenges and integration ideas
+            name: Label shown in the UI (e.g. the uploaded file name)
+
+        Returns:
+            The new job's id
+        """
+        rows = [row for row in startups if isinstance(row, dict)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                job_id = self._conn.execute(
+                    "INSERT INTO jobs (name, enrich, status, total, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                    (name, int(enrich), len(rows), time.time())
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO job_rows (job_id, idx, data) VALUES (?, ?, ?)",
+                    ((job_id, i, json.dumps(row, default=str)) for i, row in enumerate(rows))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Queued scoring job {job_id} ({len(rows)} startups)")
+        return job_id
+
+    def claim_next(self, worker: str) -> Optional[Dict]:
+        """Atomically take the oldest queued job, marking it running for ``worker``."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, started_at = COALESCE(started_at, ?), "
+                        "heartbeat_at = ? WHERE id = ?",
+                        (worker, now, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row is not None else None
+
+    def pending_rows(self, job_id: int) -> List[Tuple[int, Dict]]:
+        """(index, startup) for every row of a job that has not been scored yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, data FROM job_rows WHERE job_id = ? AND scored = 0 ORDER BY idx", (job_id,)
+            ).fetchall()
+        return [(idx, json.loads(data)) for idx, data in rows]
+
+    def record_results(self, job_id: int, results: List[Tuple[int, Dict]]):
+        """Store scored rows and advance the job's progress (also serves as a heartbeat)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Rows are numbered in the order they were scored, so readers can fetch just the new ones
+                last_order = self._conn.execute(
+                    "SELECT COALESCE(MAX(scored_order), 0) FROM job_rows WHERE job_id = ?", (job_id,)
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "UPDATE job_rows SET data = ?, scored = 1, scored_order = ? WHERE job_id = ? AND idx = ?",
+                    ((json.dumps(row, default=str), last_order + n, job_id, idx)
+                     for n, (idx, row) in enumerate(results, start=1))
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET completed = (SELECT COUNT(*) FROM job_rows WHERE job_id = ? AND scored = 1), "
+                    "heartbeat_at = ? WHERE id = ?",
+                    (job_id, time.time(), job_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: int):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def finish(self, job_id: int, error: Optional[str] = None):
+        """Mark a job done, or failed with ``error``."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                ('failed' if error else 'done', error, time.time(), job_id)
+            )
+
+    def requeue_stale(self, stale_seconds: float = STALE_JOB_SECONDS) -> int:
+        """Hand running jobs whose worker went silent back to the queue; scored rows are kept."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND heartbeat_at < ?",
+                (time.time() - stale_seconds,)
+            )
+        if cursor.rowcount:
+            logger.warning(f"Re-queued {cursor.rowcount} stale scoring jobs")
+        return cursor.rowcount
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """Status of one job, or None if it does not exist."""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            columns = [c[0] for c in cursor.description]
+        if row is None:
+            return None
+        job = dict(zip(columns, row))
+        job['enrich'] = bool(job['enrich'])
+        return job
+
+    def save_worker_metrics(self, worker: str, report: Dict):
+        """Store a worker's latest metrics report, replacing its previous one."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, data, updated_at) VALUES (?, ?, ?)",
+                (worker, json.dumps(report), time.time())
+            )
+
+    def worker_metrics(self) -> List[Dict]:
+        """Latest metrics report of every worker that has run against this queue."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM worker_metrics ORDER BY worker").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def scored_since(self, job_id: int, after: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Rows of a job scored after a previous call, in the order they were scored.
+
+        Args:
+            job_id: Job to read
+            after: Position returned by the previous call (0 for every scored row)
+
+        Returns:
+            Tuple of (newly scored rows, position to pass to the next call)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT scored_order, data FROM job_rows WHERE job_id = ? AND scored_order > ? ORDER BY scored_order",
+                (job_id, after)
+            ).fetchall()
+        return [json.loads(data) for _, data in rows], rows[-1][0] if rows else after
+
+    def results(self, job_id: int, scored_only: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Rows of a job in their original order, including partial results of a running job.
+
+        Args:
+            job_id: Job to read
+            scored_only: Only return rows that have been scored
+            limit: Maximum number of rows to return
+        """
+        query = "SELECT data FROM job_rows WHERE job_id = ?"
+        if scored_only:
+            query += " AND scored = 1"
+        query += " ORDER BY idx"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(query, (job_id,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
@@ -0,0 +1,123 @@
+"""
+Persistent store of scored leads, keyed by a content hash of each input row.
+Lets uploads skip re-scoring rows that have not changed since they were last analyzed.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import List, Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEAD_STORE_PATH = os.getenv('CLAUDE_LEAD_STORE_PATH', '.scored_leads.sqlite')
+
+# Fields produced by Claude analysis; everything else in a row is treated as input
+RESULT_FIELDS = ['claude_fit_score', 'claude_fit_justification', 'challenges', 'claude_integration_description']
+NON_INPUT_FIELDS = set(RESULT_FIELDS) | {'analysis_failed'}
+
+_LOOKUP_BATCH_SIZE = 500
+
+
+class LeadStore:
+    """SQLite table of analysis results, one row per (input content, model)."""
+
+    def __init__(self, path: str = DEFAULT_LEAD_STORE_PATH):
+        """
+        Args:
+            path: SQLite database file (use ":memory:" for a process-local store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scored_leads (
+                row_hash TEXT PRIMARY KEY,
+                company TEXT,
+                claude_fit_score INTEGER,
+                claude_fit_justification TEXT,
+                challenges TEXT,
+                claude_integration_description TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def row_hash(startup: Dict, model: str) -> str:
+        """Hash a row's input fields together with the model that scores it."""
+        inputs = {k: v for k, v in startup.items() if k not in NON_INPUT_FIELDS}
+        payload = json.dumps([model, inputs], sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def load_scored(self, startups: List[Dict], model: str, enriched: bool = False) -> List[int]:
+        """
+        Fill in stored results for rows that were already scored.
+
+        Rows found in the store are updated in place with their saved results. With ``enriched``,
+        rows that were scored but never enriched (no challenges stored) still count as pending.
+
+        Returns:
+            Indices of the rows that still need to be sent to Claude
+        """
+        hashes = [self.row_hash(s, model) if isinstance(s, dict) else None for s in startups]
+        stored = {}
+        unique_hashes = list({h for h in hashes if h is not None})
+        with self._lock:
+            for start in range(0, len(unique_hashes), _LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[start:start + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT row_hash, {', '.join(RESULT_FIELDS)} FROM scored_leads WHERE row_hash IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for row in rows:
+                    if enriched and row[RESULT_FIELDS.index('challenges') + 1] is None:
+                        continue
+                    stored[row[0]] = {field: value for field, value in zip(RESULT_FIELDS, row[1:]) if value is not None}
+
+        pending = []
+        for i, (startup, row_hash) in enumerate(zip(startups, hashes)):
+            if row_hash in stored:
+                startup.update(stored[row_hash])
+                startup['analysis_failed'] = False
+            else:
+                pending.append(i)
+
+        logger.info(f"Lead store: {len(startups) - len(pending)} unchanged rows loaded, {len(pending)} to score")
+        return pending
+
+    def save(self, startups: List[Dict], model: str):
+        """
+        Persist the results of successfully analyzed rows; failed analyses are not stored.
+
+        Enrichment fields already stored for a row are kept when it is re-saved without them.
+        """
+        now = time.time()
+        rows = [
+            (self.row_hash(s, model), s.get('company')) + tuple(s.get(field) for field in RESULT_FIELDS) + (now,)
+            for s in startups
+            if isinstance(s, dict) and not s.get('analysis_failed') and s.get('claude_fit_justification')
+        ]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT INTO scored_leads (row_hash, company, {', '.join(RESULT_FIELDS)}, updated_at) "
+                f"VALUES (?, ?, {', '.join('?' * len(RESULT_FIELDS))}, ?) "
+                f"ON CONFLICT(row_hash) DO UPDATE SET company = excluded.company, updated_at = excluded.updated_at, "
+                + ", ".join(f"{field} = COALESCE(excluded.{field}, {field})" for field in RESULT_FIELDS),
+                rows
+            )
+            self._conn.commit()
+        logger.info(f"Lead store: saved {len(rows)} scored rows")
+
+    def count(self) -> int:
+        """Number of stored leads."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scored_leads").fetchone()[0]
@@ -0,0 +1,246 @@
+"""
+Per-method, per-model instrumentation for Claude API calls.
+Records latency percentiles, token and prompt-cache usage, errors and estimated cost, exposed as table rows or Prometheus text.
+"""
+
+import threading
+from collections import Counter, defaultdict, deque
+from typing import List, Dict, Optional
+
+import numpy as np
+
+# USD per million (input, output) tokens; unknown models are reported with zero cost
+MODEL_PRICING = {
+    'claude-3-5-sonnet-20241022': (3.00, 15.00),
+    'claude-3-5-haiku-20241022': (0.80, 4.00),
+    'claude-3-opus-20240229': (15.00, 75.00),
+    'claude-3-haiku-20240307': (0.25, 1.25),
+}
+
+# Prompt-cache pricing relative to the model's input price: reads are discounted, writes carry a premium
+CACHE_READ_PRICE_FACTOR = 0.1
+CACHE_WRITE_PRICE_FACTOR = 1.25
+
+# Latency percentiles are computed over the most recent calls of each method
+LATENCY_WINDOW = 10000
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int,
+                  cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """Estimated USD cost of one request, including prompt-cache reads and writes."""
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    cached_input = cache_read_tokens * CACHE_READ_PRICE_FACTOR + cache_write_tokens * CACHE_WRITE_PRICE_FACTOR
+    return ((input_tokens + cached_input) * input_price + output_tokens * output_price) / 1_000_000
+
+
+class _MethodStats:
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.cache_hits = 0
+        self.escalations = 0
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.cost = 0.0
+        self.errors = Counter()
+
+
+class ClaudeMetrics:
+    """Thread-safe counters for every request ClaudeAnalyzer sends, keyed by method and model (the route)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = defaultdict(_MethodStats)
+
+    def record_request(self, method: str, model: str, latency: float, usage=None):
+        """
+        Record a completed API request.
+
+        Args:
+            method: ClaudeAnalyzer method that issued the request
+            model: Model the request was sent to
+            latency: Wall-clock seconds for the request
+            usage: The response's ``usage`` object (input_tokens / output_tokens and the prompt-cache
+                counts cache_read_input_tokens / cache_creation_input_tokens), if any
+        """
+        input_tokens = getattr(usage, 'input_tokens', 0) or 0
+        output_tokens = getattr(usage, 'output_tokens', 0) or 0
+        cache_read_tokens = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write_tokens = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        with self._lock:
+            stats = self._methods[(method, model)]
+            stats.requests += 1
+            stats.latencies.append(latency)
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cache_read_tokens += cache_read_tokens
+            stats.cache_write_tokens += cache_write_tokens
+            stats.cost += estimate_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+
+    def record_error(self, method: str, error: Exception, model: str = ""):
+        """Record a failed API request attempt, keyed by exception type."""
+        with self._lock:
+            self._methods[(method, model)].errors[type(error).__name__] += 1
+
+    def record_cache_hit(self, method: str, model: str = ""):
+        """Record a request served from the response cache."""
+        with self._lock:
+            self._methods[(method, model)].cache_hits += 1
+
+    def record_escalation(self, method: str, model: str):
+        """Record a response from ``model`` that failed validation and was retried on a larger model."""
+        with self._lock:
+            self._methods[(method, model)].escalations += 1
+
+    def record_retry(self, method: str, model: str):
+        """Record a failed attempt that the scheduler is about to retry."""
+        with self._lock:
+            self._methods[(method, model)].retries += 1
+
+    def snapshot(self) -> List[Dict]:
+        """One row of statistics per method and model, most expensive first."""
+        rows = []
+        with self._lock:
+            for (method, model), stats in self._methods.items():
+                latencies = np.array(stats.latencies, dtype=np.float64)
+                p50, p95, p99 = np.quantile(latencies, QUANTILES) if len(latencies) else (None, None, None)
+                rows.append({
+                    'method': method,
+                    'model': model,
+                    'requests': stats.requests,
+                    'cache_hits': stats.cache_hits,
+                    'escalations': stats.escalations,
+                    'retries': stats.retries,
+                    'errors': sum(stats.errors.values()),
+                    'p50_s': p50,
+                    'p95_s': p95,
+                    'p99_s': p99,
+                    'input_tokens': stats.input_tokens,
+                    'output_tokens': stats.output_tokens,
+                    'cache_read_tokens': stats.cache_read_tokens,
+                    'cache_write_tokens': stats.cache_write_tokens,
+                    'cost_usd': round(stats.cost, 4),
+                    'errors_by_type': dict(stats.errors),
+                })
+        return sorted(rows, key=lambda row: row['cost_usd'], reverse=True)
+
+    def total_cost(self) -> float:
+        with self._lock:
+            return sum(stats.cost for stats in self._methods.values())
+
+    def prompt_cache_read_ratio(self) -> float:
+        """Share of all prompt tokens that were read from the provider's prompt cache."""
+        with self._lock:
+            read = sum(stats.cache_read_tokens for stats in self._methods.values())
+            total = read + sum(stats.input_tokens + stats.cache_write_tokens for stats in self._methods.values())
+        return read / total if total else 0.0
+
+    def to_prometheus(self, extra_gauges: Optional[Dict[str, float]] = None) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Args:
+            extra_gauges: Additional unlabelled gauges to include (e.g. scheduler or cache state)
+        """
+        lines = [
+            "# HELP claude_request_latency_seconds Latency of Claude API requests.",
+            "# TYPE claude_request_latency_seconds summary",
+        ]
+        counters = {
+            'claude_requests_total': ("Claude API requests that completed.", []),
+            'claude_cache_hits_total': ("Requests served from the response cache.", []),
+            'claude_escalations_total': ("Responses that failed validation and were retried on a larger model.", []),
+            'claude_request_retries_total': ("Failed Claude API request attempts that were retried.", []),
+            'claude_input_tokens_total': ("Input tokens sent to Claude.", []),
+            'claude_output_tokens_total': ("Output tokens generated by Claude.", []),
+            'claude_cache_read_input_tokens_total': ("Input tokens read from the prompt cache.", []),
+            'claude_cache_creation_input_tokens_total': ("Input tokens written to the prompt cache.", []),
+            'claude_cost_usd_total': ("Estimated Claude API cost in USD.", []),
+            'claude_errors_total': ("Failed Claude API request attempts.", []),
+        }
+        with self._lock:
+            for (method, model), stats in sorted(self._methods.items()):
+                label = f'method="{method}",model="{model}"'
+                if stats.latencies:
+                    latencies = np.array(stats.latencies, dtype=np.float64)
+                    for quantile, value in zip(QUANTILES, np.quantile(latencies, QUANTILES)):
+                        lines.append(f'claude_request_latency_seconds{{{label},quantile="{quantile}"}} {value:.6f}')
+                    lines.append(f'claude_request_latency_seconds_sum{{{label}}} {latencies.sum():.6f}')
+                    lines.append(f'claude_request_latency_seconds_count{{{label}}} {len(latencies)}')
+                counters['claude_requests_total'][1].append(f'{{{label}}} {stats.requests}')
+                counters['claude_cache_hits_total'][1].append(f'{{{label}}} {stats.cache_hits}')
+                counters['claude_escalations_total'][1].append(f'{{{label}}} {stats.escalations}')
+                counters['claude_request_retries_total'][1].append(f'{{{label}}} {stats.retries}')
+                counters['claude_input_tokens_total'][1].append(f'{{{label}}} {stats.input_tokens}')
+                counters['claude_output_tokens_total'][1].append(f'{{{label}}} {stats.output_tokens}')
+                counters['claude_cache_read_input_tokens_total'][1].append(f'{{{label}}} {stats.cache_read_tokens}')
+                counters['claude_cache_creation_input_tokens_total'][1].append(f'{{{label}}} {stats.cache_write_tokens}')
+                counters['claude_cost_usd_total'][1].append(f'{{{label}}} {stats.cost:.6f}')
+                for error_type, count in sorted(stats.errors.items()):
+                    counters['claude_errors_total'][1].append(f'{{{label},type="{error_type}"}} {count}')
+
+        for name, (help_text, samples) in counters.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{sample}" for sample in samples)
+
+        for name, value in (extra_gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_state(self, max_latencies: int = 1000) -> Dict:
+        """
+        JSON-serializable copy of every counter, for reporting metrics from another process.
+
+        Args:
+            max_latencies: Most recent latencies kept per method and model
+        """
+        with self._lock:
+            return {'methods': [
+                {
+                    'method': method,
+                    'model': model,
+                    'latencies': list(stats.latencies)[-max_latencies:],
+                    'requests': stats.requests,
+                    'cache_hits': stats.cache_hits,
+                    'escalations': stats.escalations,
+                    'retries': stats.retries,
+                    'input_tokens': stats.input_tokens,
+                    'output_tokens': stats.output_tokens,
+                    'cache_read_tokens': stats.cache_read_tokens,
+                    'cache_write_tokens': stats.cache_write_tokens,
+                    'cost': stats.cost,
+                    'errors': dict(stats.errors),
+                }
+                for (method, model), stats in self._methods.items()
+            ]}
+
+    def merge_state(self, state: Dict):
+        """Add the counters of a ``to_state`` copy (e.g. from a scoring worker) to this registry."""
+        with self._lock:
+            for row in state.get('methods', []):
+                stats = self._methods[(row['method'], row['model'])]
+                stats.latencies.extend(row['latencies'])
+                stats.requests += row['requests']
+                stats.cache_hits += row['cache_hits']
+                stats.escalations += row['escalations']
+                stats.retries += row.get('retries', 0)  # Missing in reports from workers started before retries were counted
+                stats.input_tokens += row['input_tokens']
+                stats.output_tokens += row['output_tokens']
+                stats.cache_read_tokens += row['cache_read_tokens']
+                stats.cache_write_tokens += row['cache_write_tokens']
+                stats.cost += row['cost']
+                stats.errors.update(row['errors'])
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+
+
+# Shared by every ClaudeAnalyzer in the process so the diagnostics cover all sessions
+default_metrics = ClaudeMetrics()
@@ -0,0 +1,213 @@
+"""
+Shared request scheduler for Claude API calls.
+Retries transient failures with jittered exponential backoff (honouring retry-after hints) and
+adapts the number of concurrent requests with an AIMD window that shrinks on 429s and grows on success.
+"""
+
+import os
+import time
+import random
+import threading
+import logging
+from typing import Callable, Iterator, Optional, Any
+
+import anthropic
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Defaults can be overridden from the .env file
+DEFAULT_MAX_RETRIES = int(os.getenv('CLAUDE_MAX_RETRIES', '6'))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('CLAUDE_MAX_CONCURRENCY', '8'))
+DEFAULT_INITIAL_CONCURRENCY = float(os.getenv('CLAUDE_INITIAL_CONCURRENCY', '2'))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# 429 (rate limited) and 529 (overloaded) mean we are sending too much; other codes are just transient
+THROTTLE_STATUS_CODES = {429, 529}
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, 'status_code', None)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for errors worth retrying: rate limits, overload, server errors and connection failures."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    status = _status_code(error)
+    return status is not None and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+
+def is_throttle(error: Exception) -> bool:
+    """True for errors that signal the request rate is too high."""
+    return _status_code(error) in THROTTLE_STATUS_CODES
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's retry-after hint from an API error, if it sent one."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    for header, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except (TypeError, ValueError):
+            continue  # HTTP-date values are not worth parsing; fall back to backoff
+    return None
+
+
+class RequestScheduler:
+    """
+    Gate for every Claude request made by one ClaudeAnalyzer.
+
+    Up to ``window`` requests run at once. Each success grows the window by roughly one slot per
+    window's worth of requests (additive increase); a 429/529 halves it (multiplicative decrease),
+    at most once per congestion event. Failed attempts are retried after a jittered backoff.
+    """
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 initial_concurrency: float = DEFAULT_INITIAL_CONCURRENCY,
+                 min_concurrency: float = 1.0):
+        """
+        Args:
+            max_retries: Retries per request after the first attempt
+            max_concurrency: Upper bound on the concurrency window
+            initial_concurrency: Starting concurrency window
+            min_concurrency: Lower bound on the concurrency window
+        """
+        self.max_retries = max_retries
+        self.max_concurrency = max(1.0, float(max_concurrency))
+        self.min_concurrency = max(1.0, min(min_concurrency, self.max_concurrency))
+        self.window = min(self.max_concurrency, max(self.min_concurrency, initial_concurrency))
+        self.in_flight = 0
+        self.retries = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def _acquire(self) -> float:
+        """Wait for a free slot in the window; returns the time the request started."""
+        with self._condition:
+            while self.in_flight >= int(self.window):
+                self._condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def _release(self, started: float, error: Optional[Exception] = None, completed: bool = True):
+        """Free a slot and adjust the window based on how the request ended."""
+        with self._condition:
+            self.in_flight -= 1
+            if not completed:
+                pass  # Abandoned (e.g. interrupted); says nothing about capacity
+            elif error is None:
+                self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+            elif is_throttle(error):
+                self.throttled += 1
+                # Requests already in flight when the window was cut don't cut it again
+                if started >= self._last_decrease:
+                    self.window = max(self.min_concurrency, self.window / 2)
+                    self._last_decrease = time.monotonic()
+                    logger.warning(f"Claude API throttled ({_status_code(error)}); concurrency window reduced to {self.window:.1f}")
+            self._condition.notify_all()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before the next attempt: full-jitter exponential backoff, never shorter than retry-after."""
+        delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+        hint = retry_after_seconds(error)
+        if hint is not None:
+            delay = max(delay, hint)
+        return delay
+
+    def _should_retry(self, attempt: int, error: Exception,
+                      on_retry: Optional[Callable[[Exception], None]] = None) -> bool:
+        if attempt >= self.max_retries or not is_retryable(error):
+            return False
+        delay = self._backoff(attempt, error)
+        with self._condition:
+            self.retries += 1
+        if on_retry is not None:
+            on_retry(error)
+        logger.warning(f"Claude request failed ({type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        time.sleep(delay)
+        return True
+
+    def call(self, fn: Callable[..., Any], *args,
+             on_retry: Optional[Callable[[Exception], None]] = None, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` inside the concurrency window, retrying transient API errors.
+
+        ``on_retry(error)`` is called before each retry, e.g. to count retries per caller.
+
+        Raises:
+            The last error once retries are exhausted, or any non-retryable error immediately
+        """
+        attempt = 0
+        while True:
+            started = self._acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._release(started, e)
+                if self._should_retry(attempt, e, on_retry):
+                    attempt += 1
+                    continue
+                raise
+            except BaseException:
+                self._release(started, completed=False)
+                raise
+            self._release(started)
+            return result
+
+    def stream(self, open_stream: Callable[[], Any],
+               on_complete: Optional[Callable[[Any], None]] = None,
+               on_retry: Optional[Callable[[Exception], None]] = None) -> Iterator[str]:
+        """
+        Yield text from ``open_stream()`` (a ``client.messages.stream`` context manager) inside the window.
+
+        Failures before the first text delta are retried; once text has been yielded a failure is raised,
+        since the caller has already shown part of the response. ``on_complete(stream)`` is called
+        after the last delta of a successful stream, while it is still open, and ``on_retry(error)``
+        before each retry.
+        """
+        attempt = 0
+        while True:
+            started = self._acquire()
+            yielded = False
+            try:
+                with open_stream() as stream:
+                    for text in stream.text_stream:
+                        yielded = True
+                        yield text
+                    if on_complete is not None:
+                        on_complete(stream)
+            except Exception as e:
+                self._release(started, e)
+                if not yielded and self._should_retry(attempt, e, on_retry):
+                    attempt += 1
+                    continue
+                raise
+            except BaseException:
+                # Includes GeneratorExit when the consumer stops reading early
+                self._release(started, completed=False)
+                raise
+            self._release(started)
+            return
+
+    def stats(self) -> dict:
+        """Current window and retry counters, for diagnostics."""
+        with self._condition:
+            return {
+                'window': round(self.window, 2),
+                'in_flight': self.in_flight,
+                'retries': self.retries,
+                'throttled': self.throttled,
+            }
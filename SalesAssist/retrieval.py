@@ -0,0 +1,116 @@
+"""
+Local BM25 retrieval over startup records.
+Lets chat requests send only the startups relevant to a question instead of the whole table.
+"""
+
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Fields that describe what a startup does; these are what questions are matched against
+SEARCH_FIELDS = [
+    'company', 'industry', 'business_model', 'target_audience', 'pain_point',
+    'solution', 'use_case', 'tech_stack', 'claude_fit_justification',
+]
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'for', 'from', 'how', 'in',
+    'is', 'it', 'its', 'me', 'most', 'of', 'on', 'or', 'our', 'that', 'the', 'their', 'them',
+    'these', 'this', 'to', 'what', 'which', 'who', 'why', 'with', 'would', 'startup', 'startups',
+    'company', 'companies', 'n', 'nan',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens with stopwords removed."""
+    return [token for token in re.findall(r"[a-z0-9]+", str(text).lower()) if token not in STOPWORDS]
+
+
+class StartupIndex:
+    """BM25 index over a list of startup dictionaries."""
+
+    def __init__(self, startups: List[Dict], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            startups: List of startup dictionaries to index
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.startups = startups
+        self.k1 = k1
+        self.b = b
+
+        postings = defaultdict(list)
+        doc_lengths = []
+        for doc_id, startup in enumerate(startups):
+            if not isinstance(startup, dict):
+                doc_lengths.append(0)
+                continue
+            tokens = tokenize(" ".join(str(startup.get(field, '')) for field in SEARCH_FIELDS))
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append((doc_id, tf))
+
+        self.doc_lengths = np.array(doc_lengths, dtype=np.float64)
+        avg_length = self.doc_lengths.mean() if len(doc_lengths) else 0.0
+        self.length_norm = 1 - b + b * (self.doc_lengths / avg_length if avg_length else 0.0)
+
+        n_docs = len(startups)
+        self.postings = {}
+        for term, entries in postings.items():
+            doc_ids = np.fromiter((doc_id for doc_id, _ in entries), dtype=np.int64, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float64, count=len(entries))
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self.postings[term] = (doc_ids, tfs, idf)
+
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Rank startups against a query.
+
+        Returns:
+            Up to ``top_k`` (index, score) pairs with a positive score, best first
+        """
+        scores = np.zeros(len(self.startups), dtype=np.float64)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tfs, idf = self.postings[term]
+            scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + self.k1 * self.length_norm[doc_ids])
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        ranked = matched[np.argsort(-scores[matched], kind='stable')]
+        return [(int(i), float(scores[i])) for i in ranked]
+
+    def select(self, query: str, top_k: int = 20) -> List[Dict]:
+        """
+        Pick the startups to send as context for a question.
+
+        Lexical matches come first; any remaining slots are filled with the highest
+        Claude fit scores so broad questions ("who are the top prospects?") still get context.
+        """
+        selected = [i for i, _ in self.search(query, top_k)]
+        if len(selected) < top_k:
+            chosen = set(selected)
+            by_score = sorted(
+                (i for i, s in enumerate(self.startups) if isinstance(s, dict) and i not in chosen),
+                key=lambda i: self._fit_score(self.startups[i]),
+                reverse=True,
+            )
+            selected.extend(by_score[:top_k - len(selected)])
+        return [self.startups[i] for i in selected]
+
+    @staticmethod
+    def _fit_score(startup: Dict) -> float:
+        try:
+            return float(startup.get('claude_fit_score', 0))
+        except (TypeError, ValueError):
+            return 0.0
+
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Headless bulk scorer for Claude Startup Insights Bot.
+
+Usage:
+    python salesassist.py score input.csv -o out.parquet
+
+The input is read in chunks, each scored chunk is written to disk as soon as it
+completes, and a checkpoint file lets an interrupted run resume where it stopped.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import logging
+from typing import Dict, Optional
+
+import pandas as pd
+
+from claude_analyzer import ClaudeAnalyzer
+from scoring_engine import score_startups, DEFAULT_MAX_IN_FLIGHT, DEFAULT_REQUESTS_PER_SECOND
+from data_parsing import COLUMN_MAPPING, iter_table_chunks, is_mapped_column, standardize_records
+from lead_store import LeadStore, DEFAULT_LEAD_STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('.parquet', '.csv', '.jsonl')
+TEXT_COLUMNS = list(COLUMN_MAPPING.keys()) + ['claude_fit_justification', 'challenges', 'claude_integration_description']
+
+
+def _output_format(output_path: str) -> str:
+    """Return the output file extension, validating that it is supported."""
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{ext}'. Use one of: {', '.join(OUTPUT_FORMATS)}")
+    return ext
+
+
+def _input_fingerprint(input_path: str) -> Dict:
+    """Identify the input file so a checkpoint is never resumed against different data."""
+    stat = os.stat(input_path)
+    return {'input': os.path.abspath(input_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _load_checkpoint(checkpoint_path: str, fingerprint: Dict, chunk_size: int) -> Dict:
+    """Load an existing checkpoint, or start a fresh one."""
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('fingerprint') != fingerprint or checkpoint.get('chunk_size') != chunk_size:
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} was created for a different input or chunk size. "
+                "Re-run with --restart to discard it."
+            )
+        return checkpoint
+
+    return {'fingerprint': fingerprint, 'chunk_size': chunk_size, 'completed_chunks': {}, 'failed_chunks': {}}
+
+
+def _save_checkpoint(checkpoint_path: str, checkpoint: Dict):
+    """Atomically persist the checkpoint."""
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _to_frame(records) -> pd.DataFrame:
+    """Build a DataFrame with a stable schema so every chunk can be appended to the same output."""
+    df = pd.DataFrame(records)
+    # Empty input (or a chunk without usable rows) still gets every column, so the output has a header
+    for column in TEXT_COLUMNS + ['claude_fit_score', 'analysis_failed']:
+        if column not in df.columns:
+            df[column] = pd.NA
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].astype('string')
+    df['claude_fit_score'] = pd.to_numeric(df['claude_fit_score'], errors='coerce').astype('Int64')
+    # Tells the fallback score given when the API call failed apart from a real score
+    df['analysis_failed'] = df['analysis_failed'].astype('boolean')
+    return df[list(COLUMN_MAPPING.keys()) + ['claude_fit_score', 'analysis_failed'] + TEXT_COLUMNS[len(COLUMN_MAPPING):]]
+
+
+def _write_part(df: pd.DataFrame, part_path: str, ext: str):
+    """Write one scored chunk, renaming into place only once the file is complete."""
+    tmp_path = part_path + '.tmp'
+    if ext == '.parquet':
+        df.to_parquet(tmp_path, index=False)
+    elif ext == '.csv':
+        df.to_csv(tmp_path, index=False)
+    else:
+        df.to_json(tmp_path, orient='records', lines=True)
+    os.replace(tmp_path, part_path)
+
+
+def _combine_parts(part_paths, output_path: str, ext: str):
+    """Concatenate the chunk files into the final output one part at a time."""
+    tmp_path = output_path + '.tmp'
+    if ext == '.parquet':
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for part_path in part_paths:
+                table = pq.read_table(part_path)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            _to_frame([]).to_parquet(tmp_path, index=False)
+    else:
+        with open(tmp_path, 'wb') as out:
+            if ext == '.csv' and not part_paths:
+                out.write((','.join(_to_frame([]).columns) + '\n').encode('utf-8'))
+            for n, part_path in enumerate(part_paths):
+                with open(part_path, 'rb') as part:
+                    if ext == '.csv' and n > 0:
+                        part.readline()  # Skip the repeated header
+                    shutil.copyfileobj(part, out)
+    os.replace(tmp_path, output_path)
+
+
+def score_file(input_path: str, output_path: str, chunk_size: int = 500,
+               max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+               requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+               batch_mode: bool = True, restart: bool = False,
+               lead_store_path: str = DEFAULT_LEAD_STORE_PATH, enrich: bool = False,
+               metrics_path: Optional[str] = None, dedupe: bool = True) -> int:
+    """
+    Score every startup in a CSV or Excel file and write the results to ``output_path``.
+
+    Args:
+        input_path: CSV or Excel file with startup data
+        output_path: Destination (.parquet, .csv or .jsonl)
+        chunk_size: Number of input rows read and scored per chunk
+        max_in_flight: Maximum number of concurrent API requests
+        requests_per_second: Sustained request rate
+        batch_mode: Pack several startups into each scoring request
+        restart: Discard any existing checkpoint and start over
+        lead_store_path: Store of previously scored rows; unchanged rows are not re-scored (None to disable)
+        enrich: Also infer challenges and a Claude integration description in the same request as each score
+        metrics_path: Write Prometheus-format request metrics here after every chunk
+        dedupe: Score one representative per duplicated company within each chunk
+
+    Returns:
+        Number of scored startups written
+    """
+    ext = _output_format(output_path)
+    parts_dir = output_path + '.parts'
+    checkpoint_path = output_path + '.checkpoint.json'
+
+    if restart:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    checkpoint = _load_checkpoint(checkpoint_path, _input_fingerprint(input_path), chunk_size)
+    completed_chunks = checkpoint['completed_chunks']  # chunk index (as a string) -> scored rows
+    # Chunks written with some failed analyses; they are scored again on resume, and the
+    # lead store means only their failed rows are sent to Claude again
+    failed_chunks = checkpoint.setdefault('failed_chunks', {})
+    if completed_chunks:
+        print(f"↩️  Resuming from checkpoint: {len(completed_chunks)} chunks ({sum(completed_chunks.values())} startups) already scored")
+    if failed_chunks:
+        print(f"🔁 Retrying failed analyses in {len(failed_chunks)} chunks")
+    os.makedirs(parts_dir, exist_ok=True)
+
+    analyzer = ClaudeAnalyzer()
+    lead_store = LeadStore(lead_store_path) if lead_store_path else None
+    part_paths = []
+    for chunk_index, chunk in enumerate(iter_table_chunks(input_path, input_path, chunk_size, usecols=is_mapped_column)):
+        part_path = os.path.join(parts_dir, f"part-{chunk_index:06d}{ext}")
+        part_paths.append(part_path)
+        if str(chunk_index) in completed_chunks and os.path.exists(part_path):
+            continue
+
+        records, discarded_rows = standardize_records(chunk)
+        if discarded_rows:
+            logger.warning(f"Chunk {chunk_index}: discarded {len(discarded_rows)} rows without a company name")
+
+        to_score = records
+        if lead_store is not None:
+            to_score = [records[i] for i in lead_store.load_scored(records, analyzer.scoring_model(enrich), enriched=enrich)]
+        score_startups(analyzer, to_score, max_in_flight=max_in_flight,
+                       requests_per_second=requests_per_second, batch_mode=batch_mode, enrich=enrich,
+                       dedupe=dedupe)
+        if lead_store is not None:
+            lead_store.save(to_score, analyzer.scoring_model(enrich))
+        scored = records
+        _write_part(_to_frame(scored), part_path, ext)
+
+        failed = sum(1 for row in scored if row.get('analysis_failed'))
+        if failed:
+            failed_chunks[str(chunk_index)] = len(scored)
+        else:
+            failed_chunks.pop(str(chunk_index), None)
+            completed_chunks[str(chunk_index)] = len(scored)
+        _save_checkpoint(checkpoint_path, checkpoint)
+        if metrics_path:
+            with open(metrics_path, 'w') as f:
+                f.write(analyzer.prometheus_metrics())
+        total = sum(completed_chunks.values()) + sum(failed_chunks.values())
+        if failed:
+            print(f"⚠️ Chunk {chunk_index + 1}: scored {len(scored)} startups, {failed} analyses failed ({total} total)")
+        else:
+            print(f"✅ Chunk {chunk_index + 1}: scored {len(scored)} startups ({total} total)")
+
+    _combine_parts(part_paths, output_path, ext)
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    os.remove(checkpoint_path)
+    return sum(completed_chunks.values()) + sum(failed_chunks.values())
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(prog='salesassist', description="Claude Startup Insights Bot command-line tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = subparsers.add_parser('score', help="Score a CSV or Excel file of startups without the web UI")
+    score_parser.add_argument('input', help="CSV or Excel file with startup data")
+    score_parser.add_argument('-o', '--output', required=True, help="Output file (.parquet, .csv or .jsonl)")
+    score_parser.add_argument('--chunk-size', type=int, default=500, help="Rows read and scored per chunk (default: 500)")
+    score_parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT, help="Maximum concurrent API requests")
+    score_parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND, help="Sustained request rate")
+    score_parser.add_argument('--no-batch', action='store_true', help="Send one startup per request instead of batching")
+    score_parser.add_argument('--restart', action='store_true', help="Ignore any checkpoint and score the whole file again")
+    score_parser.add_argument('--enrich', action='store_true', help="Also infer challenges and Claude integration ideas (one request per startup)")
+    score_parser.add_argument('--metrics-file', help="Write Prometheus-format latency, token and cost metrics to this file")
+    score_parser.add_argument('--no-dedupe', action='store_true', help="Score every row even when several rows describe the same company")
+    score_parser.add_argument('--no-lead-store', action='store_true', help="Re-score every row instead of reusing previously scored leads")
+
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        total = score_file(
+            args.input, args.output,
+            chunk_size=args.chunk_size,
+            max_in_flight=args.max_in_flight,
+            requests_per_second=args.requests_per_second,
+            batch_mode=not args.no_batch,
+            restart=args.restart,
+            lead_store_path=None if args.no_lead_store else DEFAULT_LEAD_STORE_PATH,
+            enrich=args.enrich,
+            metrics_path=args.metrics_file,
+            dedupe=not args.no_dedupe,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted. Re-run the same command to resume from the last checkpoint.")
+        sys.exit(130)
+
+    print(f"🎉 Wrote {total} scored startups to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
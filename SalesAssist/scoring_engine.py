@@ -0,0 +1,205 @@
+"""
+Concurrent scoring engine for the Claude-powered insights bot.
+Runs Claude fit-score requests on a bounded thread pool, paced by a token-bucket rate limiter,
+optionally packing several startups into each request.
+"""
+
+import os
+import time
+import threading
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Callable, Optional
+from dotenv import load_dotenv
+
+from dedup import cluster_duplicates, rename_result
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Defaults can be overridden from the .env file
+# The worker pool is an upper bound; the analyzer's AIMD window decides how many requests actually run
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv('CLAUDE_MAX_IN_FLIGHT', '8'))
+DEFAULT_REQUESTS_PER_SECOND = float(os.getenv('CLAUDE_REQUESTS_PER_SECOND', '2'))
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to one second's worth of tokens)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until the requested number of tokens is available, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def _fallback_score(justification: str) -> Dict:
+    """Build the neutral score used whenever a row could not be analyzed."""
+    return {"claude_fit_score": 5, "claude_fit_justification": justification, "analysis_failed": True}
+
+
+def _validate_fit_score(fit_score_data, company_name) -> Dict:
+    """Ensure a fit score result is a dict with both a score and a justification."""
+    if not fit_score_data:
+        logger.error(f"No fit score data returned for {company_name}")
+        return _fallback_score("Analysis failed - no data returned")
+
+    if not isinstance(fit_score_data, dict):
+        logger.error(f"Invalid fit score data type for {company_name}: {type(fit_score_data)}")
+        return _fallback_score("Analysis failed - invalid data format")
+
+    if 'claude_fit_score' not in fit_score_data:
+        logger.warning(f"Missing claude_fit_score for {company_name}")
+        fit_score_data['claude_fit_score'] = 5
+
+    if 'claude_fit_justification' not in fit_score_data:
+        logger.warning(f"Missing claude_fit_justification for {company_name}")
+        fit_score_data['claude_fit_justification'] = "Justification not provided"
+
+    fit_score_data.setdefault('analysis_failed', False)
+    return fit_score_data
+
+
+def _score_batch(analyzer, items: List[Dict], rate_limiter: TokenBucket, enrich: bool = False) -> List[Dict]:
+    """Score one unit of work: a single startup, or a batch packed into one request."""
+    rate_limiter.acquire()
+    if enrich:
+        results = [analyzer.analyze_startup(item) for item in items]
+    elif len(items) == 1:
+        results = [analyzer.get_claude_fit_score(items[0])]
+    else:
+        results = analyzer.get_claude_fit_scores_batch(items)
+
+    if not isinstance(results, list) or len(results) != len(items):
+        logger.error(f"Batch of {len(items)} returned {len(results) if isinstance(results, list) else type(results)} results")
+        results = [None] * len(items)
+
+    return [_validate_fit_score(result, item.get('company')) for item, result in zip(items, results)]
+
+
+def score_startups(analyzer, data: List[Dict],
+                   max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                   requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                   batch_mode: bool = False,
+                   on_result: Optional[Callable] = None,
+                   enrich: bool = False,
+                   dedupe: bool = True) -> List[Dict]:
+    """
+    Score startups concurrently while preserving input order.
+
+    Args:
+        analyzer: ClaudeAnalyzer instance used for scoring
+        data: List of startup dictionaries (result fields are added in place; input fields are left unchanged)
+        max_in_flight: Maximum number of concurrent API requests
+        requests_per_second: Sustained request rate enforced by the token bucket
+        batch_mode: Pack several startups into each request (see ClaudeAnalyzer.plan_score_batches)
+        on_result: Optional callback ``on_result(completed, total, item, fit_score_data, error)``
+            invoked from the calling thread as each result completes
+        enrich: Also infer challenges and a Claude integration description, fused into the
+            same request as the score (one request per startup; batch_mode is ignored)
+        dedupe: Score one representative per cluster of duplicate rows and copy its result, with
+            the company name in its text replaced, to the other rows (see dedup.cluster_duplicates)
+
+    Returns:
+        The scored startups, in the same order as the input; rows without a company name are
+        returned as copies named 'Unknown Company N'
+    """
+    total_items = len(data)
+    results: List[Optional[Dict]] = [None] * total_items
+    rate_limiter = TokenBucket(requests_per_second)
+
+    # Rows without a name are scored under a placeholder set on a copy, so the caller's row
+    # (and with it the row's lead store hash) keeps its input fields unchanged
+    rows = list(data)
+    valid_indices = []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            logger.error(f"Item {i+1} is not a dict: {type(item)}")
+            continue
+
+        if not item.get('company'):
+            logger.warning(f"Item {i+1} missing company name")
+            rows[i] = dict(item, company=f'Unknown Company {i+1}')
+
+        valid_indices.append(i)
+
+    # Representative index -> the other rows of its duplicate cluster
+    duplicates_of = {}
+    to_score = valid_indices
+    if dedupe and len(valid_indices) > 1:
+        clusters = cluster_duplicates([rows[i] for i in valid_indices])
+        to_score = sorted(valid_indices[cluster[0]] for cluster in clusters)
+        duplicates_of = {
+            valid_indices[cluster[0]]: [valid_indices[j] for j in cluster[1:]]
+            for cluster in clusters if len(cluster) > 1
+        }
+
+    if batch_mode and not enrich:
+        planned = analyzer.plan_score_batches([rows[i] for i in to_score])
+        units = [[to_score[j] for j in batch] for batch in planned]
+    else:
+        units = [[i] for i in to_score]
+    logger.info(f"Scoring {len(valid_indices)} startups ({len(to_score)} distinct) in {len(units)} requests")
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as executor:
+        futures = {
+            executor.submit(_score_batch, analyzer, [rows[i] for i in unit], rate_limiter, enrich): unit
+            for unit in units
+        }
+
+        completed = 0
+        for future in as_completed(futures):
+            unit = futures[future]
+            error = None
+            try:
+                unit_results = future.result()
+            except Exception as e:
+                companies = ", ".join(rows[i]['company'] for i in unit)
+                logger.error(f"Error processing startups ({companies}): {e}")
+                logger.error(f"Full traceback: {traceback.format_exc()}")
+                error = str(e)
+                unit_results = [_fallback_score(f"Analysis failed: {error}") for _ in unit]
+
+            for i, fit_score_data in zip(unit, unit_results):
+                if not error:
+                    logger.info(f"Successfully processed {rows[i]['company']}: score={fit_score_data.get('claude_fit_score', 'N/A')}")
+                representative = rows[i]['company']
+                for j in [i] + duplicates_of.get(i, []):
+                    item = rows[j]
+                    # Copies must not describe the row under the representative's spelling of the name
+                    item_result = rename_result(fit_score_data, representative, item['company'])
+                    item.update(item_result)
+                    if data[j] is not item:
+                        data[j].update(item_result)
+                    results[j] = item
+                    completed += 1
+
+                    if on_result:
+                        on_result(completed, len(valid_indices), data[j], item_result, error)
+
+    processed_data = [item for item in results if item is not None]
+    logger.info(f"Completed processing {len(processed_data)} startups")
+    return processed_data
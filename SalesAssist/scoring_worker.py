@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Worker process for queued scoring jobs.
+
+Usage:
+    python scoring_worker.py
+
+Claims jobs from the SQLite job queue one at a time, applies stored scores from the lead store,
+scores the remaining rows with Claude and writes results back as they complete. The Streamlit app
+starts one automatically; more can be run by hand to drain a long queue faster.
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+import argparse
+import logging
+from typing import Optional
+
+from claude_analyzer import ClaudeAnalyzer
+from scoring_engine import score_startups
+from lead_store import LeadStore
+from job_queue import JobQueue, DEFAULT_JOB_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Results are written to the queue in groups so a large job does not commit once per row
+FLUSH_INTERVAL_SECONDS = 1.0
+# Keeps a job claimed while requests are slow (e.g. backing off after 429s)
+HEARTBEAT_INTERVAL_SECONDS = 30.0
+
+
+def report_metrics(queue: JobQueue, worker: str, analyzer: ClaudeAnalyzer):
+    """Publish this worker's Claude metrics so the app's diagnostics panel can include them."""
+    queue.save_worker_metrics(worker, {
+        'metrics': analyzer.metrics.to_state(),
+        'scheduler': analyzer.scheduler.stats(),
+    })
+
+
+def process_job(queue: JobQueue, job: dict, analyzer: ClaudeAnalyzer, lead_store: LeadStore,
+                worker: Optional[str] = None):
+    """Score every unscored row of a claimed job, recording results (and metrics) as they arrive."""
+    job_id = job['id']
+    pending = queue.pending_rows(job_id)
+    indices = [idx for idx, _ in pending]
+    startups = [row for _, row in pending]
+    logger.info(f"Job {job_id}: {len(startups)} of {job['total']} startups left to score")
+
+    # Rows scored in an earlier upload or session are completed straight from the lead store
+    scoring_model = analyzer.scoring_model(job['enrich'])
+    to_score_positions = lead_store.load_scored(startups, scoring_model, enriched=job['enrich'])
+    to_score_set = set(to_score_positions)
+    cached = [(indices[i], startups[i]) for i in range(len(startups)) if i not in to_score_set]
+    if cached:
+        queue.record_results(job_id, cached)
+
+    to_score = [startups[i] for i in to_score_positions]
+    buffer = []
+    last_flush = [time.monotonic()]
+    position_of = {id(row): indices[i] for i, row in zip(to_score_positions, to_score)}
+
+    def on_result(completed, total, item, fit_score_data, error):
+        buffer.append((position_of[id(item)], item))
+        if time.monotonic() - last_flush[0] >= FLUSH_INTERVAL_SECONDS:
+            queue.record_results(job_id, buffer)
+            lead_store.save([row for _, row in buffer], scoring_model)
+            if worker:
+                report_metrics(queue, worker, analyzer)
+            buffer.clear()
+            last_flush[0] = time.monotonic()
+
+    score_startups(analyzer, to_score, batch_mode=len(to_score) > 1 and not job['enrich'],
+                   on_result=on_result, enrich=job['enrich'])
+    if buffer:
+        queue.record_results(job_id, buffer)
+        lead_store.save([row for _, row in buffer], scoring_model)
+
+
+def _heartbeat(queue: JobQueue, job_id: int, stop: threading.Event):
+    while not stop.wait(HEARTBEAT_INTERVAL_SECONDS):
+        queue.heartbeat(job_id)
+
+
+def _parent_alive(parent_pid: Optional[int]) -> bool:
+    if parent_pid is None:
+        return True
+    try:
+        os.kill(parent_pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def run_worker(queue: JobQueue, poll_interval: float = 1.0, once: bool = False,
+               parent_pid: Optional[int] = None, analyzer: Optional[ClaudeAnalyzer] = None):
+    """
+    Process queued jobs until interrupted.
+
+    Args:
+        queue: Job queue to drain
+        poll_interval: Seconds to wait between checks when the queue is empty
+        once: Exit as soon as the queue is empty
+        parent_pid: Exit when this process (e.g. the Streamlit server that started the worker) goes away
+        analyzer: Optional ClaudeAnalyzer to score with (e.g. one using fake_client.FakeAnthropic)
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    analyzer = analyzer if analyzer is not None else ClaudeAnalyzer()
+    lead_store = LeadStore()
+    logger.info(f"Scoring worker {worker} started")
+
+    while _parent_alive(parent_pid):
+        queue.requeue_stale()
+        job = queue.claim_next(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, job['id'], stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            process_job(queue, job, analyzer, lead_store, worker)
+            queue.finish(job['id'])
+            logger.info(f"Job {job['id']} finished")
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}")
+            queue.finish(job['id'], error=str(e))
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            report_metrics(queue, worker, analyzer)
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Process queued SalesAssist scoring jobs")
+    parser.add_argument('--db', default=DEFAULT_JOB_DB_PATH, help="Job queue database")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds between checks of an empty queue")
+    parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+    parser.add_argument('--parent-pid', type=int, help="Exit when this process exits")
+    args = parser.parse_args(argv)
+
+    try:
+        run_worker(JobQueue(args.db), poll_interval=args.poll_interval, once=args.once, parent_pid=args.parent_pid)
+    except KeyboardInterrupt:
+        print("\n🛑 Worker stopped. Unfinished jobs resume when a worker starts again.")
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Incrementally maintained aggregate summary of the startup dataset.
+Feeds the dashboard metrics, quick insights and compact chat context without re-scanning the data.
+"""
+
+import heapq
+import itertools
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+TOP_N = 10
+
+
+def _is_missing(value) -> bool:
+    """True for None and NaN (pandas' missing values), which are excluded from counts."""
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _score_of(startup: Dict) -> Optional[float]:
+    """Return the startup's numeric fit score, or None if it has none."""
+    score = startup.get('claude_fit_score')
+    if _is_missing(score):
+        return None
+    try:
+        return float(score)
+    except (TypeError, ValueError):
+        return None
+
+
+class StartupSummary:
+    """Running counts, score statistics and a top-N heap, updated one startup at a time."""
+
+    def __init__(self, top_n: int = TOP_N):
+        self.top_n = top_n
+        self.total = 0
+        self.b2b_count = 0
+        self.score_sum = 0.0
+        self.score_count = 0
+        self.score_histogram = Counter()
+        self.industry_counts = Counter()
+        self.business_model_counts = Counter()
+        self._industry_score_sums = Counter()
+        self._industry_score_counts = Counter()
+        self._top_heap: List[Tuple[float, int, Dict]] = []
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_startups(cls, startups: List[Dict], top_n: int = TOP_N) -> 'StartupSummary':
+        """Build a summary from a full list of startups."""
+        summary = cls(top_n=top_n)
+        summary.update(startups)
+        return summary
+
+    def update(self, startups: List[Dict]):
+        """Add several startups to the summary."""
+        for startup in startups:
+            self.add(startup)
+
+    def add(self, startup: Dict):
+        """Add one (scored) startup to the summary."""
+        if not isinstance(startup, dict):
+            return
+
+        self.total += 1
+        industry = startup.get('industry')
+        business_model = startup.get('business_model')
+        score = _score_of(startup)
+
+        if not _is_missing(industry):
+            self.industry_counts[industry] += 1
+        if not _is_missing(business_model):
+            self.business_model_counts[business_model] += 1
+            if 'b2b' in str(business_model).lower():
+                self.b2b_count += 1
+
+        if score is not None:
+            self.score_sum += score
+            self.score_count += 1
+            self.score_histogram[int(score)] += 1
+            if not _is_missing(industry):
+                self._industry_score_sums[industry] += score
+                self._industry_score_counts[industry] += 1
+
+            # Min-heap of the best scores; ties keep the earliest startup
+            entry = (score, -next(self._sequence), startup)
+            if len(self._top_heap) < self.top_n:
+                heapq.heappush(self._top_heap, entry)
+            elif entry[:2] > self._top_heap[0][:2]:
+                heapq.heapreplace(self._top_heap, entry)
+
+    @property
+    def average_score(self) -> Optional[float]:
+        return self.score_sum / self.score_count if self.score_count else None
+
+    @property
+    def top_industry(self) -> Optional[str]:
+        return self.industry_counts.most_common(1)[0][0] if self.industry_counts else None
+
+    def top_startups(self, n: Optional[int] = None) -> List[Dict]:
+        """Highest-scoring startups, best first."""
+        ranked = sorted(self._top_heap, key=lambda entry: entry[:2], reverse=True)
+        return [startup for _, _, startup in ranked[:n or self.top_n]]
+
+    def industry_breakdown(self) -> List[Tuple[str, float, int]]:
+        """(industry, average fit score, count) for every scored industry, best average first."""
+        rows = [
+            (industry, self._industry_score_sums[industry] / count, count)
+            for industry, count in self._industry_score_counts.items()
+        ]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def to_context(self, top_n: int = TOP_N) -> str:
+        """Compact aggregate statistics for use as chat context."""
+        lines = [f"- Total startups: {self.total}"]
+        if self.score_count:
+            lines.append(f"- Average Claude fit score: {self.average_score:.1f}/10")
+            lines.append("- Fit score distribution: " + ", ".join(
+                f"{score}: {self.score_histogram[score]}" for score in sorted(self.score_histogram)
+            ))
+        lines.append(f"- B2B companies: {self.b2b_count}")
+        lines.append("- Top industries: " + ", ".join(
+            f"{name} ({count})" for name, count in self.industry_counts.most_common(top_n)
+        ))
+        lines.append("- Business models: " + ", ".join(
+            f"{name} ({count})" for name, count in self.business_model_counts.most_common(top_n)
+        ))
+        if self._top_heap:
+            lines.append("- Highest fit scores: " + ", ".join(
+                f"{startup.get('company', 'Unknown')} ({startup.get('claude_fit_score')}/10)"
+                for startup in self.top_startups(top_n)
+            ))
+        return "\n".join(lines)